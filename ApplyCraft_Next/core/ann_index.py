@@ -0,0 +1,298 @@
+"""
+core/ann_index.py
+------------------
+Approximate nearest-neighbour search over cached bullet embeddings.
+
+Dense ranking in :mod:`core.jd_ranker` compares every JD against every
+bullet vector. That is fine for one person's CV, but shared libraries
+(teams, coaches managing many candidates) reach tens of thousands of
+bullets. :class:`IVFIndex` is an inverted-file index for that case:
+
+* bullets are clustered into ``nlist`` lists with spherical k-means;
+* a query is compared with the centroids only, and exact cosine is
+  computed just for bullets in the ``nprobe`` closest lists.
+
+:meth:`IVFIndex.postings` groups an inventory's positions by list once,
+so a query's candidates are the concatenation of its probed lists. Only
+those rows are then read from the embedding cache.
+
+``nprobe`` is the recall/latency knob: more probed lists give better
+recall but take longer, and ``nprobe >= nlist`` is exact search.
+
+The index lives next to the embedding cache it serves::
+
+    cache/embeddings/<backend>__<model>/
+        ivf.f32   centroid matrix (float32, nlist x dim)
+        ivf.db    SQLite: bullet sha -> list, plus meta (dim, training size)
+
+It is rebuilt incrementally. New bullets are assigned to their nearest
+centroid, which moves towards them as a running mean. A full k-means
+retrain only happens once the library has doubled since the last
+training. Bullets are keyed by :func:`core.embedding_cache.text_key`, so
+evicted or edited bullets simply stop being looked up; their stale rows
+are dropped at the next retrain.
+
+NumPy is required. :func:`get_index` returns ``None`` without it, and the
+ranker then keeps exact search.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import sqlite3
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.dirname(_current_dir)
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from helpers.logger import logger        # noqa: E402
+
+try:
+    import numpy as _np  # type: ignore
+except Exception:  # ANN search needs NumPy; callers fall back to exact search.
+    _np = None
+
+
+def _normalise(matrix: Any) -> Any:
+    norms = _np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / _np.maximum(norms, 1e-12)
+
+
+def auto_nlist(n: int) -> int:
+    """Default list count: about ``sqrt(n)``, at least 1."""
+    return max(1, int(math.sqrt(max(n, 1))))
+
+
+def spherical_kmeans(
+    vectors: Any,
+    nlist: int,
+    *,
+    iterations: int = 10,
+    seed: int = 0,
+) -> Any:
+    """Cluster unit ``vectors`` into ``nlist`` centroids (cosine k-means).
+
+    Centroids start from a random sample of rows. An empty cluster is
+    re-seeded with the row its centroid fits worst, so every list stays
+    in use.
+    """
+    x = _normalise(_np.asarray(vectors, dtype=_np.float32))
+    n = x.shape[0]
+    nlist = max(1, min(nlist, n))
+    rng = _np.random.default_rng(seed)
+    centroids = x[rng.choice(n, size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        sims = x @ centroids.T
+        assign = sims.argmax(axis=1)
+        best = sims[_np.arange(n), assign]
+        sums = _np.zeros_like(centroids)
+        _np.add.at(sums, assign, x)
+        counts = _np.bincount(assign, minlength=nlist)
+        for empty in _np.flatnonzero(counts == 0):
+            worst = int(best.argmin())
+            sums[empty] = x[worst]
+            best[worst] = _np.inf
+        centroids = _normalise(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file ANN index persisted in an embedding-store folder."""
+
+    def __init__(self, folder: str, nlist: int = 0):
+        self.folder = folder
+        self.requested_nlist = max(0, int(nlist or 0))
+        self.centroids_file = os.path.join(folder, "ivf.f32")
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(os.path.join(folder, "ivf.db"), check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS lists (key TEXT PRIMARY KEY, list INTEGER NOT NULL)"
+            )
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+        meta = dict(self.conn.execute("SELECT k, v FROM meta"))
+        self.dim = int(meta.get("dim", 0))
+        self.trained_on = int(meta.get("trained_on", 0))
+        self.centroids: Optional[Any] = None
+        self.counts: Optional[Any] = None
+        # sha -> list, loaded lazily and kept in step with ivf.db.
+        self._assign: Optional[Dict[str, int]] = None
+        if self.dim and os.path.exists(self.centroids_file):
+            try:
+                self.centroids = _np.fromfile(self.centroids_file, dtype=_np.float32).reshape(-1, self.dim)
+            except ValueError as e:
+                logger.warning(f"Discarding unreadable ANN centroids in {folder}: {e}")
+                self.centroids = None
+
+    @property
+    def nlist(self) -> int:
+        return 0 if self.centroids is None else int(self.centroids.shape[0])
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _assignments(self) -> Dict[str, int]:
+        if self._assign is None:
+            self._assign = dict(self.conn.execute("SELECT key, list FROM lists"))
+        return self._assign
+
+    def _save_centroids(self) -> None:
+        tmp = self.centroids_file + ".tmp"
+        self.centroids.astype(_np.float32).tofile(tmp)
+        os.replace(tmp, self.centroids_file)
+
+    def _train(self, keys: Sequence[str], vectors: Any) -> None:
+        n = len(keys)
+        nlist = self.requested_nlist or auto_nlist(n)
+        # k-means on a sample is plenty to place centroids; every bullet
+        # is then assigned below.
+        sample = vectors
+        if n > 256 * nlist:
+            picks = _np.random.default_rng(0).choice(n, size=256 * nlist, replace=False)
+            sample = vectors[picks]
+        self.centroids = spherical_kmeans(sample, nlist)
+        self.dim = int(vectors.shape[1])
+        lists = self._nearest(vectors)
+        self.counts = _np.bincount(lists, minlength=self.nlist).astype(_np.float64)
+        self._assign = dict(zip(keys, lists.tolist()))
+        self.trained_on = n
+        self._save_centroids()
+        with self.conn:
+            self.conn.execute("DELETE FROM lists")
+            self.conn.executemany("INSERT INTO lists(key, list) VALUES (?, ?)", self._assign.items())
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta(k, v) VALUES (?, ?)",
+                [("dim", str(self.dim)), ("trained_on", str(n))],
+            )
+        logger.debug(f"ANN index trained: {n} bullets in {self.nlist} lists ({self.folder}).")
+
+    def _nearest(self, vectors: Any) -> Any:
+        return (_normalise(vectors) @ self.centroids.T).argmax(axis=1)
+
+    def _needs_training(self, n: int, dim: int) -> bool:
+        if self.centroids is None or dim != self.dim:
+            return True
+        if self.requested_nlist and min(self.requested_nlist, self.trained_on) != self.nlist:
+            return True
+        # Centroids placed on a much smaller library get lopsided lists.
+        return n > 2 * max(self.trained_on, 1)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def sync(self, keys: Sequence[str], vectors: Any) -> Any:
+        """Assign every ``(key, vector)`` to a list; returns the list ids.
+
+        ``vectors`` is either the full ``(len(keys), dim)`` matrix or a
+        callable mapping positions to their rows, so callers can read only
+        the rows that are needed: those of unknown keys, or all of them
+        when training. Known keys keep their list. Unknown ones are
+        assigned to the nearest centroid, which is then nudged towards
+        them. Training happens on first use and whenever the library has
+        doubled.
+        """
+        if callable(vectors):
+            fetch = vectors
+        else:
+            matrix = _np.asarray(vectors, dtype=_np.float32)
+            fetch = matrix.__getitem__
+        if not len(keys):
+            return _np.zeros(0, dtype=_np.int64)
+        with self._lock:
+            dim = int(_np.asarray(fetch(_np.arange(1))).shape[1])
+            if self._needs_training(len(keys), dim):
+                self._train(keys, _np.asarray(fetch(_np.arange(len(keys))), dtype=_np.float32))
+                assign = self._assignments()
+                return _np.fromiter((assign[k] for k in keys), dtype=_np.int64, count=len(keys))
+
+            assign = self._assignments()
+            lists = _np.fromiter((assign.get(k, -1) for k in keys), dtype=_np.int64, count=len(keys))
+            new = _np.flatnonzero(lists < 0)
+            if new.size:
+                fresh = _normalise(_np.asarray(fetch(new), dtype=_np.float32))
+                chosen = (fresh @ self.centroids.T).argmax(axis=1)
+                lists[new] = chosen
+                if self.counts is None:
+                    self.counts = _np.bincount(list(assign.values()), minlength=self.nlist).astype(_np.float64)
+                # Running-mean update so centroids follow incremental additions.
+                for lst in _np.unique(chosen):
+                    members = fresh[chosen == lst]
+                    total = self.counts[lst] + len(members)
+                    centre = (self.centroids[lst] * self.counts[lst] + members.sum(axis=0)) / total
+                    self.centroids[lst] = centre / max(float(_np.linalg.norm(centre)), 1e-12)
+                    self.counts[lst] = total
+                rows = [(keys[i], int(lists[i])) for i in new]
+                assign.update(rows)
+                self._save_centroids()
+                with self.conn:
+                    self.conn.executemany("INSERT OR REPLACE INTO lists(key, list) VALUES (?, ?)", rows)
+            return lists
+
+    def probe(self, query_vecs: Any, nprobe: int) -> Any:
+        """The ``nprobe`` closest lists per query, shape ``(n_queries, nprobe)``."""
+        queries = _normalise(_np.atleast_2d(_np.asarray(query_vecs, dtype=_np.float32)))
+        sims = queries @ self.centroids.T
+        nprobe = max(1, min(int(nprobe), self.nlist))
+        if nprobe >= self.nlist:
+            return _np.tile(_np.arange(self.nlist), (len(queries), 1))
+        return _np.argpartition(-sims, nprobe - 1, axis=1)[:, :nprobe]
+
+    def postings(self, lists: Any) -> List[Any]:
+        """Positions grouped by list: ``postings[l]`` is every position assigned to ``l``.
+
+        ``lists`` is what :meth:`sync` returned. Done once per inventory;
+        :meth:`candidates` then never looks at the other lists.
+        """
+        lists = _np.asarray(lists, dtype=_np.int64)
+        order = _np.argsort(lists, kind="stable")
+        bounds = _np.searchsorted(lists[order], _np.arange(self.nlist + 1))
+        return [order[bounds[i]:bounds[i + 1]] for i in range(self.nlist)]
+
+    def candidates(self, postings: List[Any], query_vecs: Any, nprobe: int) -> List[Any]:
+        """Per query, the sorted positions in its ``nprobe`` closest lists."""
+        out = []
+        for probed in self.probe(query_vecs, nprobe):
+            picked = [postings[int(lst)] for lst in probed]
+            out.append(_np.sort(_np.concatenate(picked)) if picked else _np.zeros(0, dtype=_np.int64))
+        return out
+
+    def __len__(self) -> int:
+        return len(self._assignments())
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self.conn.close()
+            except Exception as e:
+                logger.error(f"Error closing ANN index {self.folder}: {e}")
+
+
+# --------------------------------------------------------------------------
+# Shared indexes, one per embedding store
+# --------------------------------------------------------------------------
+
+_indexes: Dict[str, IVFIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(folder: str, nlist: int = 0) -> Optional[IVFIndex]:
+    """Return the shared index stored in ``folder``, or ``None`` without NumPy."""
+    if _np is None:
+        return None
+    with _indexes_lock:
+        index = _indexes.get(folder)
+        if index is None:
+            try:
+                index = IVFIndex(folder, nlist=nlist)
+            except Exception as e:
+                logger.warning(f"ANN index unavailable ({e}); using exact search.")
+                return None
+            _indexes[folder] = index
+        elif nlist and index.requested_nlist != nlist:
+            index.requested_nlist = nlist
+        return index
@@ -18,6 +18,7 @@ import customtkinter as ctk
 
 from helpers.logger import logger
 from core.stats_manager import StatsManager
+from core import outputs_watcher
 from core.audit_dialogs import AuditDialogs
 from core.audit_graph import AuditGraph
 from core.audit_intel import AuditIntel
@@ -46,6 +47,7 @@ class ApplicationAuditPanel(ctk.CTkFrame):
             "card": ("#FFFFFF", "#161D29")
         }
         self.stats_manager = StatsManager(os.path.join(current_dir, ".."))
+        self.outputs_watcher = None
         
         # State
         self.search_query = ctk.StringVar()
@@ -112,9 +114,26 @@ class ApplicationAuditPanel(ctk.CTkFrame):
         def _run():
             self.stats_manager.scan_outputs()
             self.after(0, self.refresh_data)
+            # Catch up first, then follow the tree (tracker.watch_outputs).
+            # Batches are applied on the Tk thread, which also reads and
+            # edits the stats cache.
+            if self.outputs_watcher is None:
+                self.outputs_watcher = outputs_watcher.start_for(
+                    self.stats_manager,
+                    on_change=lambda _n: self.refresh_data(),
+                    dispatch=lambda fn: self.after(0, fn),
+                )
         import threading
         threading.Thread(target=_run, daemon=True).start()
 
+    def destroy(self):
+        if self.outputs_watcher is not None:
+            self.outputs_watcher.stop()
+            self.outputs_watcher = None
+        # Flushes a pending background JSON mirror write.
+        self.stats_manager.close()
+        super().destroy()
+
     def setup_summary_card(self, parent):
         card = self.create_card(parent, "QUICK STATS")
         card.grid(row=1, column=0, sticky="ew", pady=10)
@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import threading
 import sys
@@ -20,6 +21,7 @@ from core.cv_service import CVGeneratorService
 from core.stats_manager import StatsManager
 from core.application_audit import ApplicationAuditPanel
 from core.jd_ranker import rank_bullets, BulletScore
+from core import embed_worker
 
 # --- ANIMATION UTILITY ---
 
@@ -61,6 +63,11 @@ class ApplyCraftApp(ctk.CTk):
         self.stats_manager = StatsManager(os.path.dirname(current_dir))
         self.cv_service = CVGeneratorService(self.stats_manager)
 
+        # Opt-in: load the embedding model in a background process now so
+        # the first "Rank Against JD" click doesn't wait for it.
+        embed_worker.start_warmup()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
         # Layout Grid
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -463,6 +470,22 @@ class ApplyCraftApp(ctk.CTk):
         )
         self.jd_results_label.pack(anchor="w", padx=25, pady=(2, 5))
 
+        # Collapsible per-stage timings; only shown when llm.profile_ranking is on.
+        self.jd_timing_frame = ctk.CTkFrame(jd_card, fg_color="transparent")
+        self.jd_timing_btn = ctk.CTkButton(
+            self.jd_timing_frame, text="\u25b8 Timing", corner_radius=8,
+            fg_color="transparent", text_color=self.colors["text_muted"],
+            hover_color=self.colors["accent_soft"], anchor="w",
+            height=24, width=120, command=self._toggle_jd_timing,
+        )
+        self.jd_timing_btn.pack(anchor="w")
+        self.jd_timing_label = ctk.CTkLabel(
+            self.jd_timing_frame, text="", justify="left", anchor="w",
+            font=ctk.CTkFont(family="Courier", size=12),
+            text_color=self.colors["text_muted"],
+        )
+        self.jd_timing_open = False
+
         # Scrollable list of top-ranked bullets. We render it as plain
         # text in a textbox: simpler than a treeview, perfectly readable.
         self.jd_results_box = ctk.CTkTextbox(
@@ -473,6 +496,8 @@ class ApplyCraftApp(ctk.CTk):
         )
         self.jd_results_box.pack(fill="x", padx=25, pady=(0, 20))
         self.jd_results_box.configure(state="disabled")
+        self.jd_timing_frame.pack(anchor="w", fill="x", padx=25, pady=(0, 5), before=self.jd_results_box)
+        self.jd_timing_frame.pack_forget()
 
 
     def setup_preview_panel(self):
@@ -801,9 +826,11 @@ class ApplyCraftApp(ctk.CTk):
             return
 
         # Preflight: fail fast if no local LLM backend is usable.
+        warming = False
         try:
             from core.jd_ranker import backend_status
             bstat = backend_status()
+            warming = (bstat.get("model_worker") or {}).get("state") == "starting"
             active = (bstat.get("active") or "").lower()
             configured = bstat.get("configured", "local")
             if "local tf-idf" in active:
@@ -819,41 +846,101 @@ class ApplyCraftApp(ctk.CTk):
             pass
 
         self.set_status("Ranking bullets...", "accent")
-        self.jd_results_label.configure(text="Scoring JD against your CV bullets...")
+        self.jd_results_label.configure(
+            text="Embedding model still loading in the background..." if warming
+            else "Scoring JD against your CV bullets..."
+        )
         self.jd_results_box.configure(state="normal")
         self.jd_results_box.delete("0.0", "end")
         self.jd_results_box.insert("0.0", "Running local LLM scoring...\nPlease wait.")
         self.jd_results_box.configure(state="disabled")
-        inventory = user_config.job_positions()
+        llm_cfg = user_config.llm_config() or {}
+        self.jd_timing_frame.pack_forget()
 
         def worker():
+            trace = logger.trace("jd_ranking", enabled=bool(llm_cfg.get("profile_ranking")))
             try:
-                from core.jd_ranker import (
-                    rank_bullets,
-                    compute_fit_score,
-                    generate_match_recommendations,
-                )
-                ranked = rank_bullets(jd, inventory)
-                fit = compute_fit_score(jd, ranked)
-                backend = (fit.get("backend") or "").lower()
-                if "local tf-idf" in backend:
-                    raise RuntimeError(
-                        "Local LLM backend not available for matching. "
-                        "Start Ollama or install sentence-transformers."
-                    )
-                rec_payload = generate_match_recommendations(
-                    jd, ranked, max_items=5
-                )
-                self.after(0, lambda: self._render_jd_results(ranked, fit, rec_payload))
+                with trace:
+                    self._jd_ranking_stages(jd)
             except Exception as e:
                 logger.error(f"JD ranking failed: {e}")
                 err_msg = str(e)
                 self.after(0, lambda m=err_msg: self._render_jd_error(m))
+            if trace.events:
+                dumped = None
+                if llm_cfg.get("profile_trace_dump"):
+                    try:
+                        dumped = trace.dump()
+                    except OSError as e:
+                        logger.warning(f"Could not write JD ranking trace: {e}")
+                text = trace.format_breakdown() + (f"\n\nChrome trace: {dumped}" if dumped else "")
+                self.after(0, lambda t=text: self._render_jd_timing(t))
 
         threading.Thread(target=worker, daemon=True).start()
 
-    def _render_jd_results(self, ranked, fit, rec_payload=None):
-        """Paint the ranked list, fit score, and recommendations into the UI."""
+    def _jd_ranking_stages(self, jd):
+        """Rank, paint, then stream recommendations (runs on the worker thread)."""
+        from core.jd_ranker import (
+            JDAnalysis,
+            rank_bullets_progressive,
+            stream_match_recommendations,
+        )
+        # Paint the instant TF-IDF ranking first, then replace it
+        # once the embedding backend answers.
+        # No explicit inventory: the ranker reads the configured one itself,
+        # which lets it skip the index sync and prune stale embeddings by
+        # inventory version.
+        ranked, fit = [], {}
+        for stage in rank_bullets_progressive(jd):
+            ranked, fit = stage["ranked"], stage["fit"]
+            if not stage["final"]:
+                self.after(0, lambda r=ranked, f=fit: self._render_jd_results(
+                    r, f, pending="Refining with the local LLM..."
+                ))
+        backend = (fit.get("backend") or "").lower()
+        if "local tf-idf" in backend:
+            raise RuntimeError(
+                "Local LLM backend not available for matching. "
+                "Start Ollama or install sentence-transformers."
+            )
+
+        self.after(0, lambda: self._render_jd_results(
+            ranked, fit, pending="Drafting recommendations..."
+        ))
+        # One analysis per ranking: the stage's fit is reused for the
+        # prompt and payload instead of being scored again.
+        analysis = JDAnalysis(jd, ranked, fit=fit)
+        rec_payload = None
+        for kind, value in stream_match_recommendations(
+            jd, ranked, max_items=5, analysis=analysis,
+        ):
+            if kind == "token":
+                self.after(0, lambda t=value: self._append_jd_stream(t))
+            else:
+                rec_payload = value
+        self.after(0, lambda: self._render_jd_results(ranked, fit, rec_payload))
+
+    def _toggle_jd_timing(self):
+        self.jd_timing_open = not self.jd_timing_open
+        if self.jd_timing_open:
+            self.jd_timing_btn.configure(text="\u25be Timing")
+            self.jd_timing_label.pack(anchor="w", pady=(0, 4))
+        else:
+            self.jd_timing_btn.configure(text="\u25b8 Timing")
+            self.jd_timing_label.pack_forget()
+
+    def _render_jd_timing(self, text):
+        """Show the per-stage timing breakdown of the last ranking (collapsed by default)."""
+        self.jd_timing_label.configure(text=text)
+        self.jd_timing_frame.pack(anchor="w", fill="x", padx=25, pady=(0, 5), before=self.jd_results_box)
+
+    def _render_jd_results(self, ranked, fit, rec_payload=None, pending=None):
+        """Paint the ranked list, fit score, and recommendations into the UI.
+
+        ``pending`` marks an intermediate render (TF-IDF preview, or
+        recommendations still streaming): the text is shown in place of the
+        recommendations and streamed tokens are appended after it.
+        """
         self.last_jd_ranking = ranked
         self.last_jd_text = self.jd_text.get("0.0", "end").strip()
 
@@ -873,19 +960,27 @@ class ApplyCraftApp(ctk.CTk):
             text=(
                 f"Overall fit: {score_pct}%  |  "
                 f"{n_strong} strong matches across {n_bullets} bullets  |  "
-                f"backend: {backend}  |  recommendations: {rec_source}"
+                f"backend: {backend}  |  recommendations: "
+                f"{'pending' if pending else rec_source}"
             )
         )
 
         lines = []
         lines.append("RECOMMENDED FIXES")
-        lines.append(f"source: {rec_source}")
-        lines.append("")
-        if recommendations:
-            for i, rec in enumerate(recommendations, start=1):
-                lines.append(f"{i}. {rec}")
+        if pending:
+            lines.append(pending)
+            lines.append("")
+            head = "\n".join(lines)
+            lines = [""]
         else:
-            lines.append("No recommendations generated.")
+            head = None
+            lines.append(f"source: {rec_source}")
+            lines.append("")
+            if recommendations:
+                for i, rec in enumerate(recommendations, start=1):
+                    lines.append(f"{i}. {rec}")
+            else:
+                lines.append("No recommendations generated.")
         lines.append("")
         lines.append("TOP MATCHED BULLETS")
         lines.append("")
@@ -904,9 +999,26 @@ class ApplyCraftApp(ctk.CTk):
 
         self.jd_results_box.configure(state="normal")
         self.jd_results_box.delete("0.0", "end")
-        self.jd_results_box.insert("0.0", "\n".join(lines) if lines else "No bullets ranked.")
+        if head is not None:
+            # Streamed recommendation tokens are inserted at this mark so
+            # the ranked list below never has to be repainted.
+            self.jd_results_box.insert("0.0", head + "\n".join(lines))
+            self.jd_results_box.mark_set("jd_stream", f"1.0 + {len(head)} chars")
+            self.jd_results_box.mark_gravity("jd_stream", "right")
+        else:
+            self.jd_results_box.mark_unset("jd_stream")
+            self.jd_results_box.insert("0.0", "\n".join(lines) if lines else "No bullets ranked.")
+        self.jd_results_box.configure(state="disabled")
+        if not pending:
+            self.set_status("Ranking complete", "success")
+
+    def _append_jd_stream(self, fragment):
+        """Append one streamed recommendation fragment below the heading."""
+        if "jd_stream" not in self.jd_results_box.mark_names():
+            return
+        self.jd_results_box.configure(state="normal")
+        self.jd_results_box.insert("jd_stream", fragment)
         self.jd_results_box.configure(state="disabled")
-        self.set_status("Ranking complete", "success")
 
     def _render_jd_error(self, message):
         """Show an explicit JD-ranking failure in the results panel."""
@@ -1108,6 +1220,11 @@ class ApplyCraftApp(ctk.CTk):
             logger.error(f"Error in generation thread: {e}")
             self.after(0, lambda: self._complete(False))
 
+    def _on_close(self):
+        embed_worker.shutdown()
+        self.destroy()
+        self.stats_manager.close()
+
     def _complete(self, success):
         # Re-enable all relevant buttons
         for btn in [self.gen_both_btn, self.gen_cv_btn, self.gen_cl_btn]:
@@ -1121,5 +1238,8 @@ class ApplyCraftApp(ctk.CTk):
             self.status_dot.configure(text_color=self.colors["text_muted"])
 
 if __name__ == "__main__":
+    # The warm-model worker is spawned by re-running this entry point;
+    # in the frozen (PyInstaller) build that must not open a second GUI.
+    multiprocessing.freeze_support()
     app = ApplyCraftApp()
     app.mainloop()
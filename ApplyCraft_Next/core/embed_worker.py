@@ -0,0 +1,260 @@
+"""
+core/embed_worker.py
+---------------------
+Warm sentence-transformers model in a background process.
+
+:func:`core.jd_ranker._load_sentence_transformer` loads the model lazily,
+so the first "Rank Against JD" click used to stall for several seconds
+while torch imported and the weights loaded. Encoding then ran on a
+thread inside the GUI process, competing with the Tk main loop for the
+GIL.
+
+With ``llm.warm_model_process`` on, the GUI calls :func:`start_warmup` at
+startup. That spawns one long-lived worker process which loads the
+configured model right away and then answers encode requests over a
+``multiprocessing`` pipe::
+
+    parent -> worker   ("encode", texts)  |  ("stop",)
+    worker -> parent   ("ready", info)    |  ("error", message)
+                       ("ok", float32 matrix)
+
+:class:`EmbeddingWorker` serialises requests (one in flight at a time)
+and reports its state: ``starting``, ``ready``, ``failed`` or
+``stopped``. The ranker uses the worker when there is one and otherwise
+loads the model in-process as before. ``backend_status()`` surfaces the
+worker's health.
+"""
+
+from __future__ import annotations
+
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.dirname(_current_dir)
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from helpers import user_config          # noqa: E402
+from helpers.logger import logger        # noqa: E402
+
+
+def _load_sentence_transformer(model_name: str) -> Callable[[List[str]], Any]:
+    """Default loader: returns ``texts -> normalised float32 matrix``."""
+    from sentence_transformers import SentenceTransformer  # type: ignore
+
+    model = SentenceTransformer(model_name)
+    return lambda texts: model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
+
+
+def _resolve(path: str) -> Callable[[str], Callable[[List[str]], Any]]:
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def _worker_main(model_name: str, loader_path: str, conn: Any) -> None:
+    """Worker process entry point: load once, then serve encode requests."""
+    try:
+        encode = _resolve(loader_path)(model_name)
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        conn.close()
+        return
+    conn.send(("ready", {"model": model_name, "pid": os.getpid()}))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break  # parent went away
+        if message[0] == "stop":
+            break
+        try:
+            conn.send(("ok", encode(list(message[1]))))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+class EmbeddingWorker:
+    """Parent-side handle on the warm-model process."""
+
+    def __init__(
+        self,
+        model_name: str,
+        *,
+        loader: str = "core.embed_worker:_load_sentence_transformer",
+    ):
+        self.model_name = model_name
+        self.loader = loader
+        self.state = "stopped"
+        self.error = ""
+        self.started_at = 0.0
+        self.ready_at = 0.0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._conn: Any = None
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+
+    def start(self) -> None:
+        """Spawn the worker; returns immediately while the model loads."""
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                return
+            # "spawn" keeps the worker free of Tk state inherited through fork.
+            ctx = multiprocessing.get_context("spawn")
+            parent_conn, child_conn = ctx.Pipe()
+            self._process = ctx.Process(
+                target=_worker_main,
+                args=(self.model_name, self.loader, child_conn),
+                name=f"applycraft-embed-{self.model_name}",
+                daemon=True,
+            )
+            self.state, self.error = "starting", ""
+            self._ready.clear()
+            self.started_at = time.time()
+            self._process.start()
+            child_conn.close()
+            self._conn = parent_conn
+        threading.Thread(target=self._await_ready, daemon=True).start()
+
+    def _await_ready(self) -> None:
+        try:
+            kind, info = self._conn.recv()
+        except (EOFError, OSError) as e:
+            kind, info = "error", f"worker exited during start-up ({e})"
+        if kind == "ready":
+            self.state = "ready"
+            self.ready_at = time.time()
+            logger.info(
+                f"Embedding model '{self.model_name}' warm in worker "
+                f"(pid {info.get('pid')}, {self.ready_at - self.started_at:.1f}s)."
+            )
+        else:
+            self.state, self.error = "failed", str(info)
+            logger.warning(f"Embedding worker failed to load '{self.model_name}': {info}")
+        self._ready.set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the model has loaded (or failed); True if ready."""
+        self._ready.wait(timeout)
+        return self.state == "ready"
+
+    def encode(self, texts: List[str], timeout: float = 120.0) -> Optional[Any]:
+        """Embed ``texts`` in the worker; ``None`` if it is unavailable."""
+        if not self.wait_ready(timeout):
+            return None
+        with self._lock:
+            try:
+                self._conn.send(("encode", list(texts)))
+                if not self._conn.poll(timeout):
+                    raise TimeoutError(f"no answer within {timeout:.0f}s")
+                kind, value = self._conn.recv()
+            except (EOFError, OSError, TimeoutError) as e:
+                self.state, self.error = "failed", f"worker lost: {e}"
+                logger.warning(f"Embedding worker unavailable: {e}")
+                self._terminate()
+                return None
+        if kind != "ok":
+            logger.warning(f"Embedding worker encode failed: {value}")
+            return None
+        return value
+
+    def status(self) -> Dict[str, Any]:
+        """Health snapshot for ``backend_status()``."""
+        alive = self._process is not None and self._process.is_alive()
+        if self.state == "ready" and not alive:
+            self.state, self.error = "failed", "worker process exited"
+        return {
+            "state": self.state,
+            "model": self.model_name,
+            "pid": self._process.pid if alive else None,
+            "load_seconds": round(self.ready_at - self.started_at, 2) if self.ready_at else None,
+            "error": self.error,
+        }
+
+    def _terminate(self) -> None:
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout=2)
+
+    def stop(self) -> None:
+        """Ask the worker to exit; terminate it if it doesn't."""
+        with self._lock:
+            if self._process is None:
+                return
+            try:
+                if self._process.is_alive():
+                    self._conn.send(("stop",))
+                    self._process.join(timeout=2)
+            except (OSError, ValueError):
+                pass
+            self._terminate()
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._process = None
+            if self.state != "failed":
+                self.state = "stopped"
+            self._ready.set()
+
+
+# --------------------------------------------------------------------------
+# Shared worker
+# --------------------------------------------------------------------------
+
+_worker: Optional[EmbeddingWorker] = None
+_worker_lock = threading.Lock()
+
+
+def start_warmup() -> Optional[EmbeddingWorker]:
+    """Start the warm-model worker if ``llm.warm_model_process`` is on.
+
+    Only applies to the ``sentence_transformers`` provider. Safe to call
+    more than once.
+    """
+    global _worker
+    cfg = user_config.llm_config() or {}
+    if not cfg.get("warm_model_process", False):
+        return None
+    if (cfg.get("provider") or "local").lower() != "sentence_transformers":
+        return None
+    model_name = cfg.get("model") or "all-MiniLM-L6-v2"
+    with _worker_lock:
+        if _worker is not None and _worker.model_name != model_name:
+            _worker.stop()
+            _worker = None
+        if _worker is None:
+            _worker = EmbeddingWorker(model_name)
+        try:
+            _worker.start()
+        except Exception as e:
+            logger.warning(f"Could not start embedding worker ({e}); loading in-process instead.")
+            _worker = None
+        return _worker
+
+
+def get_worker(model_name: str) -> Optional[EmbeddingWorker]:
+    """The running worker for ``model_name``, unless it failed or was never started."""
+    worker = _worker
+    if worker is None or worker.model_name != model_name or worker.state in ("failed", "stopped"):
+        return None
+    return worker
+
+
+def worker_status() -> Optional[Dict[str, Any]]:
+    return _worker.status() if _worker is not None else None
+
+
+def shutdown() -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop()
+            _worker = None
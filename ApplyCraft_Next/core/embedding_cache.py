@@ -0,0 +1,430 @@
+"""
+core/embedding_cache.py
+------------------------
+Content-addressed, on-disk cache of bullet embeddings.
+
+The embedding backends in :mod:`core.jd_ranker` used to re-embed the whole
+bullet inventory on every ranking, even though bullets rarely change.
+:class:`EmbeddingStore` remembers each bullet's vector keyed by::
+
+    (backend, model, sha256(bullet text))
+
+so a ranking only has to embed the JD plus any new or edited bullets.
+
+Layout on disk (one folder per backend/model pair)::
+
+    cache/embeddings/<backend>__<model>/
+        vectors.f32   row-major float32 matrix, one row per cached bullet
+        index.db      SQLite: sha -> row, last_used
+
+Vectors are read through a read-only memory map, so opening a store does
+not load the matrix into RAM. When the store holds more than
+``max_entries`` rows, the least-recently-used rows are evicted and their
+slots reused by later writes. Recency is tracked to the hour: a read
+only rewrites ``last_used`` for rows not already used in the last hour.
+The store itself is stdlib-only; when NumPy is installed
+:meth:`EmbeddingStore.get_matrix` hands back cached rows as one
+contiguous float32 matrix for vectorised scoring.
+
+Quantised storage
+~~~~~~~~~~~~~~~~~
+``llm.embedding_cache_dtype`` picks the on-disk element type:
+
+* ``float32`` (default): exact.
+* ``float16``: half the size, relative error around 1e-3.
+* ``int8``: a quarter of the size. Each row is scaled so its largest
+  component maps to 127 and rounded; the per-row scale goes in
+  ``scales.f32``. Reads multiply by the scale again, so callers always get
+  float32 vectors back.
+
+Quantised stores live in their own folder (``<backend>__<model>__int8``),
+so switching dtype never misreads an existing cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.dirname(_current_dir)
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from helpers import user_config          # noqa: E402
+from helpers.logger import logger        # noqa: E402
+
+try:
+    import numpy as _np  # type: ignore
+except Exception:  # NumPy is optional; get_many() works without it.
+    _np = None
+
+
+# dtype -> (struct / array code, bytes per element, vectors file name)
+_DTYPES: Dict[str, Tuple[str, int, str]] = {
+    "float32": ("f", 4, "vectors.f32"),
+    "float16": ("e", 2, "vectors.f16"),
+    "int8": ("b", 1, "vectors.i8"),
+}
+
+
+def text_key(text: str) -> str:
+    """Content address of a bullet (SHA-256 of its UTF-8 text)."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _row_bytes(vec: Any) -> bytes:
+    """float32 bytes for a list or NumPy row."""
+    if hasattr(vec, "astype"):
+        return vec.astype("float32").tobytes()
+    return array("f", vec).tobytes()
+
+
+def _quantise_row(vec: Any, dtype: str) -> Tuple[bytes, float]:
+    """``(stored bytes, scale)`` for one vector; scale is 1.0 unless int8."""
+    if dtype == "float32":
+        return _row_bytes(vec), 1.0
+    if hasattr(vec, "astype"):
+        if dtype == "float16":
+            return vec.astype("<f2").tobytes(), 1.0
+        peak = float(abs(vec).max()) if len(vec) else 0.0
+        scale = peak / 127.0 if peak > 0 else 1.0
+        return (vec / scale).round().astype("i1").tobytes(), scale
+    values = vec.tolist() if hasattr(vec, "tolist") else list(vec)
+    if dtype == "float16":
+        return struct.pack(f"<{len(values)}e", *values), 1.0
+    peak = max((abs(v) for v in values), default=0.0)
+    scale = peak / 127.0 if peak > 0 else 1.0
+    return struct.pack(f"<{len(values)}b", *(int(round(v / scale)) for v in values)), scale
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", value or "default").strip("_") or "default"
+
+
+class EmbeddingStore:
+    """Memory-mapped embedding cache for one backend/model pair.
+
+    ``dtype`` is the on-disk element type (see the module docstring);
+    vectors are always returned as float32. Reads refresh a row's
+    ``last_used`` at most once per ``touch_interval`` seconds, so ranking
+    an unchanged inventory again does not rewrite every row.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        backend: str,
+        model: str,
+        max_entries: int = 50000,
+        dtype: str = "float32",
+        touch_interval: float = 3600.0,
+    ):
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported embedding cache dtype {dtype!r}")
+        self.backend = backend
+        self.model = model
+        self.dtype = dtype
+        self.max_entries = max(1, int(max_entries))
+        self.touch_interval = max(0.0, float(touch_interval))
+        suffix = "" if dtype == "float32" else f"__{dtype}"
+        self.folder = os.path.join(root, f"{_slug(backend)}__{_slug(model)}{suffix}")
+        os.makedirs(self.folder, exist_ok=True)
+        self._code, self._item_size, vectors_name = _DTYPES[dtype]
+        self.vectors_file = os.path.join(self.folder, vectors_name)
+        self.scales_file = os.path.join(self.folder, "scales.f32")
+        self._lock = threading.RLock()
+        self._map: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        # Per-row int8 scales; small (4 bytes per row), so kept in RAM.
+        self._scales = array("f")
+        if dtype == "int8" and os.path.exists(self.scales_file):
+            with open(self.scales_file, "rb") as f:
+                self._scales.frombytes(f.read())
+
+        self.conn = sqlite3.connect(os.path.join(self.folder, "index.db"), check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, row INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+        row = self.conn.execute("SELECT v FROM meta WHERE k = 'dim'").fetchone()
+        self.dim = int(row[0]) if row else 0
+        self._free_rows = self._compute_free_rows()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _n_rows(self) -> int:
+        if not self.dim or not os.path.exists(self.vectors_file):
+            return 0
+        return os.path.getsize(self.vectors_file) // (self.dim * self._item_size)
+
+    def _compute_free_rows(self) -> List[int]:
+        used = {r for (r,) in self.conn.execute("SELECT row FROM entries")}
+        return [r for r in range(self._n_rows()) if r not in used]
+
+    def _close_map(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _raw_view(self) -> Optional[memoryview]:
+        """Byte view over the vectors file, mapped on first use."""
+        if self._view is None:
+            if not self._n_rows():
+                return None
+            with open(self.vectors_file, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map)
+        return self._view
+
+    def _scale(self, row: int) -> float:
+        return self._scales[row] if row < len(self._scales) else 1.0
+
+    def _reset(self, dim: int) -> None:
+        """Drop everything (model changed shape under the same name)."""
+        self._close_map()
+        with self.conn:
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute("INSERT OR REPLACE INTO meta(k, v) VALUES ('dim', ?)", (str(dim),))
+        for path in (self.vectors_file, self.scales_file):
+            if os.path.exists(path):
+                os.remove(path)
+        self._scales = array("f")
+        self.dim = dim
+        self._free_rows = []
+
+    def _evict(self, keep: int) -> None:
+        """Evict least-recently-used rows until at most ``keep`` remain."""
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        excess = count - keep
+        if excess <= 0:
+            return
+        victims = self.conn.execute(
+            "SELECT key, row FROM entries ORDER BY last_used ASC LIMIT ?", (excess,)
+        ).fetchall()
+        with self.conn:
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in victims])
+        self._free_rows.extend(r for _, r in victims)
+
+    def _lookup_rows(self, keys: Sequence[str]) -> Dict[str, int]:
+        rows: Dict[str, int] = {}
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for key, row in self.conn.execute(
+                f"SELECT key, row FROM entries WHERE key IN ({marks})", chunk
+            ):
+                rows[key] = row
+        return rows
+
+    def _touch(self, keys: Sequence[str]) -> None:
+        """Mark ``keys`` as used now, skipping rows used within ``touch_interval``."""
+        now = time.time()
+        cutoff = now - self.touch_interval
+        with self.conn:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                self.conn.execute(
+                    f"UPDATE entries SET last_used = ? WHERE last_used <= ? AND key IN ({marks})",
+                    [now, cutoff, *chunk],
+                )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Return the cached vector for each text, or ``None`` on a miss."""
+        out: List[Optional[List[float]]] = [None] * len(texts)
+        if not texts or not self.dim:
+            return out
+        keys = [text_key(t) for t in texts]
+        with self._lock:
+            rows = self._lookup_rows(keys)
+            if not rows:
+                return out
+            view = self._raw_view()
+            if view is None:
+                return out
+            row_size = self.dim * self._item_size
+            fmt = f"<{self.dim}{self._code}"
+            for i, key in enumerate(keys):
+                row = rows.get(key)
+                if row is not None and (row + 1) * row_size <= len(view):
+                    values = struct.unpack_from(fmt, view, row * row_size)
+                    if self.dtype == "int8":
+                        scale = self._scale(row)
+                        out[i] = [v * scale for v in values]
+                    else:
+                        out[i] = list(values)
+            self._touch(list(rows))
+        return out
+
+    def missing(self, texts: Sequence[str]) -> List[int]:
+        """Indices of ``texts`` with no cached vector; reads no vectors."""
+        if not texts or not self.dim:
+            return list(range(len(texts)))
+        keys = [text_key(t) for t in texts]
+        with self._lock:
+            rows = self._lookup_rows(keys)
+        return [i for i, key in enumerate(keys) if key not in rows]
+
+    def get_matrix(self, texts: Sequence[str]) -> Tuple[Any, List[int]]:
+        """Cached vectors as one contiguous ``(len(texts), dim)`` float32 matrix.
+
+        Requires NumPy. Returns ``(matrix, missing)`` where ``missing`` lists
+        the indices of texts with no cached vector (their rows are zero).
+        ``matrix`` is ``None`` if nothing was cached at all.
+        """
+        missing = list(range(len(texts)))
+        if _np is None or not texts or not self.dim:
+            return None, missing
+        keys = [text_key(t) for t in texts]
+        with self._lock:
+            rows = self._lookup_rows(keys)
+            view = self._raw_view() if rows else None
+            if view is None:
+                return None, missing
+            stored = _np.frombuffer(view, dtype=_np.dtype(self.dtype)).reshape(-1, self.dim)
+            picks = _np.array([rows.get(k, -1) for k in keys], dtype=_np.int64)
+            hit = (picks >= 0) & (picks < stored.shape[0])
+            matrix = _np.zeros((len(keys), self.dim), dtype=_np.float32)
+            matrix[hit] = stored[picks[hit]]
+            if self.dtype == "int8":
+                # Rescale each row back from [-127, 127].
+                scales = _np.frombuffer(self._scales, dtype=_np.float32) if self._scales else _np.ones(0, _np.float32)
+                rows_hit = picks[hit]
+                row_scales = _np.ones(len(rows_hit), dtype=_np.float32)
+                known = rows_hit < scales.shape[0]
+                row_scales[known] = scales[rows_hit[known]]
+                matrix[hit] *= row_scales[:, None]
+            del stored
+            self._touch(list(rows))
+        return matrix, [int(i) for i in _np.flatnonzero(~hit)]
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store one vector per text, evicting LRU rows if over capacity."""
+        if not texts:
+            return
+        with self._lock:
+            dim = len(vectors[0])
+            if dim != self.dim:
+                self._reset(dim)
+
+            # Make room first so freed slots are reused by this write.
+            self._evict(max(self.max_entries - len(texts), 0))
+
+            keys = [text_key(t) for t in texts]
+            rows = self._lookup_rows(keys)
+            self._close_map()
+            now = time.time()
+            written: Dict[str, int] = {}
+            mode = "r+b" if os.path.exists(self.vectors_file) else "w+b"
+            row_size = dim * self._item_size
+            with open(self.vectors_file, mode) as f:
+                f.seek(0, os.SEEK_END)
+                n_rows = f.tell() // row_size
+                for key, vec in zip(keys, vectors):
+                    if key in written or len(vec) != dim:
+                        continue
+                    row = rows.get(key)
+                    if row is None:
+                        if self._free_rows:
+                            row = self._free_rows.pop()
+                        else:
+                            row = n_rows
+                            n_rows += 1
+                    data, scale = _quantise_row(vec, self.dtype)
+                    f.seek(row * row_size)
+                    f.write(data)
+                    if self.dtype == "int8":
+                        if row >= len(self._scales):
+                            self._scales.extend([1.0] * (row + 1 - len(self._scales)))
+                        self._scales[row] = scale
+                    written[key] = row
+            if self.dtype == "int8" and written:
+                with open(self.scales_file, "wb") as f:
+                    f.write(self._scales.tobytes())
+
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO entries(key, row, last_used) VALUES (?, ?, ?)",
+                    [(key, row, now) for key, row in written.items()],
+                )
+
+    def discard(self, texts: Sequence[str]) -> int:
+        """Drop the cached vectors of ``texts``; their rows are reused by later writes."""
+        if not texts:
+            return 0
+        with self._lock:
+            rows = self._lookup_rows([text_key(t) for t in texts])
+            if not rows:
+                return 0
+            with self.conn:
+                self.conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in rows])
+            self._free_rows.extend(rows.values())
+        return len(rows)
+
+    def __len__(self) -> int:
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_map()
+            try:
+                self.conn.close()
+            except Exception as e:
+                logger.error(f"Error closing embedding cache {self.folder}: {e}")
+
+
+# --------------------------------------------------------------------------
+# Shared stores, one per backend/model
+# --------------------------------------------------------------------------
+
+_stores: Dict[Tuple[str, str, str], EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(backend: str, model: str) -> Optional[EmbeddingStore]:
+    """Return the shared store for ``backend``/``model`` in the configured dtype.
+
+    Returns ``None`` when caching is disabled via
+    ``user_config.llm.embedding_cache`` or the cache folder is unusable.
+    """
+    cfg = user_config.llm_config() or {}
+    if not cfg.get("embedding_cache", True):
+        return None
+    dtype = cfg.get("embedding_cache_dtype") or "float32"
+    with _stores_lock:
+        store = _stores.get((backend, model, dtype))
+        if store is None:
+            try:
+                store = EmbeddingStore(
+                    os.path.join(user_config.cache_dir(), "embeddings"),
+                    backend,
+                    model,
+                    max_entries=cfg.get("embedding_cache_max_entries") or 50000,
+                    dtype=dtype,
+                )
+            except Exception as e:
+                logger.warning(f"Embedding cache unavailable ({e}); embedding without it.")
+                return None
+            _stores[(backend, model, dtype)] = store
+        return store
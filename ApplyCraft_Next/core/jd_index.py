@@ -0,0 +1,340 @@
+"""
+core/jd_index.py
+-----------------
+Persistent inverted index over the bullet inventory.
+
+The local TF-IDF ranker in :mod:`core.jd_ranker` used to re-tokenise every
+bullet and rebuild the document-frequency table on each call. With a
+bullet library in the thousands that dominated every "Rank Against JD"
+click, even though the inventory almost never changes between clicks.
+
+:class:`BulletIndex` keeps, for the lifetime of the process::
+
+    term -> {bullet id: augmented term frequency}
+
+plus per-bullet tokens and vector norms. The index is synced against the
+inventory on each ranking; only bullets that were added or removed are
+(re-)tokenised and (un-)posted. A query walks the postings of the JD's
+own terms, so scoring cost follows JD length rather than inventory size.
+
+Scores are identical to the brute-force ``_build_tfidf`` +
+``_cosine_sparse`` path: IDF is derived from live document frequencies
+and norms are recomputed lazily, once, after the inventory changes.
+
+The index also keeps raw term counts and bullet lengths, so
+:meth:`BulletIndex.bm25` can score Okapi BM25 over the same postings. The
+hybrid ranker uses it as its lexical stage.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+# A token: the ranker interns tokens to ints, but any hashable works.
+Term = Hashable
+
+
+@dataclass
+class IndexedBullet:
+    """One bullet as stored in the index.
+
+    ``tf`` holds the augmented term frequency (``0.5 + 0.5 * tf / max_tf``)
+    before IDF weighting, so it never needs recomputing when other bullets
+    come and go. ``norm`` is the L2 norm of the IDF-weighted vector and is
+    refreshed whenever the corpus changes.
+    """
+    job_title: str
+    bullet: str
+    tokens: Sequence[Term]
+    tf: Dict[Term, float]
+    position: int = 0
+    norm: float = 0.0
+
+
+class BulletIndex:
+    """Incrementally-updated TF-IDF inverted index over CV bullets.
+
+    Parameters
+    ----------
+    tokenize : callable
+        ``text -> sequence of terms`` used for bullets (the ranker passes
+        ``_content_ids``: stopword-filtered tokens as interned ints).
+    """
+
+    def __init__(self, tokenize: Callable[[str], Sequence[Term]]):
+        self._tokenize = tokenize
+        self._lock = threading.RLock()
+        self._docs: Dict[int, IndexedBullet] = {}
+        self._keys: Dict[Tuple[str, str, int], int] = {}
+        self._postings: Dict[Term, Dict[int, float]] = {}
+        self._counts: Dict[Term, Dict[int, int]] = {}
+        self._total_length = 0
+        # (k1, b, version) -> per-bullet BM25 length term, built on demand.
+        self._bm25_norms: Tuple[Tuple[float, float, int], Dict[int, float]] = ((0.0, 0.0, -1), {})
+        self._order: List[int] = []
+        self._snapshot: Tuple[Tuple[str, str], ...] = ()
+        self._flat: List[Tuple[str, str, Sequence[Term]]] = []
+        self._next_id = 0
+        self._norms_stale = False
+        self._fingerprint = ""
+        self._inventory_version: Optional[int] = None
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    # ------------------------------------------------------------------
+    # Inventory sync
+    # ------------------------------------------------------------------
+    def sync(self, inventory: Dict[str, List[str]], version: Optional[int] = None) -> bool:
+        """Bring the index in line with ``inventory``.
+
+        Returns True if anything changed. Unchanged bullets keep their
+        tokens and postings; only additions and removals do any work.
+        ``version`` is ``user_config.inventory_version()`` when
+        ``inventory`` is the configured one: if it matches the last synced
+        version, the call returns at once without comparing bullets.
+        """
+        if version is not None and version == self._inventory_version:
+            return False
+        snapshot = tuple(
+            (job, bullet)
+            for job, bullets in inventory.items()
+            for bullet in bullets
+        )
+        with self._lock:
+            self._inventory_version = version
+            if snapshot == self._snapshot:
+                return False
+
+            # Key each bullet by (job, text, occurrence) so duplicate
+            # bullets under the same job stay distinct documents.
+            seen: Counter = Counter()
+            wanted: List[Tuple[str, str, int]] = []
+            for job, bullet in snapshot:
+                seen[(job, bullet)] += 1
+                wanted.append((job, bullet, seen[(job, bullet)]))
+
+            wanted_set = set(wanted)
+            for key in [k for k in self._keys if k not in wanted_set]:
+                self._remove(self._keys.pop(key))
+
+            order: List[int] = []
+            for position, key in enumerate(wanted):
+                doc_id = self._keys.get(key)
+                if doc_id is None:
+                    doc_id = self._add(key[0], key[1])
+                    self._keys[key] = doc_id
+                self._docs[doc_id].position = position
+                order.append(doc_id)
+
+            self._order = order
+            self._snapshot = snapshot
+            self._flat = [
+                (self._docs[d].job_title, self._docs[d].bullet, self._docs[d].tokens)
+                for d in order
+            ]
+            self._norms_stale = True
+            self._fingerprint = ""
+            self.version += 1
+            return True
+
+    def _add(self, job: str, bullet: str) -> int:
+        doc_id = self._next_id
+        self._next_id += 1
+        tokens = self._tokenize(bullet)
+        tf: Dict[Term, float] = {}
+        counts: Counter = Counter(tokens)
+        if tokens:
+            max_tf = max(counts.values())
+            tf = {term: 0.5 + 0.5 * (count / max_tf) for term, count in counts.items()}
+        self._docs[doc_id] = IndexedBullet(job, bullet, tokens, tf)
+        for term, weight in tf.items():
+            self._postings.setdefault(term, {})[doc_id] = weight
+            self._counts.setdefault(term, {})[doc_id] = counts[term]
+        self._total_length += len(tokens)
+        return doc_id
+
+    def _remove(self, doc_id: int) -> None:
+        doc = self._docs.pop(doc_id)
+        self._total_length -= len(doc.tokens)
+        for term in doc.tf:
+            for table in (self._postings, self._counts):
+                posting = table.get(term)
+                if posting is None:
+                    continue
+                posting.pop(doc_id, None)
+                if not posting:
+                    del table[term]
+
+    # ------------------------------------------------------------------
+    # Weights
+    # ------------------------------------------------------------------
+    def df(self, term: Term) -> int:
+        """Number of bullets containing ``term``."""
+        return len(self._postings.get(term, ()))
+
+    def idf(self, term: Term) -> float:
+        """Smoothed IDF, matching ``jd_ranker._build_tfidf``.
+
+        Terms absent from the inventory get 1.0, as the brute-force
+        ranker's ``idf.get(term, 1.0)`` did.
+        """
+        df = self.df(term)
+        if df == 0:
+            return 1.0
+        return math.log((len(self._docs) + 1) / (df + 1)) + 1.0
+
+    def _refresh_norms(self) -> None:
+        idf = {term: self.idf(term) for term in self._postings}
+        for doc in self._docs.values():
+            doc.norm = math.sqrt(sum((w * idf[t]) ** 2 for t, w in doc.tf.items()))
+        self._norms_stale = False
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def flat(self) -> List[Tuple[str, str, Sequence[Term]]]:
+        """``(job, bullet, tokens)`` for every bullet, in inventory order."""
+        return self._flat
+
+    def fingerprint(self) -> str:
+        """SHA-256 of the synced inventory (jobs, bullets, order).
+
+        Unlike ``version`` it is stable across processes, so it can key
+        on-disk caches. Computed once per inventory change.
+        """
+        with self._lock:
+            if not self._fingerprint:
+                h = hashlib.sha256()
+                for job, bullet in self._snapshot:
+                    h.update(job.encode("utf-8"))
+                    h.update(b"\x1f")
+                    h.update(bullet.encode("utf-8"))
+                    h.update(b"\x1e")
+                self._fingerprint = h.hexdigest()
+            return self._fingerprint
+
+    def doc(self, doc_id: int) -> IndexedBullet:
+        return self._docs[doc_id]
+
+    def doc_ids(self) -> List[int]:
+        """Bullet ids in inventory order."""
+        return self._order
+
+    def search(self, query_tokens: Iterable[Term]) -> List[Tuple[int, float, List[Term]]]:
+        """Cosine-score every bullet sharing at least one term with the query.
+
+        Returns ``(doc_id, cosine, matched_terms)`` for the bullets touched
+        by the query's postings; every other bullet has cosine 0.0. Only the
+        postings of the query's own terms are traversed.
+        """
+        query_tokens = list(query_tokens)
+        unique = list(dict.fromkeys(query_tokens))
+        return [
+            (doc_id, cosine, self.matched_terms(doc_id, unique))
+            for doc_id, cosine, _ in self.search_counts(query_tokens)
+        ]
+
+    def search_counts(self, query_tokens: Iterable[Term]) -> List[Tuple[int, float, int]]:
+        """Like :meth:`search`, but with the number of matched terms only.
+
+        Skips building a term list per hit; use :meth:`matched_terms` for
+        the few hits that end up being shown.
+        """
+        query_tokens = list(query_tokens)
+        if not query_tokens:
+            return []
+        with self._lock:
+            if self._norms_stale:
+                self._refresh_norms()
+
+            counts = Counter(query_tokens)
+            max_tf = max(counts.values())
+            dots: Dict[int, float] = {}
+            matched: Dict[int, int] = {}
+            q_norm_sq = 0.0
+            for term, count in counts.items():
+                idf = self.idf(term)
+                q_weight = (0.5 + 0.5 * (count / max_tf)) * idf
+                q_norm_sq += q_weight * q_weight
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                scale = q_weight * idf
+                for doc_id, tf in posting.items():
+                    dots[doc_id] = dots.get(doc_id, 0.0) + scale * tf
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+
+            q_norm = math.sqrt(q_norm_sq)
+            hits: List[Tuple[int, float, int]] = []
+            for doc_id, dot in dots.items():
+                d_norm = self._docs[doc_id].norm
+                if dot == 0.0 or d_norm == 0.0 or q_norm == 0.0:
+                    continue
+                hits.append((doc_id, dot / (q_norm * d_norm), matched[doc_id]))
+            return hits
+
+    def bm25(
+        self,
+        query_tokens: Iterable[Term],
+        k1: float = 1.2,
+        b: float = 0.75,
+        boosts: Optional[Dict[Term, float]] = None,
+    ) -> List[Tuple[int, float, int]]:
+        """Okapi BM25 for every bullet sharing a term with the query.
+
+        Returns ``(doc_id, score, n_matched)`` like :meth:`search_counts`.
+        Each distinct query term counts once. Term frequency saturates
+        through ``k1``, and ``b`` normalises by bullet length relative to
+        the inventory average. ``boosts`` multiplies the contribution of
+        individual terms (the BM25 provider boosts bigrams). Scores are
+        unbounded; callers normalise.
+        """
+        terms = list(dict.fromkeys(query_tokens))
+        with self._lock:
+            n_docs = len(self._docs)
+            if not terms or not n_docs:
+                return []
+            norms = self._bm25_length_norms(k1, b)
+            scores: Dict[int, float] = {}
+            matched: Dict[int, int] = {}
+            for term in terms:
+                posting = self._counts.get(term)
+                if not posting:
+                    continue
+                idf = self.bm25_idf(term)
+                if boosts:
+                    idf *= boosts.get(term, 1.0)
+                scale = idf * (k1 + 1.0)
+                for doc_id, count in posting.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + scale * count / (count + norms[doc_id])
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+            return [(doc_id, score, matched[doc_id]) for doc_id, score in scores.items()]
+
+    def _bm25_length_norms(self, k1: float, b: float) -> Dict[int, float]:
+        """``k1 * (1 - b + b * length / avg_length)`` per bullet, cached until the inventory changes."""
+        key = (k1, b, self.version)
+        if self._bm25_norms[0] != key:
+            avg_len = (self._total_length / len(self._docs)) or 1.0
+            self._bm25_norms = (key, {
+                doc_id: k1 * (1.0 - b + b * len(doc.tokens) / avg_len)
+                for doc_id, doc in self._docs.items()
+            })
+        return self._bm25_norms[1]
+
+    def bm25_idf(self, term: Term) -> float:
+        """BM25 IDF, ``ln(1 + (N - df + 0.5) / (df + 0.5))``."""
+        df = self.df(term)
+        n_docs = len(self._docs)
+        return math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def matched_terms(self, doc_id: int, query_terms: Iterable[Term]) -> List[Term]:
+        """Query terms that occur in bullet ``doc_id``."""
+        tf = self._docs[doc_id].tf
+        return [t for t in query_terms if t in tf]
@@ -0,0 +1,145 @@
+"""
+core/jd_leaderboard.py
+-----------------------
+Rank a whole folder (or JSONL file) of job descriptions against your
+bullet inventory and print a fit-score leaderboard.
+
+Usage::
+
+    python core/jd_leaderboard.py scraped_jds/
+    python core/jd_leaderboard.py postings.jsonl --out leaderboard.csv
+    python core/jd_leaderboard.py scraped_jds/ --out leaderboard.json --force-local
+
+Inputs
+~~~~~~
+* **Directory** — every ``.txt`` / ``.md`` file is one JD; the file name
+  (without extension) is used as the posting name.
+* **JSONL** — one JSON object per line. The JD text is read from
+  ``text`` / ``jd`` / ``description``; the name from ``name`` / ``title``
+  / ``company`` / ``id`` (falls back to the line number). Lines that are
+  not a JSON object are skipped with a warning.
+
+All JDs go through :func:`core.jd_ranker.rank_bullets_batch`, so the
+inventory is tokenised and embedded once for the whole batch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.dirname(_current_dir)
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from core.jd_ranker import rank_bullets_batch   # noqa: E402
+from helpers.logger import logger               # noqa: E402
+
+
+_JD_EXTENSIONS = (".txt", ".md")
+_TEXT_KEYS = ("text", "jd", "description")
+_NAME_KEYS = ("name", "title", "company", "id")
+
+
+def load_jds(path: str) -> List[Tuple[str, str]]:
+    """Return ``(name, jd_text)`` pairs from a directory or a JSONL file."""
+    if os.path.isdir(path):
+        out: List[Tuple[str, str]] = []
+        for filename in sorted(os.listdir(path)):
+            if not filename.lower().endswith(_JD_EXTENSIONS):
+                continue
+            with open(os.path.join(path, filename), "r", encoding="utf-8") as f:
+                out.append((os.path.splitext(filename)[0], f.read()))
+        return out
+
+    out = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                logger.warning(f"{path} line {line_no}: invalid JSON ({e}); skipped.")
+                continue
+            if not isinstance(record, dict):
+                logger.warning(f"{path} line {line_no}: expected a JSON object; skipped.")
+                continue
+            text = next((record[k] for k in _TEXT_KEYS if record.get(k)), "")
+            name = next((str(record[k]) for k in _NAME_KEYS if record.get(k)), f"line {line_no}")
+            out.append((name, text))
+    return out
+
+
+def build_leaderboard(jds: List[Tuple[str, str]], *, force_local: bool = False) -> List[Dict[str, Any]]:
+    """Rank every JD and return leaderboard rows sorted by fit (best first)."""
+    results = rank_bullets_batch([text for _, text in jds], force_local=force_local)
+    rows = []
+    for (name, _), result in zip(jds, results):
+        fit = result["fit"]
+        ranked = result["ranked"]
+        best = ranked[0] if ranked else None
+        rows.append({
+            "name": name,
+            "fit_score": round(fit["fit_score"], 4),
+            "strong_matches": fit["strong_matches"],
+            "considered": fit["considered"],
+            "keyword_coverage": round(fit["keyword_coverage"], 4),
+            "backend": fit["backend"],
+            "best_job": best.job_title if best else "",
+            "best_bullet": best.bullet if best else "",
+        })
+    rows.sort(key=lambda r: r["fit_score"], reverse=True)
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    return rows
+
+
+def write_leaderboard(rows: List[Dict[str, Any]], out_path: str) -> None:
+    """Write rows as ``.json`` or ``.csv`` (chosen by extension)."""
+    if out_path.lower().endswith(".json"):
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+        return
+    fields = ["rank", "name", "fit_score", "strong_matches", "considered",
+              "keyword_coverage", "backend", "best_job", "best_bullet"]
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fit-score leaderboard for a batch of JDs.")
+    parser.add_argument("source", help="Directory of .txt/.md JDs, or a .jsonl file")
+    parser.add_argument("--out", help="Write the leaderboard to this .csv or .json file")
+    parser.add_argument("--force-local", action="store_true",
+                        help="Use the dependency-free TF-IDF ranker only")
+    args = parser.parse_args(argv)
+
+    jds = load_jds(args.source)
+    if not jds:
+        print(f"No job descriptions found in {args.source}.")
+        return 1
+
+    rows = build_leaderboard(jds, force_local=args.force_local)
+    print(f"Backend used: {rows[0]['backend']}\n")
+    for row in rows:
+        print(
+            f"{row['rank']:>3}. [{row['fit_score']*100:>3.0f}%] {row['name']}  "
+            f"({row['strong_matches']} strong, {row['keyword_coverage']*100:.0f}% keywords)"
+        )
+    if args.out:
+        write_leaderboard(rows, args.out)
+        print(f"\nWrote {len(rows)} rows to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,14 +10,15 @@ Given a pasted job description and the user's bullet inventory (i.e.
 2. An overall *fit score* â€” a single number that says "how well does
    your inventory cover what this JD asks for?".
 
-Four scoring backends are supported, all chosen via ``user_config.llm``::
+Five scoring backends are supported, all chosen via ``user_config.llm``::
 
     "provider": "local"               (default â€” pure-Python TF-IDF, no deps)
+    "provider": "bm25"                (pure-Python BM25 with phrase boosting)
     "provider": "sentence_transformers" (local embeddings, pip install)
     "provider": "ollama"              (local LLM server on localhost:11434)
     "provider": "openai"              (paid cloud â€” opt-in only)
 
-Crucially, the first three are **fully local**. The ``sentence_transformers``
+Crucially, the first four are **fully local**. The ``sentence_transformers``
 and ``ollama`` paths exist precisely so the ranker can use a real
 embedding model without giving up ApplyCraft's local-first promise. No
 data leaves the user's machine.
@@ -34,17 +35,28 @@ Public API
 >>> fit = compute_fit_score(jd_text, ranked)
 >>> fit["fit_score"], fit["strong_matches"], fit["backend"]
 
+Many JDs at once (shared index + one embedding call)::
+
+>>> results = rank_bullets_batch([jd_a, jd_b])
+>>> results[0]["fit"]["fit_score"]
+
+``python core/jd_leaderboard.py <dir-or-jsonl>`` ranks a folder of JDs
+from the command line and prints a fit-score leaderboard.
+
 """
 
 from __future__ import annotations
 
+import heapq
+import json
 import math
 import os
 import re
 import sys
 from collections import Counter
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 # Path bootstrap for ``helpers.user_config``.
 _current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -53,7 +65,20 @@ if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
 from helpers import user_config          # noqa: E402
+from helpers import http_client          # noqa: E402
 from helpers.logger import logger        # noqa: E402
+from core import ann_index               # noqa: E402
+from core import embed_worker            # noqa: E402
+from core import embedding_cache         # noqa: E402
+from core import jd_result_cache         # noqa: E402
+from core import tokenizer               # noqa: E402
+from core.jd_index import BulletIndex    # noqa: E402
+from core.ranked_bullets import TOKENS, BulletScore, RankedBullets  # noqa: E402,F401
+
+try:
+    import numpy as _np  # type: ignore
+except Exception:  # NumPy arrives with sentence-transformers; optional otherwise.
+    _np = None
 
 
 # --------------------------------------------------------------------------
@@ -61,61 +86,23 @@ from helpers.logger import logger        # noqa: E402
 # overlap signals on top of every backend).
 # --------------------------------------------------------------------------
 
-_STOPWORDS = frozenset("""
-a about above after again against all am an and any are aren't as at be
-because been before being below between both but by can can't cannot could
-couldn't did didn't do does doesn't doing don't down during each few for
-from further had hadn't has hasn't have haven't having he he'd he'll he's
-her here here's hers herself him himself his how how's i i'd i'll i'm i've
-if in into is isn't it it's its itself let's me more most mustn't my
-myself no nor not of off on once only or other ought our ours ourselves
-out over own same shan't she she'd she'll she's should shouldn't so some
-such than that that's the their theirs them themselves then there there's
-these they they'd they'll they're they've this those through to too under
-until up very was wasn't we we'd we'll we're we've were weren't what
-what's when when's where where's which while who who's whom why why's
-with won't would wouldn't you you'd you'll you're you've your yours
-yourself yourselves
-also will may within across including via etc whilst per onto upon among
-""".split())
-
-_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9\+\-#\.]*")
+_STOPWORDS = tokenizer.STOPWORDS
+_WORD_RE = tokenizer.WORD_RE
 
 
 def _tokenize(text: str) -> List[str]:
     """Lowercase, keep alphanum + a few tech-stack-friendly chars (C#, .NET)."""
-    return [tok.lower() for tok in _WORD_RE.findall(text or "")]
+    return list(tokenizer.get_tokenizer().tokens(text))
 
 
 def _content_tokens(text: str) -> List[str]:
     """Tokenize and drop short / stop words."""
-    return [t for t in _tokenize(text) if len(t) > 2 and t not in _STOPWORDS]
+    return list(tokenizer.get_tokenizer().content_tokens(text))
 
 
-# --------------------------------------------------------------------------
-# Result type
-# --------------------------------------------------------------------------
-
-@dataclass
-class BulletScore:
-    """A single bullet's relevance score against a JD.
-
-    Attributes
-    ----------
-    job_title : str
-        The job heading the bullet belongs to.
-    bullet : str
-        The bullet text itself.
-    score : float
-        Relevance score in [0.0, 1.0]. Higher is better.
-    matched_keywords : list[str]
-        JD content words that also appear in the bullet â€” used to explain
-        the score in the UI.
-    """
-    job_title: str
-    bullet: str
-    score: float
-    matched_keywords: List[str]
+def _content_ids(text: str) -> Tuple[int, ...]:
+    """:func:`_content_tokens` as interned token ids (memoised, read-only)."""
+    return tokenizer.get_tokenizer().content_ids(text)
 
 
 # --------------------------------------------------------------------------
@@ -192,37 +179,814 @@ def _cosine_dense(a: List[float], b: List[float]) -> float:
 
 
 # --------------------------------------------------------------------------
-# Backend: pure-Python TF-IDF (default)
+# Top-k / per-job selection
 # --------------------------------------------------------------------------
+# ``top_k`` keeps the k best bullets overall; ``per_job_cap`` keeps at most
+# that many per job. Together they give the same bullets, in the same
+# order, as ranking everything and then filtering the full list. The
+# difference is that losers are dropped during selection, before any
+# BulletScore or keyword list exists for them.
+
+_JOB_IDS_MEMO: Tuple[Any, List[int]] = (None, [])
+
+
+def _job_ids(flat: Sequence[Tuple[str, str, Any]]) -> List[int]:
+    """Dense job number per bullet position (memoised for the current flat list)."""
+    global _JOB_IDS_MEMO
+    memo_flat, ids = _JOB_IDS_MEMO
+    if memo_flat is not flat:
+        numbers: Dict[str, int] = {}
+        ids = [numbers.setdefault(job, len(numbers)) for job, _, _ in flat]
+        _JOB_IDS_MEMO = (flat, ids)
+    return ids
+
+
+def _select_scored(
+    scored: List[Tuple[float, int, Any]],
+    job_ids: Sequence[int],
+    top_k: Optional[int],
+    per_job_cap: Optional[int],
+) -> List[Tuple[float, int, Any]]:
+    """Best ``(score, position, payload)`` entries, best first.
+
+    Ties keep inventory order. With ``per_job_cap`` each job keeps a
+    bounded min-heap of its best entries, so memory stays at
+    ``jobs * cap`` however many bullets are scored.
+    """
+    order = lambda r: (-r[0], r[1])  # noqa: E731
+    if per_job_cap is None:
+        if top_k is None:
+            return sorted(scored, key=order)
+        return heapq.nsmallest(top_k, scored, key=order)
+    if per_job_cap <= 0:
+        return []
+
+    heaps: Dict[int, List[Tuple[float, int, Tuple[float, int, Any]]]] = {}
+    for item in scored:
+        heap = heaps.setdefault(job_ids[item[1]], [])
+        # (score, -position) is unique per bullet, so the payload is never compared.
+        entry = (item[0], -item[1], item)
+        if len(heap) < per_job_cap:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    survivors = [entry[2] for heap in heaps.values() for entry in heap]
+    if top_k is None:
+        return sorted(survivors, key=order)
+    return heapq.nsmallest(top_k, survivors, key=order)
+
+
+def _select_positions(
+    scores: Any,
+    job_ids: Optional[Sequence[int]],
+    top_k: Optional[int],
+    per_job_cap: Optional[int],
+) -> List[int]:
+    """Positions of the surviving bullets for a dense score vector, best first."""
+    if per_job_cap is None:
+        return _top_indices(scores, top_k)
+    if _np is None:
+        chosen = _select_scored([(s, i, None) for i, s in enumerate(scores)], job_ids, top_k, per_job_cap)
+        return [pos for _, pos, _ in chosen]
+    if per_job_cap <= 0:
+        return []
+
+    # Vectorised per-job cap: sort by (job, -score, position), keep the
+    # first ``per_job_cap`` of each job run, then order the survivors.
+    arr = _np.asarray(scores, dtype=_np.float64)
+    jobs = _np.asarray(job_ids)
+    n = arr.shape[0]
+    by_job = _np.lexsort((_np.arange(n), -arr, jobs))
+    sorted_jobs = jobs[by_job]
+    starts = _np.flatnonzero(_np.r_[True, sorted_jobs[1:] != sorted_jobs[:-1]])
+    rank_in_job = _np.arange(n) - _np.repeat(starts, _np.diff(_np.r_[starts, n]))
+    keep = by_job[rank_in_job < per_job_cap]
+    return keep[_top_indices(arr[keep], top_k)].tolist()
+
 
 def _local_rank(
     jd_text: str,
-    flat: List[Tuple[str, str, List[str]]],
-) -> List[BulletScore]:
-    jd_tokens = _content_tokens(jd_text)
-    if not jd_tokens or not flat:
+    index: BulletIndex,
+    top_k: Optional[int] = None,
+    per_job_cap: Optional[int] = None,
+) -> Sequence[BulletScore]:
+    jd_tokens = _content_ids(jd_text)
+    if not jd_tokens or not len(index):
         return []
 
-    docs = [b_tokens for _, _, b_tokens in flat]
-    vectors, idf = _build_tfidf(docs)
-    jd_vector = _vectorise_query(jd_tokens, idf)
-    jd_set = set(jd_tokens)
-
-    results: List[BulletScore] = []
-    for (job, bullet, b_tokens), vec in zip(flat, vectors):
-        cosine = _cosine_sparse(jd_vector, vec)
-        b_set = set(b_tokens)
-        overlap = len(jd_set & b_set)
-        coverage = overlap / max(len(b_set), 1)
+    # Only bullets sharing a term with the JD come back from the index;
+    # everything else scores exactly 0.0 and keeps inventory order below.
+    scored: List[Tuple[float, int, int]] = []
+    for doc_id, cosine, n_matched in index.search_counts(jd_tokens):
+        doc = index.doc(doc_id)
+        coverage = n_matched / max(len(doc.tf), 1)
         # Blend cosine and coverage. Cosine rewards rare-term hits;
         # coverage rewards bullets that touch many JD themes.
         score = 0.65 * cosine + 0.35 * coverage
         score = max(0.0, min(1.0, score))
-        matched_sorted = sorted(jd_set & b_set, key=lambda t: -idf.get(t, 1.0))
-        results.append(BulletScore(job, bullet, score, matched_sorted[:10]))
+        scored.append((score, doc.position, doc_id))
+
+    return _lexical_ranking(index, index.flat(), scored, jd_tokens, top_k, per_job_cap)
+
+
+def _lexical_ranking(
+    index: BulletIndex,
+    flat: List[Tuple[str, str, Sequence[int]]],
+    scored: List[Tuple[float, int, int]],
+    query_tokens: Sequence[int],
+    top_k: Optional[int],
+    per_job_cap: Optional[int],
+) -> RankedBullets:
+    """Select from ``(score, position, doc_id)`` index hits, then append zero-score bullets.
+
+    Bullets with no hit keep inventory order after the scored ones, under
+    the same limits. Matched keywords are rarest-first.
+    """
+    job_ids = _job_ids(flat) if per_job_cap is not None else ()
+    chosen = _select_scored(scored, job_ids, top_k, per_job_cap)
+
+    # Keyword annotation only for the bullets that survived selection.
+    # Terms are ranked once, rarest first; each bullet then walks its own
+    # (short) term list rather than the JD's.
+    query_terms = sorted(set(query_tokens), key=lambda t: (-index.idf(t), TOKENS.token(t)))
+    rank = {t: i for i, t in enumerate(query_terms)}
+    rows: List[Tuple[int, float, List[str]]] = []
+    for score, pos, doc_id in chosen:
+        matched = [t for t in index.doc(doc_id).tf if t in rank]
+        rows.append((pos, score, sorted(matched, key=rank.__getitem__)[:10]))
+
+    # Zero-score tail in inventory order, under the same limits.
+    limit = len(index) if top_k is None else top_k
+    if len(rows) < limit:
+        touched = {pos for _, pos, _ in scored}
+        per_job: Counter = Counter(job_ids[pos] for pos, _, _ in rows) if per_job_cap is not None else Counter()
+        for pos in range(len(index)):
+            if len(rows) >= limit:
+                break
+            if pos in touched:
+                continue
+            if per_job_cap is not None:
+                if per_job[job_ids[pos]] >= per_job_cap:
+                    continue
+                per_job[job_ids[pos]] += 1
+            rows.append((pos, 0.0, []))
+    return RankedBullets.from_rows(flat, rows, interned=True)
+
+
+# --------------------------------------------------------------------------
+# Backend: BM25 with phrase boosting (pure Python)
+# --------------------------------------------------------------------------
+# ``"provider": "bm25"``. A second BulletIndex holds each bullet's content
+# tokens plus its adjacent-word bigrams, so multi-word skills ("power bi",
+# "machine learning") match as phrases. A bigram hit is weighted by
+# ``llm.bm25_phrase_boost``. Only the postings of the JD's own terms are
+# walked.
+#
+# BM25 is unbounded. Scores are normalised so that a bullet matching the
+# JD's ten highest-weighted terms once, at average length, scores 1.0.
+# As in ``_local_rank``, the result is blended with coverage.
+
+_BM25_SYNCED: Tuple[Any, int] = (None, -1)
+
+
+def _bm25_terms(text: str) -> Tuple[int, ...]:
+    tok = tokenizer.get_tokenizer()
+    return tok.content_ids(text) + tok.bigram_ids(text)
+
+
+def _bm25_index(index: BulletIndex) -> BulletIndex:
+    """The phrase-aware index, synced to the same inventory as ``index``."""
+    global _BM25_SYNCED
+    memo_index, version = _BM25_SYNCED
+    if memo_index is not index or version != index.version:
+        inventory: Dict[str, List[str]] = {}
+        for job, bullet, _ in index.flat():
+            inventory.setdefault(job, []).append(bullet)
+        _BM25_INDEX.sync(inventory)
+        _BM25_SYNCED = (index, index.version)
+    return _BM25_INDEX
+
+
+def _bm25_rank(
+    jd_text: str,
+    index: BulletIndex,
+    cfg: Dict[str, Any],
+    top_k: Optional[int] = None,
+    per_job_cap: Optional[int] = None,
+) -> Sequence[BulletScore]:
+    bm25 = _bm25_index(index)
+    tok = tokenizer.get_tokenizer()
+    unigrams = tok.content_ids(jd_text)
+    bigrams = tok.bigram_ids(jd_text)
+    if not (unigrams or bigrams) or not len(bm25):
+        return []
+
+    k1, b = _bm25_params(cfg)
+    boosts = dict.fromkeys(bigrams, float(cfg.get("bm25_phrase_boost", 2.0)))
+    terms = list(dict.fromkeys(unigrams + bigrams))
+    # A JD bigram no bullet contains is usually just adjacent words
+    # ("senior data"), not a missing skill, so it doesn't raise the bar.
+    weights = sorted(
+        (bm25.bm25_idf(t) * boosts.get(t, 1.0) for t in terms if t not in boosts or bm25.df(t)),
+        reverse=True,
+    )
+    ideal = sum(weights[:10]) or 1.0
+
+    scored: List[Tuple[float, int, int]] = []
+    for doc_id, raw, n_matched in bm25.bm25(terms, k1, b, boosts):
+        doc = bm25.doc(doc_id)
+        coverage = n_matched / max(len(doc.tf), 1)
+        score = 0.65 * min(1.0, raw / ideal) + 0.35 * coverage
+        scored.append((max(0.0, min(1.0, score)), doc.position, doc_id))
+    # Bigrams score and boost, but matched keywords stay unigrams: they
+    # feed keyword coverage, which is measured against the JD's unigrams.
+    return _lexical_ranking(bm25, index.flat(), scored, unigrams, top_k, per_job_cap)
+
+
+# --------------------------------------------------------------------------
+# Shared plumbing for the embedding backends
+# --------------------------------------------------------------------------
+# Every embedding backend does the same two things: get one vector for the
+# JD plus one per bullet, then score by cosine. Bullet vectors come from
+# the on-disk cache (core.embedding_cache) wherever possible, so a ranking
+# only sends the JD and new/edited bullets to the model.
+
+def _embed_in_chunks(
+    texts: List[str],
+    embed: Callable[[List[str]], Optional[Any]],
+    chunk_size: int,
+    workers: int,
+    retries: int,
+) -> List[Optional[Any]]:
+    """Embed ``texts`` in chunks of ``chunk_size`` on a small thread pool.
+
+    Returns one vector per text, or ``None`` where the chunk covering that
+    text failed even after ``retries`` extra passes. Only failed chunks
+    are re-sent. A pass in which every chunk fails ends the retries early:
+    that means the backend is down, not that one chunk was unlucky.
+    The embed callables call the HTTP client with ``retries=0`` so these
+    passes are the only retry layer.
+    """
+    out: List[Optional[Any]] = [None] * len(texts)
+    chunk_size = max(1, int(chunk_size))
+    pending = [(s, min(s + chunk_size, len(texts))) for s in range(0, len(texts), chunk_size)]
+
+    def run(span: Tuple[int, int]) -> Optional[Any]:
+        start, end = span
+        try:
+            vecs = embed(texts[start:end])
+        except Exception as e:
+            logger.warning(f"Embedding chunk {start}-{end} failed: {e}")
+            return None
+        if vecs is None or len(vecs) != end - start:
+            return None
+        return vecs
+
+    for attempt in range(max(0, int(retries)) + 1):
+        if not pending:
+            break
+        if attempt:
+            logger.info(f"Retrying {len(pending)} failed embedding chunk(s) (attempt {attempt + 1}).")
+        if len(pending) == 1 or workers <= 1:
+            results = [run(span) for span in pending]
+        else:
+            with ThreadPoolExecutor(max_workers=min(int(workers), len(pending))) as pool:
+                results = list(pool.map(run, pending))
+        failed = []
+        for (start, end), vecs in zip(pending, results):
+            if vecs is None:
+                failed.append((start, end))
+            else:
+                out[start:end] = list(vecs)
+        if len(failed) == len(pending):
+            break
+        pending = failed
+    return out
+
+
+def _embed_texts(
+    texts: List[str],
+    embed: Callable[[List[str]], Optional[Any]],
+    chunked: bool,
+) -> Optional[List[Optional[Any]]]:
+    """One vector per text (``None`` entries for failed chunks), or ``None``.
+
+    ``chunked`` backends (the HTTP ones) are split per
+    ``llm.embed_chunk_size`` / ``embed_workers`` / ``embed_chunk_retries``;
+    the others get one call with everything.
+    """
+    if not chunked:
+        vectors = embed(texts)
+        if vectors is None or len(vectors) != len(texts):
+            return None
+        return vectors
+    cfg = user_config.llm_config() or {}
+    return _embed_in_chunks(
+        texts,
+        embed,
+        cfg.get("embed_chunk_size") or 128,
+        cfg.get("embed_workers") or 4,
+        cfg.get("embed_chunk_retries", 2),
+    )
+
+
+def _embed_with_cache(
+    backend: str,
+    model: str,
+    queries: List[str],
+    flat: List[Tuple[str, str, Sequence[int]]],
+    embed: Callable[[List[str]], Optional[Any]],
+    *,
+    chunked: bool = False,
+) -> Optional[Tuple[Any, Any]]:
+    """Return ``(query_vectors, bullet_vectors)``, embedding only cache misses.
+
+    ``queries`` are the JD texts (one or many); they are always embedded,
+    in the same backend call as the uncached bullets. ``embed`` maps a list
+    of texts to one vector per text (or ``None`` on failure). With
+    ``chunked`` the texts go out as parallel chunk requests (see
+    :func:`_embed_in_chunks`); if some chunks still fail, the bullets that
+    did embed are cached so the next attempt only sends the rest. With
+    NumPy installed both results come back as contiguous float32 matrices;
+    otherwise as lists of lists. Returns ``None`` if the backend call fails.
+    """
+    bullets = [bullet for _, bullet, _ in flat]
+    store = embedding_cache.get_store(backend, model)
+    matrix = None
+    cached: List[Optional[List[float]]] = [None] * len(bullets)
+    missing = list(range(len(bullets)))
+    if store is not None:
+        try:
+            with logger.span("embed.cache_read", bullets=len(bullets)):
+                if _np is not None:
+                    matrix, missing = store.get_matrix(bullets)
+                else:
+                    cached = store.get_many(bullets)
+                    missing = [i for i, vec in enumerate(cached) if vec is None]
+        except Exception as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+            matrix, missing = None, list(range(len(bullets)))
+
+    n_q = len(queries)
+    with logger.span("embed.backend", backend=backend, texts=n_q + len(missing)):
+        vectors = _embed_texts(list(queries) + [bullets[i] for i in missing], embed, chunked)
+    if vectors is None:
+        return None
+    if any(v is None for v in vectors):
+        _cache_partial(store, [bullets[i] for i in missing], vectors[n_q:])
+        return None
+
+    dim = len(vectors[0])
+    cached_dim = store.dim if store is not None else dim
+    if len(missing) < len(bullets) and cached_dim != dim:
+        # The model changed shape under the same name; the cache is stale.
+        missing = list(range(len(bullets)))
+        matrix = None
+        vectors = _embed_texts(list(queries) + bullets, embed, chunked)
+        if vectors is None or any(v is None for v in vectors):
+            return None
+
+    fresh = vectors[n_q:]
+    if store is not None and missing:
+        try:
+            with logger.span("embed.cache_write", bullets=len(missing)):
+                store.put_many([bullets[i] for i in missing], fresh)
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+    if missing:
+        logger.debug(f"{backend}: embedded {len(missing)} of {len(bullets)} bullets (rest cached).")
+
+    if _np is not None:
+        if matrix is None:
+            matrix = _np.zeros((len(bullets), dim), dtype=_np.float32)
+        if missing:
+            matrix[missing] = _np.asarray(fresh, dtype=_np.float32)
+        return _np.asarray(vectors[:n_q], dtype=_np.float32), matrix
+
+    for i, vec in zip(missing, fresh):
+        cached[i] = list(vec)
+    return [list(v) for v in vectors[:n_q]], cached
+
+
+def _cache_partial(store: Any, texts: List[str], vectors: List[Optional[Any]]) -> None:
+    """Cache the vectors that did come back from a partly failed batch."""
+    done = [(t, v) for t, v in zip(texts, vectors) if v is not None]
+    if store is None or not done:
+        return
+    try:
+        store.put_many([t for t, _ in done], [v for _, v in done])
+        logger.info(f"Cached {len(done)} of {len(texts)} embeddings before the batch failed.")
+    except Exception as e:
+        logger.warning(f"Embedding cache write failed: {e}")
+
+
+def _dense_similarities(query_vecs: Any, bullet_vecs: Any) -> Any:
+    """Cosine of every query vector against every bullet vector.
+
+    Returns one row of scores per query. With NumPy this is a single
+    matrix product over the ``(n_bullets, dim)`` float32 matrix; without
+    it, the pure-Python ``_cosine_dense`` loop.
+    """
+    if _np is None:
+        return [
+            [_cosine_dense(list(q), list(v)) for v in bullet_vecs]
+            for q in query_vecs
+        ]
+
+    matrix = _np.ascontiguousarray(bullet_vecs, dtype=_np.float32)
+    queries = _np.atleast_2d(_np.asarray(query_vecs, dtype=_np.float32))
+    if matrix.size == 0:
+        return _np.zeros((len(queries), len(matrix)), dtype=_np.float32)
+    norms = _np.linalg.norm(matrix, axis=1)
+    q_norms = _np.linalg.norm(queries, axis=1)
+    dots = queries @ matrix.T
+    denom = _np.outer(q_norms, norms)
+    out = _np.zeros_like(dots)
+    _np.divide(dots, denom, out=out, where=denom > 0)
+    return out
+
+
+def _top_indices(scores: Any, k: Optional[int] = None) -> List[int]:
+    """Indices of the ``k`` highest scores, best first (ties keep input order).
+
+    ``k=None`` orders everything. NumPy uses ``argpartition`` so only the
+    survivors are fully sorted.
+    """
+    n = len(scores)
+    if k is None or k > n:
+        k = n
+    if k <= 0:
+        return []
+    if _np is None:
+        return sorted(range(n), key=lambda i: -scores[i])[:k]
+
+    arr = _np.asarray(scores)
+    if k < n:
+        # argpartition picks arbitrarily among scores tied with the k-th
+        # best, so take everything at or above that score and let the
+        # lexsort below break the tie by position.
+        kth = arr[_np.argpartition(-arr, k - 1)[k - 1]]
+        candidates = _np.flatnonzero(arr >= kth)
+    else:
+        candidates = _np.arange(n)
+    order = _np.lexsort((candidates, -arr[candidates]))
+    return candidates[order][:k].tolist()
+
+
+def _rank_dense(
+    jd_text: str,
+    flat: List[Tuple[str, str, Sequence[int]]],
+    jd_vec: Any,
+    bullet_vecs: Any,
+    top_k: Optional[int] = None,
+) -> Sequence[BulletScore]:
+    return _rank_dense_many([jd_text], flat, [jd_vec], bullet_vecs, top_k=top_k)[0]
+
+
+def _rank_dense_many(
+    jd_texts: List[str],
+    flat: List[Tuple[str, str, Sequence[int]]],
+    query_vecs: Any,
+    bullet_vecs: Any,
+    top_k: Optional[int] = None,
+    per_job_cap: Optional[int] = None,
+    candidates: Optional[List[Any]] = None,
+    lexical: Optional["LexicalStage"] = None,
+) -> List[Sequence[BulletScore]]:
+    """Rank bullets by cosine similarity to each JD vector.
+
+    ``candidates`` (one position array per JD, from the ANN index)
+    restricts scoring to those bullets; the ranking then only contains
+    them. ``lexical`` (see :func:`_lexical_stage`) fuses BM25 into the
+    score and may add its own pre-filtered candidates.
+    """
+    job_ids = _job_ids(flat) if per_job_cap is not None else None
+    if lexical is not None:
+        candidates = _merge_candidates(candidates, lexical.candidates)
+    if candidates is None:
+        sim_rows = _dense_similarities(query_vecs, bullet_vecs)
+        picks = [None] * len(jd_texts)
+    else:
+        sim_rows = [
+            _dense_similarities(query_vecs[j:j + 1], _take(bullet_vecs, cand))[0]
+            for j, cand in enumerate(candidates)
+        ]
+        picks = candidates
+
+    rankings: List[Sequence[BulletScore]] = []
+    for j, (jd_text, sims, cand) in enumerate(zip(jd_texts, sim_rows, picks)):
+        if lexical is not None:
+            lex = lexical.scores[j]
+            sims = _fuse_scores(sims, lex if cand is None else _take(lex, cand), lexical.settings)
+        jd_tokens = set(_content_ids(jd_text))
+        rows: List[Tuple[int, float, List[str]]] = []
+        local_jobs = job_ids if cand is None or job_ids is None else [job_ids[c] for c in cand]
+        for k in _select_positions(sims, local_jobs, top_k, per_job_cap):
+            i = k if cand is None else int(cand[k])
+            if lexical is not None:
+                score = float(sims[k])  # fused scores are already in [0, 1]
+            else:
+                # Embeddings aren't all guaranteed normalised; cosine is in
+                # [-1, 1], squash to [0, 1].
+                score = (float(sims[k]) + 1.0) / 2.0
+            rows.append((i, score, sorted(jd_tokens.intersection(flat[i][2]), key=TOKENS.token)[:10]))
+        rankings.append(RankedBullets.from_rows(flat, rows, interned=True))
+    return rankings
+
+
+# --------------------------------------------------------------------------
+# Approximate nearest-neighbour search
+# --------------------------------------------------------------------------
+# Off by default. With ``llm.ann_index`` on and an inventory of at least
+# ``ann_min_bullets`` bullets, dense backends score only the bullets in
+# the ``ann_nprobe`` IVF lists nearest to each JD (see core/ann_index.py).
+# Smaller inventories always use exact search.
+#
+# The ANN path never loads the whole bullet matrix. The index is synced,
+# and its posting lists built, once per inventory change; after that a
+# ranking embeds the JDs, probes the centroids, and reads just the
+# candidate rows from the embedding cache.
+
+# (flat, index, bullets, postings) from the last sync.
+_ANN_MEMO: Tuple[Any, Any, List[str], List[Any]] = (None, None, [], [])
+
+
+def _ann_settings(cfg: Dict[str, Any], n_bullets: int) -> Optional[Tuple[int, int]]:
+    """``(nlist, nprobe)`` when ANN search applies, else ``None``."""
+    if not cfg.get("ann_index", False) or _np is None:
+        return None
+    if n_bullets < int(cfg.get("ann_min_bullets") or 5000):
+        return None
+    return int(cfg.get("ann_nlist") or 0), int(cfg.get("ann_nprobe") or 8)
+
+
+class _CandidateRows:
+    """Bullet vectors for a sorted subset of positions, indexed by position."""
+
+    def __init__(self, positions: Any, matrix: Any):
+        self.positions = positions
+        self.matrix = matrix
+        self.shape = (len(positions), matrix.shape[1])
+
+    def __getitem__(self, positions: Any) -> Any:
+        return self.matrix[_np.searchsorted(self.positions, positions)]
+
+
+def _ann_inputs(
+    store: Any,
+    index: Any,
+    nprobe: int,
+    queries: Sequence[str],
+    flat: List[Tuple[str, str, Sequence[int]]],
+    embed: Callable[[List[str]], Optional[Any]],
+    chunked: bool,
+    lexical: Optional["LexicalStage"],
+) -> Optional[Tuple[Any, Any, List[Any]]]:
+    """``(query_vecs, candidate_rows, candidates)`` via the IVF index.
+
+    Returns ``None`` if the backend call fails; raises if the index or
+    the cache does, so the caller can fall back to exact search.
+    """
+    global _ANN_MEMO
+    memo_flat, memo_index, bullets, postings = _ANN_MEMO
+    synced = memo_flat is flat and memo_index is index
+    if not synced:
+        bullets = [bullet for _, bullet, _ in flat]
+    missing = [] if synced else store.missing(bullets)
+
+    n_q = len(queries)
+    with logger.span("embed.backend", backend=store.backend, texts=n_q + len(missing)):
+        vectors = _embed_texts(list(queries) + [bullets[i] for i in missing], embed, chunked)
+    if vectors is None:
+        return None
+    if any(v is None for v in vectors):
+        _cache_partial(store, [bullets[i] for i in missing], vectors[n_q:])
+        return None
+    dim = len(vectors[0])
+    if store.dim and store.dim != dim:
+        raise ValueError("embedding size changed; the cache is stale")
+    if missing:
+        with logger.span("embed.cache_write", bullets=len(missing)):
+            store.put_many([bullets[i] for i in missing], vectors[n_q:])
+    query_vecs = _np.asarray(vectors[:n_q], dtype=_np.float32)
+
+    with logger.span("score.ann"):
+        if not synced:
+            keys = [embedding_cache.text_key(bullet) for bullet in bullets]
+            lists = index.sync(keys, lambda pos: store.get_matrix([bullets[i] for i in pos])[0])
+            postings = index.postings(lists)
+            _ANN_MEMO = (flat, index, bullets, postings)
+        candidates = index.candidates(postings, query_vecs, nprobe)
+    if lexical is not None:
+        candidates = _merge_candidates(candidates, lexical.candidates)
+
+    rows = _np.unique(_np.concatenate(candidates)) if candidates else _np.zeros(0, dtype=_np.int64)
+    texts = [bullets[i] for i in rows]
+    with logger.span("embed.cache_read", bullets=len(texts)):
+        matrix, gone = store.get_matrix(texts)
+    if matrix is None:
+        matrix = _np.zeros((len(texts), dim), dtype=_np.float32)
+    if gone:
+        # Evicted since the index was synced: embed them again.
+        fresh = _embed_texts([texts[i] for i in gone], embed, chunked)
+        if fresh is None or any(v is None for v in fresh):
+            return None
+        store.put_many([texts[i] for i in gone], fresh)
+        matrix[gone] = _np.asarray(fresh, dtype=_np.float32)
+    return query_vecs, _CandidateRows(rows, matrix), candidates
+
+
+def _dense_inputs(
+    backend: str,
+    model: str,
+    queries: Sequence[str],
+    flat: List[Tuple[str, str, Sequence[int]]],
+    embed: Callable[[List[str]], Optional[Any]],
+    *,
+    chunked: bool = False,
+    lexical: Optional["LexicalStage"] = None,
+) -> Optional[Tuple[Any, Any, Optional[List[Any]]]]:
+    """``(query_vecs, bullet_vecs, candidates)`` for :func:`_rank_dense_many`.
+
+    With ANN search on, ``candidates`` holds each JD's candidate positions
+    and ``bullet_vecs`` only their rows. Otherwise every bullet vector is
+    loaded and ``candidates`` is ``None``. Returns ``None`` if the backend
+    call fails.
+    """
+    settings = _ann_settings(user_config.llm_config() or {}, len(flat))
+    store = embedding_cache.get_store(backend, model) if settings is not None else None
+    index = ann_index.get_index(store.folder, settings[0]) if store is not None else None
+    if index is not None:
+        try:
+            return _ann_inputs(store, index, settings[1], queries, flat, embed, chunked, lexical)
+        except Exception as e:
+            logger.warning(f"ANN search failed ({e}); using exact search.")
+    embedded = _embed_with_cache(backend, model, queries, flat, embed, chunked=chunked)
+    if embedded is None:
+        return None
+    return embedded[0], embedded[1], None
+
+
+# --------------------------------------------------------------------------
+# Hybrid lexical + dense scoring
+# --------------------------------------------------------------------------
+# Off by default. With ``llm.hybrid`` set to "weighted" or "rrf", the
+# embedding backends also score BM25 over the bullet index and fuse the
+# two signals:
+#
+#   weighted  (w_dense * cosine_01 + w_lexical * bm25 / max_bm25) / (w_dense + w_lexical)
+#   rrf       reciprocal-rank fusion, w / (rrf_k + rank) per signal,
+#             scaled so a bullet ranked first by both scores 1.0
+#
+# ``hybrid_prefilter`` > 0 also lets the lexical stage pick candidates:
+# only the top-N BM25 bullets (plus any ANN candidates) are scored
+# densely, and the ranking then only contains them.
+
+class LexicalStage:
+    """BM25 scores (and optional candidates) for a batch of JDs.
+
+    The BM25 pass runs on first access to ``scores`` or ``candidates``, so
+    a dense backend that turns out to be unavailable never pays for it.
+    """
+
+    def __init__(
+        self,
+        jd_texts: List[str],
+        index: BulletIndex,
+        cfg: Dict[str, Any],
+        settings: Tuple[str, float, float, int, int],
+    ):
+        self.jd_texts = jd_texts
+        self.index = index
+        self.cfg = cfg
+        self.settings = settings[:4]
+        self.prefilter = settings[4]
+
+    @cached_property
+    def _computed(self) -> Tuple[List[Any], List[Optional[Any]]]:
+        k1, b = _bm25_params(self.cfg)
+        index = self.index
+        n = len(index)
+        scores: List[Any] = []
+        candidates: List[Optional[Any]] = []
+        with logger.span("score.bm25_lexical"):
+            for jd in self.jd_texts:
+                row = _np.zeros(n, dtype=_np.float64) if _np is not None else [0.0] * n
+                for doc_id, score, _ in index.bm25(_content_ids(jd), k1, b):
+                    row[index.doc(doc_id).position] = score
+                scores.append(row)
+                if 0 < self.prefilter < n:
+                    picked = sorted(_top_indices(row, self.prefilter))
+                    candidates.append(_np.asarray(picked, dtype=_np.int64) if _np is not None else picked)
+                else:
+                    candidates.append(None)
+        return scores, candidates
+
+    @property
+    def scores(self) -> List[Any]:
+        return self._computed[0]
+
+    @property
+    def candidates(self) -> List[Optional[Any]]:
+        return self._computed[1]
+
+
+def _hybrid_settings(cfg: Dict[str, Any]) -> Optional[Tuple[str, float, float, int, int]]:
+    """``(mode, w_dense, w_lexical, rrf_k, prefilter)`` when hybrid scoring applies."""
+    mode = str(cfg.get("hybrid") or "off").lower()
+    if mode not in ("weighted", "rrf"):
+        return None
+    return (
+        mode,
+        float(cfg.get("hybrid_dense_weight", 0.7)),
+        float(cfg.get("hybrid_lexical_weight", 0.3)),
+        int(cfg.get("hybrid_rrf_k") or 60),
+        int(cfg.get("hybrid_prefilter") or 0),
+    )
+
+
+def _bm25_params(cfg: Dict[str, Any]) -> Tuple[float, float]:
+    return float(cfg.get("bm25_k1", 1.2)), float(cfg.get("bm25_b", 0.75))
+
+
+def _lexical_stage(jd_texts: List[str], index: BulletIndex, cfg: Dict[str, Any]) -> Optional[LexicalStage]:
+    """The (lazy) BM25 stage for each JD, or ``None`` if hybrid is off."""
+    settings = _hybrid_settings(cfg)
+    if settings is None or not len(index):
+        return None
+    return LexicalStage(jd_texts, index, cfg, settings)
+
 
-    results.sort(key=lambda r: r.score, reverse=True)
-    return results
+def _take(values: Any, positions: Any) -> Any:
+    """``values[positions]`` for arrays and plain lists alike."""
+    if hasattr(values, "shape"):
+        return values[positions]
+    return [values[int(p)] for p in positions]
+
+
+def _merge_candidates(
+    ann: Optional[List[Any]],
+    lexical: List[Optional[Any]],
+) -> Optional[List[Any]]:
+    """Union of the ANN and lexical candidate sets per JD.
+
+    A stage that proposed nothing (``None``) doesn't restrict the other;
+    if neither proposed anything, every bullet is scored.
+    """
+    if ann is None and all(c is None for c in lexical):
+        return None
+    merged: List[Any] = []
+    for j, lex in enumerate(lexical):
+        dense = ann[j] if ann is not None else None
+        if dense is None or lex is None:
+            merged.append(lex if dense is None else dense)
+        elif _np is not None:
+            merged.append(_np.union1d(dense, lex))
+        else:
+            merged.append(sorted(set(dense) | set(lex)))
+    return merged
+
+
+def _fuse_scores(dense: Any, lexical: Any, settings: Tuple[str, float, float, int]) -> Any:
+    """Fused score in [0, 1] per bullet from cosine and BM25 scores."""
+    mode, w_dense, w_lexical, rrf_k = settings
+    total = (w_dense + w_lexical) or 1.0
+    n = len(dense)
+    if _np is not None:
+        d = _np.asarray(dense, dtype=_np.float64)
+        lex = _np.asarray(lexical, dtype=_np.float64)
+        if mode == "rrf":
+            positions = _np.arange(n)
+            d_rank = _np.empty(n, dtype=_np.float64)
+            d_rank[_np.lexsort((positions, -d))] = positions + 1
+            l_rank = _np.empty(n, dtype=_np.float64)
+            l_rank[_np.lexsort((positions, -lex))] = positions + 1
+            # Bullets BM25 never matched get no lexical vote.
+            fused = w_dense / (rrf_k + d_rank) + _np.where(lex > 0, w_lexical / (rrf_k + l_rank), 0.0)
+            return fused * (rrf_k + 1) / total
+        top = lex.max() if n else 0.0
+        lex_01 = lex / top if top > 0 else _np.zeros(n)
+        return (w_dense * (d + 1.0) / 2.0 + w_lexical * lex_01) / total
+
+    dense = [float(x) for x in dense]
+    lexical = [float(x) for x in lexical]
+    if mode == "rrf":
+        d_rank = [0] * n
+        for rank, i in enumerate(sorted(range(n), key=lambda i: -dense[i]), 1):
+            d_rank[i] = rank
+        l_rank = [0] * n
+        for rank, i in enumerate(sorted(range(n), key=lambda i: -lexical[i]), 1):
+            l_rank[i] = rank
+        return [
+            (w_dense / (rrf_k + d_rank[i]) + (w_lexical / (rrf_k + l_rank[i]) if lexical[i] > 0 else 0.0))
+            * (rrf_k + 1) / total
+            for i in range(n)
+        ]
+    top = max(lexical, default=0.0)
+    return [
+        (w_dense * (dense[i] + 1.0) / 2.0 + w_lexical * (lexical[i] / top if top > 0 else 0.0)) / total
+        for i in range(n)
+    ]
 
 
 # --------------------------------------------------------------------------
@@ -262,43 +1026,44 @@ def _load_sentence_transformer(model_name: str):
 
 
 def _rank_with_sentence_transformers(
-    jd_text: str,
-    flat: List[Tuple[str, str, List[str]]],
+    jd_texts: List[str],
+    flat: List[Tuple[str, str, Sequence[int]]],
     model_name: str,
-) -> Optional[List[BulletScore]]:
-    model = _load_sentence_transformer(model_name or "all-MiniLM-L6-v2")
-    if model is None:
-        return None
-
-    try:
-        texts = [jd_text] + [bullet for _, bullet, _ in flat]
-        embeddings = model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
-    except Exception as e:
-        logger.warning(f"sentence-transformers embed call failed: {e}")
-        return None
-
-    # `embeddings` is a numpy array; convert each row to a list.
-    try:
-        jd_vec = embeddings[0].tolist()
-    except AttributeError:
-        jd_vec = list(embeddings[0])
-
-    jd_tokens = set(_content_tokens(jd_text))
-
-    results: List[BulletScore] = []
-    for (job, bullet, b_tokens), vec in zip(flat, embeddings[1:]):
-        try:
-            v = vec.tolist()
-        except AttributeError:
-            v = list(vec)
-        # Normalised vectors -> dot product *is* cosine similarity, in [-1, 1].
-        sim = _cosine_dense(jd_vec, v)
-        sim_01 = (sim + 1.0) / 2.0
-        matched = sorted(jd_tokens & set(b_tokens))[:10]
-        results.append(BulletScore(job, bullet, sim_01, matched))
-
-    results.sort(key=lambda r: r.score, reverse=True)
-    return results
+    **limits: Any,
+) -> Optional[List[Sequence[BulletScore]]]:
+    model_name = model_name or "all-MiniLM-L6-v2"
+    embedded = None
+    worker = embed_worker.get_worker(model_name)
+    if worker is not None:
+        # Model already warm in the background process (llm.warm_model_process).
+        embedded = _dense_inputs(
+            "sentence_transformers", model_name, jd_texts, flat, worker.encode, lexical=limits.get("lexical"),
+        )
+        if embedded is None:
+            logger.info("Embedding worker unavailable; loading the model in-process.")
+
+    if embedded is None:
+        model = _load_sentence_transformer(model_name)
+        if model is None:
+            return None
+
+        def embed(texts: List[str]) -> Optional[Any]:
+            try:
+                embeddings = model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
+            except Exception as e:
+                logger.warning(f"sentence-transformers embed call failed: {e}")
+                return None
+            # `embeddings` is already a float32 numpy array; keep it that way.
+            return embeddings
+
+        embedded = _dense_inputs(
+            "sentence_transformers", model_name, jd_texts, flat, embed, lexical=limits.get("lexical"),
+        )
+        if embedded is None:
+            return None
+    query_vecs, bullet_vecs, candidates = embedded
+    with logger.span("score.dense"):
+        return _rank_dense_many(jd_texts, flat, query_vecs, bullet_vecs, candidates=candidates, **limits)
 
 
 # --------------------------------------------------------------------------
@@ -319,21 +1084,13 @@ def _ollama_embed_batch(
 
     Returns ``None`` if Ollama is not reachable.
     """
-    import json
-    import urllib.request
-    import urllib.error
-
     url = host.rstrip("/") + "/api/embed"
-    body = json.dumps({"model": model, "input": inputs}).encode("utf-8")
-    req = urllib.request.Request(
-        url, data=body,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
     try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.URLError as e:
+        # retries=0: _embed_in_chunks re-sends failed chunks itself.
+        payload = http_client.shared_client().request_json(
+            "POST", url, {"model": model, "input": inputs}, timeout=60, retries=0,
+        )
+    except OSError as e:
         logger.warning(
             f"Ollama unreachable at {host} â€” is the daemon running? ({e}). "
             "Falling back to local TF-IDF."
@@ -351,64 +1108,46 @@ def _ollama_embed_batch(
 
 
 def _rank_with_ollama(
-    jd_text: str,
-    flat: List[Tuple[str, str, List[str]]],
+    jd_texts: List[str],
+    flat: List[Tuple[str, str, Sequence[int]]],
     model: str,
     host: str,
-) -> Optional[List[BulletScore]]:
+    **limits: Any,
+) -> Optional[List[Sequence[BulletScore]]]:
     if not flat:
-        return []
-    inputs = [jd_text] + [bullet for _, bullet, _ in flat]
-    vectors = _ollama_embed_batch(inputs, model or "nomic-embed-text", host or "http://localhost:11434")
-    if vectors is None or len(vectors) != len(inputs):
+        return [[] for _ in jd_texts]
+    model = model or "nomic-embed-text"
+    host = host or "http://localhost:11434"
+    embedded = _dense_inputs(
+        "ollama", model, jd_texts, flat,
+        lambda inputs: _ollama_embed_batch(inputs, model, host),
+        chunked=True, lexical=limits.get("lexical"),
+    )
+    if embedded is None:
         return None
-
-    jd_vec = vectors[0]
-    jd_tokens = set(_content_tokens(jd_text))
-
-    results: List[BulletScore] = []
-    for (job, bullet, b_tokens), v in zip(flat, vectors[1:]):
-        sim = _cosine_dense(jd_vec, v)
-        # Ollama embeddings aren't guaranteed normalised; squash to [0,1].
-        sim_01 = (sim + 1.0) / 2.0
-        matched = sorted(jd_tokens & set(b_tokens))[:10]
-        results.append(BulletScore(job, bullet, sim_01, matched))
-
-    results.sort(key=lambda r: r.score, reverse=True)
-    return results
+    query_vecs, bullet_vecs, candidates = embedded
+    with logger.span("score.dense"):
+        return _rank_dense_many(jd_texts, flat, query_vecs, bullet_vecs, candidates=candidates, **limits)
 
 
 # --------------------------------------------------------------------------
 # Backend: OpenAI (opt-in, paid)
 # --------------------------------------------------------------------------
 
-def _rank_with_openai(
-    jd_text: str,
-    flat: List[Tuple[str, str, List[str]]],
+def _openai_embed_batch(
+    inputs: List[str],
     model: str,
     api_key: str,
-) -> Optional[List[BulletScore]]:
-    import json
-    import urllib.request
-
-    if not flat:
-        return []
-    inputs = [jd_text] + [bullet for _, bullet, _ in flat]
-    body = json.dumps({
-        "input": inputs,
-        "model": model or "text-embedding-3-small",
-    }).encode("utf-8")
-    req = urllib.request.Request(
-        "https://api.openai.com/v1/embeddings", data=body,
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
-    )
+) -> Optional[List[List[float]]]:
+    """Call OpenAI's /v1/embeddings and return one vector per input."""
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
+        payload = http_client.shared_client().request_json(
+            "POST", "https://api.openai.com/v1/embeddings",
+            {"input": inputs, "model": model},
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=30,
+            retries=0,  # _embed_in_chunks re-sends failed chunks itself
+        )
     except Exception as e:
         logger.warning(f"OpenAI embedding call failed: {e}")
         return None
@@ -416,20 +1155,29 @@ def _rank_with_openai(
     data = payload.get("data") or []
     if len(data) != len(inputs):
         return None
-    vectors = [item["embedding"] for item in data]
-
-    jd_vec = vectors[0]
-    jd_tokens = set(_content_tokens(jd_text))
+    return [item["embedding"] for item in data]
 
-    results: List[BulletScore] = []
-    for (job, bullet, b_tokens), v in zip(flat, vectors[1:]):
-        sim = _cosine_dense(jd_vec, v)
-        sim_01 = (sim + 1.0) / 2.0
-        matched = sorted(jd_tokens & set(b_tokens))[:10]
-        results.append(BulletScore(job, bullet, sim_01, matched))
 
-    results.sort(key=lambda r: r.score, reverse=True)
-    return results
+def _rank_with_openai(
+    jd_texts: List[str],
+    flat: List[Tuple[str, str, Sequence[int]]],
+    model: str,
+    api_key: str,
+    **limits: Any,
+) -> Optional[List[Sequence[BulletScore]]]:
+    if not flat:
+        return [[] for _ in jd_texts]
+    model = model or "text-embedding-3-small"
+    embedded = _dense_inputs(
+        "openai", model, jd_texts, flat,
+        lambda inputs: _openai_embed_batch(inputs, model, api_key),
+        chunked=True, lexical=limits.get("lexical"),
+    )
+    if embedded is None:
+        return None
+    query_vecs, bullet_vecs, candidates = embedded
+    with logger.span("score.dense"):
+        return _rank_dense_many(jd_texts, flat, query_vecs, bullet_vecs, candidates=candidates, **limits)
 
 
 # --------------------------------------------------------------------------
@@ -446,6 +1194,212 @@ def _resolve_backend(force_local: bool) -> Tuple[str, Dict[str, Any]]:
     return provider, cfg
 
 
+def _rank_many(
+    jd_texts: List[str],
+    index: BulletIndex,
+    provider: str,
+    cfg: Dict[str, Any],
+    top_k: Optional[int] = None,
+    per_job_cap: Optional[int] = None,
+) -> Tuple[List[Sequence[BulletScore]], str]:
+    """Rank every JD with ``provider``, falling back to local TF-IDF.
+
+    Returns ``(rankings, backend_label)``. Embedding backends embed the
+    whole batch of JDs in one call against one set of bullet vectors.
+    ``top_k`` / ``per_job_cap`` limit each ranking during selection (see
+    :func:`_select_scored`). With ``llm.hybrid`` on, embedding backends
+    also fuse in BM25 scores from ``index`` (see :func:`_lexical_stage`).
+    """
+    flat = index.flat()
+    limits: Dict[str, Any] = {"top_k": top_k, "per_job_cap": per_job_cap}
+    suffix = ""
+    if provider in _DEFAULT_MODELS:
+        # Lazy: only scored once the dense backend has produced embeddings.
+        lexical = _lexical_stage(jd_texts, index, cfg)
+        if lexical is not None:
+            limits["lexical"] = lexical
+            suffix = f" + BM25 {lexical.settings[0]}"
+
+    if provider == "sentence_transformers":
+        model = cfg.get("model") or "all-MiniLM-L6-v2"
+        rankings = _rank_with_sentence_transformers(jd_texts, flat, model, **limits)
+        if rankings is not None:
+            return rankings, f"sentence-transformers ({model}){suffix}"
+        logger.info("sentence-transformers unavailable; falling back to local TF-IDF.")
+
+    elif provider == "ollama":
+        model = cfg.get("model") or "nomic-embed-text"
+        host = cfg.get("host") or "http://localhost:11434"
+        rankings = _rank_with_ollama(jd_texts, flat, model, host, **limits)
+        if rankings is not None:
+            return rankings, f"ollama ({model}){suffix}"
+        logger.info("Ollama unavailable; falling back to local TF-IDF.")
+
+    elif provider == "bm25":
+        with logger.span("score.bm25"):
+            return [_bm25_rank(jd, index, cfg, top_k, per_job_cap) for jd in jd_texts], "local BM25"
+
+    elif provider == "openai":
+        api_key = cfg.get("api_key") or ""
+        model = cfg.get("model") or "text-embedding-3-small"
+        if api_key:
+            rankings = _rank_with_openai(jd_texts, flat, model, api_key, **limits)
+            if rankings is not None:
+                return rankings, f"openai ({model}){suffix}"
+        logger.info("OpenAI backend not usable; falling back to local TF-IDF.")
+
+    with logger.span("score.tfidf"):
+        return [_local_rank(jd, index, top_k, per_job_cap) for jd in jd_texts], "local TF-IDF"
+
+
+# --------------------------------------------------------------------------
+# Result cache
+# --------------------------------------------------------------------------
+# Finished rankings for embedding backends are memoised on disk (see
+# core/jd_result_cache.py), keyed by the normalised JD, the inventory
+# fingerprint and backend:model. The local TF-IDF and BM25 rankers are
+# already instant and are not cached. Fallback results are never stored, so a cache entry can't
+# hide a backend that has since come back.
+
+_LEXICAL_PROVIDERS = ("local", "bm25")
+
+_DEFAULT_MODELS = {
+    "sentence_transformers": "all-MiniLM-L6-v2",
+    "ollama": "nomic-embed-text",
+    "openai": "text-embedding-3-small",
+}
+
+
+def _ranking_cache_key(
+    jd_text: str,
+    index: BulletIndex,
+    provider: str,
+    cfg: Dict[str, Any],
+    limits: Tuple[Optional[int], Optional[int]] = (None, None),
+) -> str:
+    model = cfg.get("model") or _DEFAULT_MODELS.get(provider, "")
+    parts = ["ranking", index.fingerprint(), f"{provider}:{model}"]
+    if limits != (None, None):
+        # Truncated rankings live under their own key; full ones keep the old key.
+        parts.append("top_k={}:per_job_cap={}".format(*limits))
+    if tokenizer.get_tokenizer().stemming:
+        parts.append("stem")
+    dtype = cfg.get("embedding_cache_dtype") or "float32"
+    if provider not in _LEXICAL_PROVIDERS and dtype != "float32":
+        # Quantised cached vectors score slightly differently.
+        parts.append(f"dtype={dtype}")
+    ann = _ann_settings(cfg, len(index))
+    if ann is not None:
+        parts.append("ivf={}:{}".format(*ann))
+    hybrid = _hybrid_settings(cfg)
+    if hybrid is not None:
+        parts.append("hybrid={}:{}:{}:{}:{}".format(*hybrid) + ":bm25={}:{}".format(*_bm25_params(cfg)))
+    return jd_result_cache.result_key(jd_text, *parts)
+
+
+def _cached_ranking(
+    jd_text: str,
+    index: BulletIndex,
+    provider: str,
+    cfg: Dict[str, Any],
+    limits: Tuple[Optional[int], Optional[int]] = (None, None),
+) -> Optional[Tuple[Sequence[BulletScore], Dict[str, Any], str]]:
+    """``(ranked, fit, backend_label)`` from the result cache, or ``None``."""
+    if provider in _LEXICAL_PROVIDERS:
+        return None
+    cache = jd_result_cache.get_cache()
+    if cache is None:
+        return None
+    try:
+        record = cache.get(_ranking_cache_key(jd_text, index, provider, cfg, limits))
+    except Exception as e:
+        logger.warning(f"JD result cache read failed: {e}")
+        return None
+    if not record:
+        return None
+    try:
+        ranked = RankedBullets.from_record(record["ranked"], index.flat())
+        return ranked, record["fit"], record["backend"]
+    except (KeyError, IndexError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable cached ranking: {e}")
+        return None
+
+
+def _as_ranked(ranked: Sequence[BulletScore], index: BulletIndex) -> RankedBullets:
+    """``ranked`` as a :class:`RankedBullets` over the index's flat list."""
+    flat = index.flat()
+    if isinstance(ranked, RankedBullets) and ranked.flat is flat:
+        return ranked
+    positions: Dict[Tuple[str, str], int] = {}
+    for pos, (job, bullet, _) in enumerate(flat):
+        positions.setdefault((job, bullet), pos)
+    return RankedBullets.from_rows(
+        flat,
+        ((positions[(r.job_title, r.bullet)], r.score, r.matched_keywords) for r in ranked),
+    )
+
+
+def _store_ranking(
+    jd_text: str,
+    index: BulletIndex,
+    provider: str,
+    cfg: Dict[str, Any],
+    ranked: Sequence[BulletScore],
+    fit: Dict[str, Any],
+    backend: str,
+    limits: Tuple[Optional[int], Optional[int]] = (None, None),
+) -> None:
+    cache = jd_result_cache.get_cache()
+    if cache is None:
+        return
+    record = {
+        "backend": backend,
+        "fit": fit,
+        "ranked": _as_ranked(ranked, index).to_record(),
+    }
+    try:
+        cache.put(_ranking_cache_key(jd_text, index, provider, cfg, limits), "ranking", record)
+    except Exception as e:
+        logger.warning(f"JD result cache write failed: {e}")
+
+
+def _rank_many_cached(
+    jd_texts: List[str],
+    index: BulletIndex,
+    provider: str,
+    cfg: Dict[str, Any],
+    top_k: Optional[int] = None,
+    per_job_cap: Optional[int] = None,
+) -> Tuple[List[Sequence[BulletScore]], List[Dict[str, Any]], str]:
+    """:func:`_rank_many` plus fit scores, served from the result cache.
+
+    Returns ``(rankings, fits, backend_label)``. Only the JDs that miss
+    the cache are sent to the backend. Fit scores describe the rankings
+    as returned, so callers that show a fit should not pass limits.
+    """
+    limits = (top_k, per_job_cap)
+    rankings: List[Optional[Sequence[BulletScore]]] = [None] * len(jd_texts)
+    fits: List[Optional[Dict[str, Any]]] = [None] * len(jd_texts)
+    label = "local TF-IDF"
+    with logger.span("cache.rankings"):
+        for i, jd in enumerate(jd_texts):
+            hit = _cached_ranking(jd, index, provider, cfg, limits)
+            if hit is not None:
+                rankings[i], fits[i], label = hit
+
+    misses = [i for i, ranked in enumerate(rankings) if ranked is None]
+    if misses:
+        fresh, label = _rank_many([jd_texts[i] for i in misses], index, provider, cfg, top_k, per_job_cap)
+        cacheable = provider not in _LEXICAL_PROVIDERS and label != "local TF-IDF"
+        for i, ranked in zip(misses, fresh):
+            rankings[i] = ranked
+            with logger.span("fit"):
+                fits[i] = compute_fit_score(jd_texts[i], ranked, backend=label)
+            if cacheable:
+                _store_ranking(jd_texts[i], index, provider, cfg, ranked, fits[i], label, limits)
+    return rankings, fits, label  # type: ignore[return-value]
+
+
 # --------------------------------------------------------------------------
 # Public entry points
 # --------------------------------------------------------------------------
@@ -455,13 +1409,63 @@ def _resolve_backend(force_local: bool) -> Tuple[str, Dict[str, Any]]:
 # downgraded if e.g. sentence-transformers isn't installed.)
 _LAST_BACKEND_USED = "local TF-IDF"
 
+# Process-wide inverted index over the inventory. Synced on every ranking,
+# but only bullets that were added or removed since the last call are
+# re-tokenised, so repeat rankings skip straight to scoring.
+_BULLET_INDEX = BulletIndex(_content_ids)
+
+# Same inventory with bigrams, for the "bm25" provider (see _bm25_index).
+_BM25_INDEX = BulletIndex(_bm25_terms)
+
+# Last configured-inventory version whose removals were applied to the
+# embedding cache.
+_PRUNED_VERSION: Optional[int] = None
+
+
+def _inventory(
+    inventory: Optional[Dict[str, List[str]]],
+) -> Tuple[Dict[str, List[str]], Optional[int]]:
+    """``(inventory, version)``; the version is only known for the configured inventory."""
+    if inventory is not None:
+        return inventory, None
+    return user_config.job_positions() or {}, user_config.inventory_version()
+
+
+def _sync_index(inventory: Dict[str, List[str]], version: Optional[int]) -> None:
+    """Sync the shared index. If the configured inventory changed, drop
+    the cached embeddings of bullets that left it."""
+    global _PRUNED_VERSION
+    with logger.span("tokenise.index"):
+        changed = _BULLET_INDEX.sync(inventory, version)
+    if not changed or version is None:
+        return
+    since, _PRUNED_VERSION = _PRUNED_VERSION, version
+    if since is None:
+        return  # first sync this run; earlier removals age out through LRU
+    diff = user_config.inventory_diff(since)
+    if not diff:
+        return
+    gone = {text for _, _, text in diff.removed} | {old for _, _, old, _ in diff.edited}
+    gone.difference_update(bullet for _, bullet, _ in _BULLET_INDEX.flat())
+    provider, cfg = _resolve_backend(False)
+    if not gone or provider not in _DEFAULT_MODELS:
+        return
+    store = embedding_cache.get_store(provider, cfg.get("model") or _DEFAULT_MODELS[provider])
+    if store is not None:
+        try:
+            store.discard(sorted(gone))
+        except Exception as e:
+            logger.warning(f"Embedding cache prune failed: {e}")
+
 
 def rank_bullets(
     jd_text: str,
     inventory: Optional[Dict[str, List[str]]] = None,
     *,
     force_local: bool = False,
-) -> List[BulletScore]:
+    top_k: Optional[int] = None,
+    per_job_cap: Optional[int] = None,
+) -> Sequence[BulletScore]:
     """Rank bullets against a JD using the configured backend.
 
     Parameters
@@ -473,60 +1477,137 @@ def rank_bullets(
     force_local : bool
         If True, skip every backend except the dependency-free TF-IDF
         ranker. Useful for tests and for the "Force local" UI toggle.
+    top_k : int, optional
+        Return only the ``top_k`` best bullets.
+    per_job_cap : int, optional
+        Return at most this many bullets per job.
+
+        Both limits are applied while selecting, with bounded heaps, so
+        bullets that don't make the cut never get keyword annotations or
+        result objects. The result equals the full ranking filtered to
+        ``per_job_cap`` per job and then cut to ``top_k``. Compute fit
+        scores from a full ranking; coverage changes when bullets are
+        dropped.
+
+    Returns
+    -------
+    Sequence[BulletScore]
+        Best first. Normally a :class:`core.ranked_bullets.RankedBullets`,
+        which stores the ranking in arrays and builds each ``BulletScore``
+        only when it is accessed.
     """
     global _LAST_BACKEND_USED
 
-    if inventory is None:
-        inventory = user_config.job_positions() or {}
+    inventory, version = _inventory(inventory)
     if not jd_text or not jd_text.strip() or not inventory:
         _LAST_BACKEND_USED = "local TF-IDF"
         return []
 
-    # Pre-tokenise the inventory once â€” every backend uses it for keyword
-    # match annotations even when scoring with embeddings.
-    flat: List[Tuple[str, str, List[str]]] = []
-    for job, bullets in inventory.items():
-        for bullet in bullets:
-            flat.append((job, bullet, _content_tokens(bullet)))
-
+    # The index holds pre-tokenised bullets â€” every backend uses them for
+    # keyword match annotations even when scoring with embeddings.
+    _sync_index(inventory, version)
     provider, cfg = _resolve_backend(force_local)
+    rankings, _, _LAST_BACKEND_USED = _rank_many_cached(
+        [jd_text], _BULLET_INDEX, provider, cfg, top_k, per_job_cap,
+    )
+    return rankings[0]
 
-    if provider == "sentence_transformers":
-        model = cfg.get("model") or "all-MiniLM-L6-v2"
-        ranked = _rank_with_sentence_transformers(jd_text, flat, model)
-        if ranked is not None:
-            _LAST_BACKEND_USED = f"sentence-transformers ({model})"
-            return ranked
-        logger.info("sentence-transformers unavailable; falling back to local TF-IDF.")
 
-    elif provider == "ollama":
-        model = cfg.get("model") or "nomic-embed-text"
-        host = cfg.get("host") or "http://localhost:11434"
-        ranked = _rank_with_ollama(jd_text, flat, model, host)
-        if ranked is not None:
-            _LAST_BACKEND_USED = f"ollama ({model})"
-            return ranked
-        logger.info("Ollama unavailable; falling back to local TF-IDF.")
+def rank_bullets_batch(
+    jds: Sequence[str],
+    inventory: Optional[Dict[str, List[str]]] = None,
+    *,
+    force_local: bool = False,
+) -> List[Dict[str, Any]]:
+    """Rank many job descriptions against the inventory in one call.
 
-    elif provider == "openai":
-        api_key = cfg.get("api_key") or ""
-        model = cfg.get("model") or "text-embedding-3-small"
-        if api_key:
-            ranked = _rank_with_openai(jd_text, flat, model, api_key)
-            if ranked is not None:
-                _LAST_BACKEND_USED = f"openai ({model})"
-                return ranked
-        logger.info("OpenAI backend not usable; falling back to local TF-IDF.")
+    Tokenisation and IDF come from the shared inverted index, and bullet
+    embeddings are fetched once for the whole batch; embedding backends
+    receive every JD in a single request. Returns one dict per JD, in
+    input order::
+
+        {"ranked": [BulletScore, ...], "fit": {...compute_fit_score...}}
+
+    Blank JDs get an empty ranking and a zero fit.
+    """
+    global _LAST_BACKEND_USED
+
+    inventory, version = _inventory(inventory)
+    jds = list(jds)
+    live = [i for i, jd in enumerate(jds) if jd and jd.strip()]
+    results: List[Optional[Dict[str, Any]]] = [None] * len(jds)
+
+    if live and inventory:
+        _sync_index(inventory, version)
+        provider, cfg = _resolve_backend(force_local)
+        ranked_live, fits_live, _LAST_BACKEND_USED = _rank_many_cached(
+            [jds[i] for i in live], _BULLET_INDEX, provider, cfg
+        )
+        for i, ranked, fit in zip(live, ranked_live, fits_live):
+            results[i] = {"ranked": ranked, "fit": fit}
+    else:
+        _LAST_BACKEND_USED = "local TF-IDF"
+
+    return [
+        result if result is not None else {"ranked": [], "fit": compute_fit_score(jd, [])}
+        for jd, result in zip(jds, results)
+    ]
 
+
+def rank_bullets_progressive(
+    jd_text: str,
+    inventory: Optional[Dict[str, List[str]]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Rank in stages so the UI can show something immediately.
+
+    Yields ``{"ranked": [...], "fit": {...}, "final": bool}``:
+
+    1. The instant local TF-IDF ranking (``final=False``), only when an
+       embedding backend is configured and the result isn't cached.
+    2. The configured backend's ranking (``final=True``). If that backend
+       is unavailable, this is the TF-IDF ranking again.
+    """
+    global _LAST_BACKEND_USED
+
+    inventory, version = _inventory(inventory)
+    if not jd_text or not jd_text.strip() or not inventory:
+        _LAST_BACKEND_USED = "local TF-IDF"
+        yield {"ranked": [], "fit": compute_fit_score(jd_text, []), "final": True}
+        return
+
+    _sync_index(inventory, version)
+    provider, cfg = _resolve_backend(False)
+
+    hit = _cached_ranking(jd_text, _BULLET_INDEX, provider, cfg)
+    if hit is not None:
+        ranked, fit, _LAST_BACKEND_USED = hit
+        yield {"ranked": ranked, "fit": fit, "final": True}
+        return
+
+    if provider == "bm25":
+        # As instant as the TF-IDF preview; no second stage needed.
+        rankings, fits, _LAST_BACKEND_USED = _rank_many_cached([jd_text], _BULLET_INDEX, provider, cfg)
+        yield {"ranked": rankings[0], "fit": fits[0], "final": True}
+        return
+
+    with logger.span("score.tfidf_preview"):
+        preview = _local_rank(jd_text, _BULLET_INDEX)
     _LAST_BACKEND_USED = "local TF-IDF"
-    return _local_rank(jd_text, flat)
+    if provider == "local":
+        yield {"ranked": preview, "fit": compute_fit_score(jd_text, preview), "final": True}
+        return
+    yield {"ranked": preview, "fit": compute_fit_score(jd_text, preview), "final": False}
+
+    rankings, fits, _LAST_BACKEND_USED = _rank_many_cached([jd_text], _BULLET_INDEX, provider, cfg)
+    yield {"ranked": rankings[0], "fit": fits[0], "final": True}
 
 
 def compute_fit_score(
     jd_text: str,
-    ranked: List[BulletScore],
+    ranked: Sequence[BulletScore],
     *,
     strong_threshold: float = 0.55,
+    backend: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Aggregate "how well does the user's inventory cover this JD?".
 
@@ -550,45 +1631,15 @@ def compute_fit_score(
     None of these alone is enough: a CV could have one great bullet but
     miss most of the JD themes (low coverage), or it could mention all
     the keywords shallowly (low semantic match).
-    """
-    if not ranked:
-        return {
-            "fit_score": 0.0,
-            "strong_matches": 0,
-            "considered": 0,
-            "keyword_coverage": 0.0,
-            "backend": _LAST_BACKEND_USED,
-        }
-
-    scores = [r.score for r in ranked]
-    best = scores[0] if scores else 0.0
-    top_n = scores[:5]
-    top_avg = sum(top_n) / max(len(top_n), 1)
-    strong = sum(1 for s in scores if s >= strong_threshold)
-
-    jd_keywords = set(_content_tokens(jd_text))
-    if jd_keywords:
-        covered = set()
-        for r in ranked:
-            for kw in r.matched_keywords:
-                covered.add(kw)
-        keyword_coverage = len(covered) / len(jd_keywords)
-    else:
-        keyword_coverage = 0.0
 
-    # Weighted aggregate. Best-bullet matters most (it's what the recruiter
-    # actually sees at the top of the CV), top-N average smooths out
-    # outliers, keyword coverage catches "did you address the role at all?".
-    fit = 0.45 * best + 0.30 * top_avg + 0.25 * keyword_coverage
-    fit = max(0.0, min(1.0, fit))
-
-    return {
-        "fit_score": fit,
-        "strong_matches": strong,
-        "considered": len(ranked),
-        "keyword_coverage": keyword_coverage,
-        "backend": _LAST_BACKEND_USED,
-    }
+    ``backend`` labels the result; it defaults to the backend that
+    produced the most recent ranking. Callers that also need keywords or
+    a recommendation prompt should build one :class:`JDAnalysis` and use
+    its ``fit`` instead.
+    """
+    return JDAnalysis(
+        jd_text, ranked, backend=backend, strong_threshold=strong_threshold,
+    ).fit
 
 
 def _candidate_jd_keywords(jd_text: str, limit: int = 20) -> List[str]:
@@ -601,72 +1652,152 @@ def _candidate_jd_keywords(jd_text: str, limit: int = 20) -> List[str]:
     return [term for term, _ in ranked[:limit]]
 
 
-def _ollama_generate_recommendations(
-    jd_text: str,
-    ranked: List[BulletScore],
-    *,
-    host: str,
-    model: str,
-    max_items: int,
-) -> Optional[List[str]]:
-    """Ask a local Ollama model for concise CV improvement suggestions."""
-    import json
-    import urllib.error
-    import urllib.request
-
-    fit = compute_fit_score(jd_text, ranked)
-    top = ranked[:8]
-    top_lines = []
-    for item in top:
-        top_lines.append(
+# --------------------------------------------------------------------------
+# JD analysis: fit, keywords and prompt inputs, computed once
+# --------------------------------------------------------------------------
+
+class JDAnalysis:
+    """Everything derived from one JD and its ranking, computed at most once.
+
+    The fit score, the GUI's "missing keywords" list and the
+    recommendation prompt all need the JD's tokens and the set of JD
+    keywords the ranking covers. Each of them used to recompute those.
+    Build one ``JDAnalysis`` per ranking and pass it to
+    :func:`generate_match_recommendations` /
+    :func:`stream_match_recommendations`.
+
+    ``fit`` may be passed in when it is already known, e.g. from
+    :func:`rank_bullets_progressive` or the result cache.
+    """
+
+    def __init__(
+        self,
+        jd_text: str,
+        ranked: Sequence[BulletScore],
+        *,
+        fit: Optional[Dict[str, Any]] = None,
+        backend: Optional[str] = None,
+        strong_threshold: float = 0.55,
+    ):
+        self.jd_text = jd_text
+        self.ranked = ranked
+        self.backend = backend or _LAST_BACKEND_USED
+        self.strong_threshold = strong_threshold
+        self._prompts: Dict[int, str] = {}
+        if fit is not None:
+            self.__dict__["fit"] = fit
+
+    @cached_property
+    def jd_ids(self) -> Tuple[int, ...]:
+        """The JD's content tokens as interned ids."""
+        with logger.span("tokenise.jd"):
+            return _content_ids(self.jd_text)
+
+    @cached_property
+    def keywords(self) -> List[str]:
+        """Most important JD keywords, most frequent first."""
+        return _candidate_jd_keywords(self.jd_text, limit=24)
+
+    @cached_property
+    def covered_ids(self) -> set:
+        """Ids of every keyword matched by any ranked bullet."""
+        if isinstance(self.ranked, RankedBullets):
+            return set(self.ranked.kw_ids)
+        intern = TOKENS.intern
+        return {intern(kw) for r in self.ranked for kw in r.matched_keywords}
+
+    @cached_property
+    def covered(self) -> set:
+        token = TOKENS.token
+        return {token(t) for t in self.covered_ids}
+
+    @cached_property
+    def fit(self) -> Dict[str, Any]:
+        """See :func:`compute_fit_score`."""
+        ranked = self.ranked
+        if not ranked:
+            return {
+                "fit_score": 0.0,
+                "strong_matches": 0,
+                "considered": 0,
+                "keyword_coverage": 0.0,
+                "backend": self.backend,
+            }
+
+        # Columnar rankings answer this from their score array without
+        # materialising a BulletScore per bullet.
+        scores = ranked.scores if isinstance(ranked, RankedBullets) else [r.score for r in ranked]
+        best = scores[0] if scores else 0.0
+        top_n = scores[:5]
+        top_avg = sum(top_n) / max(len(top_n), 1)
+        strong = sum(1 for s in scores if s >= self.strong_threshold)
+
+        jd_keywords = set(self.jd_ids)
+        covered = self.covered_ids & jd_keywords
+        keyword_coverage = len(covered) / len(jd_keywords) if jd_keywords else 0.0
+
+        # Weighted aggregate. Best-bullet matters most (it's what the recruiter
+        # actually sees at the top of the CV), top-N average smooths out
+        # outliers, keyword coverage catches "did you address the role at all?".
+        fit = 0.45 * best + 0.30 * top_avg + 0.25 * keyword_coverage
+        fit = max(0.0, min(1.0, fit))
+
+        return {
+            "fit_score": fit,
+            "strong_matches": strong,
+            "considered": len(ranked),
+            "keyword_coverage": keyword_coverage,
+            "backend": self.backend,
+        }
+
+    def missing_keywords(self, limit: int = 12) -> List[str]:
+        """Important JD keywords no ranked bullet mentions."""
+        covered = self.covered
+        return [kw for kw in self.keywords if kw not in covered][:limit]
+
+    @cached_property
+    def top_lines(self) -> List[Dict[str, Any]]:
+        """The top 8 bullets as the prompt shows them."""
+        return [
             {
                 "job": item.job_title,
                 "score": round(item.score, 3),
                 "bullet": item.bullet[:280],
                 "matched": item.matched_keywords[:6],
             }
-        )
-
-    jd_keywords = _candidate_jd_keywords(jd_text, limit=24)
-    covered = set()
-    for item in ranked:
-        covered.update(item.matched_keywords)
-    missing = [kw for kw in jd_keywords if kw not in covered][:8]
-    prompt = (
-        "You are a CV optimization assistant. "
-        "Given a job description and scored CV bullets, return concise, actionable fixes. "
-        f"Return ONLY valid JSON in this shape: {{\"recommendations\": [\"...\"]}} "
-        f"with 1 to {max_items} items. "
-        "Each item must be one sentence, practical, and specific.\n\n"
-        f"Fit score: {int(round(fit['fit_score'] * 100))}%\n"
-        f"Missing keywords: {', '.join(missing) if missing else 'none'}\n"
-        f"Top scored bullets JSON: {json.dumps(top_lines, ensure_ascii=False)}\n"
-        f"Job description: {jd_text[:2500]}"
-    )
-
-    payload = json.dumps(
-        {
-            "model": model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {"temperature": 0.2},
+            for item in self.ranked[:8]
+        ]
+
+    def prompt(self, max_items: int) -> str:
+        """The Ollama prompt asking for CV improvement suggestions."""
+        prompt = self._prompts.get(max_items)
+        if prompt is None:
+            missing = self.missing_keywords(limit=8)
+            prompt = self._prompts[max_items] = (
+                "You are a CV optimization assistant. "
+                "Given a job description and scored CV bullets, return concise, actionable fixes. "
+                f"Return ONLY valid JSON in this shape: {{\"recommendations\": [\"...\"]}} "
+                f"with 1 to {max_items} items. "
+                "Each item must be one sentence, practical, and specific.\n\n"
+                f"Fit score: {int(round(self.fit['fit_score'] * 100))}%\n"
+                f"Missing keywords: {', '.join(missing) if missing else 'none'}\n"
+                f"Top scored bullets JSON: {json.dumps(self.top_lines, ensure_ascii=False)}\n"
+                f"Job description: {self.jd_text[:2500]}"
+            )
+        return prompt
+
+    def recommendation_payload(self, recommendations: List[str], model: str, max_items: int) -> Dict[str, Any]:
+        return {
+            "recommendations": recommendations[:max_items],
+            "source": f"local-llm (ollama:{model})",
+            "missing_keywords": self.missing_keywords(),
+            "fit_score": self.fit.get("fit_score", 0.0),
         }
-    ).encode("utf-8")
-    url = host.rstrip("/") + "/api/generate"
-    req = urllib.request.Request(
-        url,
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
 
-    try:
-        with urllib.request.urlopen(req, timeout=90) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-    except (urllib.error.URLError, TimeoutError, ValueError):
-        return None
 
-    text = (data.get("response") or "").strip()
+def _parse_recommendations(text: str, max_items: int) -> Optional[List[str]]:
+    """Turn the model's reply into a list of recommendation strings."""
+    text = (text or "").strip()
     if not text:
         return None
 
@@ -685,58 +1816,193 @@ def _ollama_generate_recommendations(
     return lines[:max_items] if lines else None
 
 
+def _ollama_generate_recommendations(
+    prompt: str,
+    *,
+    host: str,
+    model: str,
+    max_items: int,
+) -> Optional[List[str]]:
+    """Ask a local Ollama model for concise CV improvement suggestions."""
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+        "options": {"temperature": 0.2},
+    }
+    url = host.rstrip("/") + "/api/generate"
+
+    try:
+        data = http_client.shared_client().request_json("POST", url, payload, timeout=90)
+    except (OSError, ValueError):
+        return None
+
+    return _parse_recommendations(data.get("response") or "", max_items)
+
+
+def _ollama_stream_generate(prompt: str, *, host: str, model: str) -> Iterator[str]:
+    """Yield response fragments from Ollama's /api/generate in stream mode.
+
+    Ollama answers ``stream: true`` with one JSON object per line, each
+    carrying the next ``response`` fragment, until ``done`` is true.
+    Raises ``OSError``/``ValueError`` if the daemon can't be reached.
+    """
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": True,
+        "options": {"temperature": 0.2},
+    }
+    lines = http_client.shared_client().stream_lines(
+        "POST", host.rstrip("/") + "/api/generate", payload, timeout=90,
+    )
+    # No early break on ``done``: it is the last line anyway, and letting
+    # stream_lines reach the end of the body returns the connection to the
+    # keep-alive pool instead of closing it.
+    for raw in lines:
+        chunk = json.loads(raw.decode("utf-8"))
+        fragment = chunk.get("response") or ""
+        if fragment:
+            yield fragment
+
+
+def _recommendation_model() -> Tuple[str, str]:
+    """Return ``(host, model)`` for the recommendation LLM."""
+    cfg = user_config.llm_config() or {}
+    host = (cfg.get("host") or "http://localhost:11434").rstrip("/")
+
+    model = cfg.get("recommendation_model") or cfg.get("model") or "llama3.2:3b"
+    if "embed" in model.lower():
+        model = "llama3.2:3b"
+    return host, model
+
+
+def _recommendation_cache_key(analysis: JDAnalysis, max_items: int, model: str) -> str:
+    # The prompt carries the JD and the top-ranked bullets, so keying on it
+    # (plus the model) invalidates the entry whenever the LLM would see
+    # different input.
+    return jd_result_cache.result_key(analysis.prompt(max_items), "recommendations", model)
+
+
+def _cached_recommendations(key: str) -> Optional[Dict[str, Any]]:
+    cache = jd_result_cache.get_cache()
+    if cache is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning(f"JD result cache read failed: {e}")
+        return None
+
+
+def _store_recommendations(key: str, payload: Dict[str, Any]) -> None:
+    cache = jd_result_cache.get_cache()
+    if cache is None:
+        return
+    try:
+        cache.put(key, "recommendations", payload)
+    except Exception as e:
+        logger.warning(f"JD result cache write failed: {e}")
+
+
 def generate_match_recommendations(
     jd_text: str,
-    ranked: List[BulletScore],
+    ranked: Sequence[BulletScore],
     *,
     max_items: int = 5,
+    analysis: Optional[JDAnalysis] = None,
 ) -> Dict[str, Any]:
     """Return actionable CV improvements from a local LLM only.
 
     No heuristic fallback is used. If Ollama/local model is unavailable,
-    this function raises RuntimeError.
+    this function raises RuntimeError. Successful answers are memoised in
+    the JD result cache. Pass the ranking's :class:`JDAnalysis` to reuse
+    its fit and keywords.
     """
     if not ranked:
         raise RuntimeError("No ranked bullets available for local LLM recommendations.")
 
-    cfg = user_config.llm_config() or {}
-    host = (cfg.get("host") or "http://localhost:11434").rstrip("/")
+    analysis = analysis or JDAnalysis(jd_text, ranked)
+    host, model = _recommendation_model()
+    cache_key = _recommendation_cache_key(analysis, max_items, model)
+    cached = _cached_recommendations(cache_key)
+    if cached is not None:
+        return cached
+
+    prompt = analysis.prompt(max_items)
+    with logger.span("recommendations.llm", model=model):
+        llm_recs = _ollama_generate_recommendations(
+            prompt,
+            host=host,
+            model=model,
+            max_items=max_items,
+        )
+    if not llm_recs:
+        raise RuntimeError(
+            f"Local LLM recommendations unavailable via Ollama model '{model}' at {host}."
+        )
 
-    model = cfg.get("recommendation_model") or cfg.get("model") or "llama3.2:3b"
-    if "embed" in model.lower():
-        model = "llama3.2:3b"
+    payload = analysis.recommendation_payload(llm_recs, model, max_items)
+    _store_recommendations(cache_key, payload)
+    return payload
 
-    jd_keywords = _candidate_jd_keywords(jd_text, limit=24)
-    covered = set()
-    for item in ranked:
-        covered.update(item.matched_keywords)
-    missing = [kw for kw in jd_keywords if kw not in covered][:12]
-
-    llm_recs = _ollama_generate_recommendations(
-        jd_text,
-        ranked,
-        host=host,
-        model=model,
-        max_items=max_items,
-    )
+
+def stream_match_recommendations(
+    jd_text: str,
+    ranked: Sequence[BulletScore],
+    *,
+    max_items: int = 5,
+    analysis: Optional[JDAnalysis] = None,
+) -> Iterator[Tuple[str, Any]]:
+    """Streaming variant of :func:`generate_match_recommendations`.
+
+    Yields ``("token", fragment)`` as the local LLM writes its answer
+    (Ollama ``stream: true``), then a single ``("done", payload)`` where
+    ``payload`` has the same shape as ``generate_match_recommendations``.
+    A cached answer is yielded as the ``done`` event straight away, with no
+    tokens. Raises RuntimeError if the local model is unavailable.
+    ``analysis`` is reused as in :func:`generate_match_recommendations`.
+    """
+    if not ranked:
+        raise RuntimeError("No ranked bullets available for local LLM recommendations.")
+
+    analysis = analysis or JDAnalysis(jd_text, ranked)
+    host, model = _recommendation_model()
+    cache_key = _recommendation_cache_key(analysis, max_items, model)
+    cached = _cached_recommendations(cache_key)
+    if cached is not None:
+        yield "done", cached
+        return
+
+    prompt = analysis.prompt(max_items)
+    pieces: List[str] = []
+    try:
+        with logger.span("recommendations.llm", model=model, stream=True):
+            for fragment in _ollama_stream_generate(prompt, host=host, model=model):
+                pieces.append(fragment)
+                yield "token", fragment
+    except (OSError, ValueError) as e:
+        raise RuntimeError(
+            f"Local LLM recommendations unavailable via Ollama model '{model}' at {host}. ({e})"
+        )
+
+    llm_recs = _parse_recommendations("".join(pieces), max_items)
     if not llm_recs:
         raise RuntimeError(
             f"Local LLM recommendations unavailable via Ollama model '{model}' at {host}."
         )
-
-    return {
-        "recommendations": llm_recs[:max_items],
-        "source": f"local-llm (ollama:{model})",
-        "missing_keywords": missing,
-        "fit_score": compute_fit_score(jd_text, ranked).get("fit_score", 0.0),
-    }
+    payload = analysis.recommendation_payload(llm_recs, model, max_items)
+    _store_recommendations(cache_key, payload)
+    yield "done", payload
 
 
 def top_bullets_per_job(
-    ranked: List[BulletScore],
+    ranked: Sequence[BulletScore],
     per_job_cap: int = 5,
 ) -> Dict[str, List[BulletScore]]:
     """Bucket the flat ranking by job, keeping the top N within each job."""
+    if isinstance(ranked, RankedBullets):
+        return ranked.top_per_job(per_job_cap)
     buckets: Dict[str, List[BulletScore]] = {}
     for item in ranked:
         bucket = buckets.setdefault(item.job_title, [])
@@ -759,8 +2025,10 @@ def backend_status() -> Dict[str, Any]:
           "local_llm_installed": True,        # sentence-transformers importable
           "ollama_reachable": False,          # http://localhost:11434 responds
           "openai_key_set": False,
-          "active": "sentence_transformers (all-MiniLM-L6-v2)"
+          "active": "sentence_transformers (all-MiniLM-L6-v2)",
                                               # the backend that will actually run
+          "model_worker": {"state": "ready", "model": "all-MiniLM-L6-v2", ...}
+                                              # warm-model process, or None
         }
 
     Used by the GUI to decide whether to show an "Install Local LLM" button
@@ -770,25 +2038,26 @@ def backend_status() -> Dict[str, Any]:
     cfg = user_config.llm_config() or {}
     configured = (cfg.get("provider") or "local").lower()
 
-    # Probe sentence-transformers.
+    # Probe sentence-transformers. A warm model in the background process
+    # already proves it is installed, and importing it here would pull
+    # torch into the GUI process, which the worker exists to avoid.
+    model_worker = embed_worker.worker_status()
     local_llm_installed = False
-    try:
-        import importlib
-        importlib.import_module("sentence_transformers")
+    if model_worker and model_worker["state"] in ("starting", "ready"):
         local_llm_installed = True
-    except Exception:
-        local_llm_installed = False
-
-    # Probe Ollama.
-    ollama_reachable = False
-    try:
-        import urllib.request
-        host = (cfg.get("host") or "http://localhost:11434").rstrip("/")
-        req = urllib.request.Request(host + "/api/tags", method="GET")
-        with urllib.request.urlopen(req, timeout=1.5) as resp:
-            ollama_reachable = resp.status == 200
-    except Exception:
-        ollama_reachable = False
+    else:
+        try:
+            import importlib
+            importlib.import_module("sentence_transformers")
+            local_llm_installed = True
+        except Exception:
+            local_llm_installed = False
+
+    # Probe Ollama. The shared client remembers the last answer (from this
+    # probe or any real Ollama call) for ``llm.health_ttl`` seconds, so
+    # reopening the JD panel doesn't block on the network every time.
+    host = (cfg.get("host") or "http://localhost:11434").rstrip("/")
+    ollama_reachable = http_client.shared_client().probe(host + "/api/tags", timeout=1.5)
 
     openai_key_set = bool(cfg.get("api_key"))
 
@@ -797,6 +2066,8 @@ def backend_status() -> Dict[str, Any]:
         active = f"sentence-transformers ({cfg.get('model') or 'all-MiniLM-L6-v2'})"
     elif configured == "ollama" and ollama_reachable:
         active = f"ollama ({cfg.get('model') or 'nomic-embed-text'})"
+    elif configured == "bm25":
+        active = "local BM25"
     elif configured == "openai" and openai_key_set:
         active = f"openai ({cfg.get('model') or 'text-embedding-3-small'})"
     else:
@@ -808,6 +2079,7 @@ def backend_status() -> Dict[str, Any]:
         "ollama_reachable": ollama_reachable,
         "openai_key_set": openai_key_set,
         "active": active,
+        "model_worker": model_worker,
     }
 
 
@@ -824,7 +2096,8 @@ if __name__ == "__main__":
         sys.exit(0)
 
     ranked = rank_bullets(sample_jd, inv)
-    fit = compute_fit_score(sample_jd, ranked)
+    analysis = JDAnalysis(sample_jd, ranked)
+    fit = analysis.fit
     print(f"Backend used: {fit['backend']}")
     print(f"Overall fit:  {fit['fit_score']*100:.0f}%")
     print(f"Strong matches: {fit['strong_matches']} / {fit['considered']}\n")
@@ -834,3 +2107,5 @@ if __name__ == "__main__":
         if r.matched_keywords:
             print(f"         matched: {', '.join(r.matched_keywords)}")
         print()
+    missing = analysis.missing_keywords()
+    print(f"Missing JD keywords: {', '.join(missing) if missing else 'none'}")
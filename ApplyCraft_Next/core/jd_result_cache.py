@@ -0,0 +1,177 @@
+"""
+core/jd_result_cache.py
+------------------------
+Memoised results for "Rank Against JD".
+
+Users often click Rank several times on the same pasted posting while
+tweaking bullets. Without this cache, every click re-ran the embedding
+backend and the (up to 90s) Ollama recommendation call, even when nothing
+had changed. :class:`JDResultCache` stores finished results in SQLite
+(``jd_results.db``, next to ``application_stats.db``) under keys built by
+:func:`result_key`, e.g.::
+
+    sha256(normalised JD, inventory fingerprint, backend:model)
+
+:mod:`core.jd_ranker` stores two kinds of record:
+
+* ``ranking`` — the columnar ranking (see :mod:`core.ranked_bullets`),
+  fit score and backend label
+* ``recommendations`` — the LLM recommendation payload, keyed by the exact
+  prompt and recommendation model
+
+Payloads are zlib-compressed JSON. When the stored payloads exceed
+``max_bytes``, the least-recently-used records are evicted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+import zlib
+from typing import Any, Optional
+
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.dirname(_current_dir)
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from helpers import user_config          # noqa: E402
+from helpers.logger import logger        # noqa: E402
+
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalise_jd(text: str) -> str:
+    """Canonical form of a pasted JD for cache keys.
+
+    Unicode is NFKC-normalised and whitespace runs collapse to one space,
+    so re-pasting the same posting with different line breaks still hits.
+    Case is kept because embedding models are case-sensitive.
+    """
+    return _WS_RE.sub(" ", unicodedata.normalize("NFKC", text or "")).strip()
+
+
+def result_key(jd_text: str, *parts: str) -> str:
+    """SHA-256 over the normalised JD plus any extra key parts."""
+    h = hashlib.sha256(normalise_jd(jd_text).encode("utf-8"))
+    for part in parts:
+        h.update(b"\x1f")
+        h.update(str(part).encode("utf-8"))
+    return h.hexdigest()
+
+
+class JDResultCache:
+    """SQLite-backed, size-bounded LRU store of JSON-able results."""
+
+    def __init__(self, db_file: str, max_bytes: int = 32 * 1024 * 1024):
+        self.db_file = db_file
+        self.max_bytes = max(1, int(max_bytes))
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, kind TEXT NOT NULL, payload BLOB NOT NULL,"
+                " size INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_results_lru ON results(last_used)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for ``key``, or ``None`` on a miss."""
+        with self._lock:
+            row = self.conn.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            try:
+                value = json.loads(zlib.decompress(row[0]).decode("utf-8"))
+            except (zlib.error, ValueError) as e:
+                logger.warning(f"Dropping unreadable JD cache entry: {e}")
+                with self.conn:
+                    self.conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            return value
+
+    def put(self, key: str, kind: str, value: Any) -> None:
+        """Store ``value`` (JSON-serialisable) and evict down to ``max_bytes``."""
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO results(key, kind, payload, size, created, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, kind, blob, len(blob), now, now),
+                )
+                self._evict()
+
+    def _evict(self) -> None:
+        (total,) = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self.conn.execute("SELECT key, size FROM results ORDER BY last_used ASC"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM results WHERE key = ?", victims)
+
+    def total_bytes(self) -> int:
+        (total,) = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+        return total
+
+    def clear(self) -> None:
+        with self._lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM results")
+
+    def __len__(self) -> int:
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self.conn.close()
+            except Exception as e:
+                logger.error(f"Error closing JD result cache {self.db_file}: {e}")
+
+
+# --------------------------------------------------------------------------
+# Shared instance
+# --------------------------------------------------------------------------
+
+_cache: Optional[JDResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[JDResultCache]:
+    """Return the shared cache, or ``None`` if ``llm.jd_result_cache`` is off."""
+    global _cache
+    cfg = user_config.llm_config() or {}
+    if not cfg.get("jd_result_cache", True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = JDResultCache(
+                    os.path.join(_project_root, "jd_results.db"),
+                    max_bytes=int((cfg.get("jd_result_cache_max_mb") or 32) * 1024 * 1024),
+                )
+            except Exception as e:
+                logger.warning(f"JD result cache unavailable ({e}); ranking without it.")
+                return None
+        return _cache
@@ -0,0 +1,499 @@
+"""
+core/outputs_watcher.py
+-----------------------
+Keep the application tracker current by watching ``outputs/``.
+
+Without a watcher the audit panel only learns about generated or deleted
+application folders from :meth:`StatsManager.scan_outputs`, run at
+startup and on **Refresh**. With ``tracker.watch_outputs`` on, an
+:class:`OutputsWatcher` thread follows the tree instead:
+
+* On Linux it uses inotify (through ``ctypes``, no extra dependency),
+  watching the root, every date folder and every company folder.
+* Elsewhere, or if inotify is unavailable or out of watches, it polls:
+  date folders are re-listed only when their mtime changes, and company
+  folders are stat'ed to notice CVs written into them.
+
+Both backends report :class:`FolderEvent` ``created`` / ``deleted`` /
+``renamed`` / ``changed`` events. The watcher collects them until the tree
+has been quiet for ``watch_debounce`` seconds (or ``watch_max_delay`` has
+passed) and hands the touched folders to
+:meth:`StatsManager.apply_folder_changes`, which upserts and deletes just
+those rows in a single transaction.
+
+``StatsManager``'s cache is not thread-safe, so a GUI passes ``dispatch``
+(e.g. ``lambda fn: widget.after(0, fn)``) and each batch is applied on
+the Tk thread instead of the watcher thread.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.dirname(_current_dir)
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from helpers import user_config          # noqa: E402
+from helpers.logger import logger        # noqa: E402
+
+
+class FolderEvent(NamedTuple):
+    """One change under ``outputs/``; paths are relative, '/'-separated."""
+
+    kind: str                   # "created", "deleted", "renamed", "changed" or "overflow"
+    path: str
+    dest: Optional[str] = None  # new path of a rename
+
+
+def _folder_keys(event: FolderEvent) -> List[Tuple[str, Optional[str]]]:
+    """``(date_folder, company_folder)`` pairs an event touches.
+
+    Files below a company folder map to that folder; a bare date folder
+    maps to ``(date, None)``.
+    """
+    keys = []
+    for path in (event.path, event.dest):
+        if not path:
+            continue
+        parts = path.split("/")
+        keys.append((parts[0], parts[1] if len(parts) > 1 else None))
+    return keys
+
+
+# --------------------------------------------------------------------------
+# inotify backend
+# --------------------------------------------------------------------------
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+_WATCH_MASK = (
+    _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO
+    | _IN_CLOSE_WRITE | _IN_DELETE_SELF | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+# Deeper levels (files inside company folders) are reported by the
+# company folder's own watch, so nothing below depth 2 is watched.
+_MAX_DEPTH = 2
+
+
+class _InotifyBackend:
+    """Recursive inotify watch of the date and company folders."""
+
+    name = "inotify"
+
+    def __init__(self, root: str):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.root = root
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths: Dict[int, str] = {}  # watch descriptor -> relative path ("" = root)
+        try:
+            self._watch_tree("")
+        except OSError:
+            self.close()
+            raise
+
+    def _watch(self, rel: str) -> None:
+        path = os.path.join(self.root, *rel.split("/")) if rel else self.root
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return  # vanished before we got to it
+            raise OSError(err, f"inotify_add_watch failed for {path}: {os.strerror(err)}")
+        self._paths[wd] = rel
+
+    def _watch_tree(self, rel: str) -> None:
+        self._watch(rel)
+        depth = len(rel.split("/")) if rel else 0
+        if depth >= _MAX_DEPTH:
+            return
+        path = os.path.join(self.root, *rel.split("/")) if rel else self.root
+        try:
+            with os.scandir(path) as it:
+                children = [e.name for e in it if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for name in children:
+            if depth == 0 and "-" not in name:
+                continue
+            self._watch_tree(f"{rel}/{name}" if rel else name)
+
+    def _watch_new(self, rel: str) -> None:
+        try:
+            self._watch_tree(rel)
+        except OSError as e:
+            # Typically ENOSPC (fs.inotify.max_user_watches); the folder's
+            # rows are still refreshed, later changes inside it are missed.
+            logger.warning(f"Could not watch {rel}: {e}")
+
+    def _forget(self, rel: str) -> None:
+        prefix = rel + "/"
+        for wd, path in list(self._paths.items()):
+            if path == rel or path.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                self._paths.pop(wd, None)
+
+    def _moved(self, old: str, new: str) -> None:
+        prefix = old + "/"
+        for wd, path in list(self._paths.items()):
+            if path == old:
+                self._paths[wd] = new
+            elif path.startswith(prefix):
+                self._paths[wd] = new + path[len(old):]
+
+    def read(self, timeout: float) -> List[FolderEvent]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events: List[FolderEvent] = []
+        moves: Dict[int, Tuple[str, bool]] = {}  # cookie -> (old path, is dir)
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                events.append(FolderEvent("overflow", ""))
+                continue
+            if mask & _IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            parent = self._paths.get(wd)
+            if parent is None or mask & _IN_DELETE_SELF:
+                continue
+            if not parent and "-" not in name:
+                continue  # only date folders matter at the top level
+            rel = f"{parent}/{name}" if parent else name
+            is_dir = bool(mask & _IN_ISDIR)
+            depth = rel.count("/") + 1
+
+            if mask & _IN_MOVED_FROM:
+                moves[cookie] = (rel, is_dir)
+            elif mask & _IN_MOVED_TO:
+                old = moves.pop(cookie, None)
+                if old is not None:
+                    if old[1]:
+                        self._moved(old[0], rel)
+                    events.append(FolderEvent("renamed", old[0], rel))
+                else:
+                    if is_dir and depth <= _MAX_DEPTH:
+                        self._watch_new(rel)
+                    events.append(FolderEvent("created", rel))
+            elif mask & _IN_CREATE:
+                if is_dir and depth <= _MAX_DEPTH:
+                    # Anything created inside before the watch existed is
+                    # caught by re-reading the folder when the batch is applied.
+                    self._watch_new(rel)
+                events.append(FolderEvent("created", rel))
+            elif mask & _IN_DELETE:
+                events.append(FolderEvent("deleted", rel))
+            else:
+                events.append(FolderEvent("changed", rel))
+
+        for old, is_dir in moves.values():
+            # Moved out of the tree (or the pair straddles two reads).
+            if is_dir:
+                self._forget(old)
+            events.append(FolderEvent("deleted", old))
+        return events
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = -1
+        self._paths.clear()
+
+
+# --------------------------------------------------------------------------
+# Polling backend
+# --------------------------------------------------------------------------
+
+
+class _PollingBackend:
+    """Snapshot diffing for platforms (or trees) inotify can't cover."""
+
+    name = "polling"
+
+    def __init__(self, root: str, interval: float, stop: threading.Event):
+        self.root = root
+        self.interval = max(0.1, float(interval))
+        self._stop = stop
+        self._dates: Dict[str, int] = {}                 # date -> mtime_ns
+        self._companies: Dict[str, Dict[str, int]] = {}  # date -> {company: mtime_ns}
+        self._next_poll = 0.0
+        self._primed = False
+        self._snapshot()  # baseline; only later differences are reported
+        self._primed = True
+
+    def _list_companies(self, date: str) -> Dict[str, int]:
+        companies = {}
+        try:
+            with os.scandir(os.path.join(self.root, date)) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        try:
+                            companies[entry.name] = entry.stat().st_mtime_ns
+                        except OSError:
+                            pass
+        except OSError:
+            pass
+        return companies
+
+    def _snapshot(self) -> List[FolderEvent]:
+        events: List[FolderEvent] = []
+        try:
+            with os.scandir(self.root) as it:
+                dates = {}
+                for entry in it:
+                    if "-" in entry.name and entry.is_dir():
+                        try:
+                            dates[entry.name] = entry.stat().st_mtime_ns
+                        except OSError:
+                            pass
+        except OSError:
+            dates = {}
+
+        for date in self._dates.keys() - dates.keys():
+            self._companies.pop(date, None)
+            events.append(FolderEvent("deleted", date))
+
+        for date, mtime_ns in dates.items():
+            known = self._companies.get(date)
+            if known is None:
+                self._companies[date] = self._list_companies(date)
+                if self._primed:
+                    events.append(FolderEvent("created", date))
+                continue
+
+            if self._dates.get(date) != mtime_ns:
+                current = self._list_companies(date)
+                for name in known.keys() - current.keys():
+                    events.append(FolderEvent("deleted", f"{date}/{name}"))
+                for name in current.keys() - known.keys():
+                    events.append(FolderEvent("created", f"{date}/{name}"))
+            else:
+                current = {}
+                for name in known:
+                    try:
+                        current[name] = os.stat(os.path.join(self.root, date, name)).st_mtime_ns
+                    except OSError:
+                        current[name] = -1
+            for name, mtime_ns_company in current.items():
+                if name in known and known[name] != mtime_ns_company:
+                    events.append(FolderEvent("changed", f"{date}/{name}"))
+            self._companies[date] = current
+
+        self._dates = dates
+        return events
+
+    def read(self, timeout: float) -> List[FolderEvent]:
+        wait = self._next_poll - time.monotonic()
+        if wait > 0:
+            if self._stop.wait(min(wait, timeout)) or wait > timeout:
+                return []
+        self._next_poll = time.monotonic() + self.interval
+        return self._snapshot()
+
+    def close(self) -> None:
+        self._dates.clear()
+        self._companies.clear()
+
+
+# --------------------------------------------------------------------------
+# Watcher
+# --------------------------------------------------------------------------
+
+
+class OutputsWatcher:
+    """Background thread feeding folder changes into a ``StatsManager``."""
+
+    def __init__(
+        self,
+        stats_manager: Any,
+        *,
+        backend: str = "auto",
+        debounce: float = 0.5,
+        max_delay: float = 5.0,
+        poll_interval: float = 5.0,
+        on_change: Optional[Callable[[int], None]] = None,
+        dispatch: Optional[Callable[[Callable[[], None]], Any]] = None,
+    ):
+        self.stats_manager = stats_manager
+        self.root = stats_manager.outputs_dir
+        self.backend_name = (backend or "auto").lower()
+        self.debounce = max(0.0, float(debounce))
+        self.max_delay = max(self.debounce, float(max_delay))
+        self.poll_interval = poll_interval
+        self.on_change = on_change
+        self.dispatch = dispatch
+        self.state = "stopped"
+        self.error = ""
+        self.batches = 0
+        self.events = 0
+        self._backend: Any = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _open_backend(self) -> Any:
+        if self.backend_name in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                return _InotifyBackend(self.root)
+            except (OSError, AttributeError) as e:
+                # AttributeError: libc without inotify symbols.
+                logger.warning(f"inotify unavailable for {self.root} ({e}); polling instead.")
+        return _PollingBackend(self.root, self.poll_interval, self._stop)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        os.makedirs(self.root, exist_ok=True)
+        self._stop.clear()
+        self._backend = self._open_backend()
+        self.state, self.error = "watching", ""
+        self._thread = threading.Thread(target=self._run, name="applycraft-outputs-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.root} for application changes ({self._backend.name}).")
+
+    def _run(self) -> None:
+        pending: Set[Tuple[str, Optional[str]]] = set()
+        rescan = False
+        first_at = last_at = 0.0
+        try:
+            while not self._stop.is_set():
+                timeout = self.debounce if (pending or rescan) else 0.5
+                events = self._backend.read(timeout)
+                now = time.monotonic()
+                if events:
+                    if not pending and not rescan:
+                        first_at = now
+                    last_at = now
+                    self.events += len(events)
+                    for event in events:
+                        if event.kind == "overflow":
+                            rescan = True
+                        else:
+                            pending.update(_folder_keys(event))
+                if (pending or rescan) and (
+                    now - last_at >= self.debounce or now - first_at >= self.max_delay
+                ):
+                    self._flush(pending, rescan)
+                    pending, rescan = set(), False
+        except Exception as e:
+            self.state, self.error = "failed", f"{type(e).__name__}: {e}"
+            logger.error(f"Outputs watcher stopped: {e}")
+            return
+        finally:
+            self._backend.close()
+        self.state = "stopped"
+
+    def _flush(self, folders: Iterable[Tuple[str, Optional[str]]], rescan: bool = False) -> None:
+        if self.dispatch is None:
+            self._apply(folders, rescan)
+            return
+        folders = list(folders)
+        try:
+            self.dispatch(lambda: self._apply(folders, rescan))
+        except Exception as e:
+            # e.g. the Tk root is already gone during shutdown.
+            logger.warning(f"Could not dispatch outputs changes: {e}")
+
+    def _apply(self, folders: Iterable[Tuple[str, Optional[str]]], rescan: bool = False) -> None:
+        """Write one batch to the stats manager (on the dispatch thread, if any)."""
+        if self._stop.is_set():
+            return
+        try:
+            if rescan:
+                # The kernel dropped events; let the incremental scan catch up.
+                self.stats_manager.scan_outputs()
+                changed = -1
+            else:
+                changed = self.stats_manager.apply_folder_changes(folders)
+        except Exception as e:
+            logger.warning(f"Could not apply outputs changes: {e}")
+            return
+        self.batches += 1
+        if changed and self.on_change is not None:
+            try:
+                self.on_change(changed)
+            except Exception as e:
+                logger.warning(f"Outputs watcher callback failed: {e}")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        if self.state != "failed":
+            self.state = "stopped"
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "backend": getattr(self._backend, "name", None),
+            "events": self.events,
+            "batches": self.batches,
+            "error": self.error,
+        }
+
+
+def start_for(
+    stats_manager: Any,
+    on_change: Optional[Callable[[int], None]] = None,
+    dispatch: Optional[Callable[[Callable[[], None]], Any]] = None,
+) -> Optional[OutputsWatcher]:
+    """Start a watcher for ``stats_manager`` if ``tracker.watch_outputs`` is on."""
+    cfg = user_config.tracker_config() or {}
+    if not cfg.get("watch_outputs", False):
+        return None
+    watcher = OutputsWatcher(
+        stats_manager,
+        backend=cfg.get("watch_backend", "auto"),
+        debounce=float(cfg.get("watch_debounce", 0.5)),
+        max_delay=float(cfg.get("watch_max_delay", 5.0)),
+        poll_interval=float(cfg.get("watch_poll_interval", 5.0)),
+        on_change=on_change,
+        dispatch=dispatch,
+    )
+    try:
+        watcher.start()
+    except Exception as e:
+        logger.warning(f"Could not start outputs watcher ({e}); scans only.")
+        return None
+    return watcher
@@ -0,0 +1,251 @@
+"""
+core/ranked_bullets.py
+-----------------------
+Compact, columnar ranking results.
+
+A ranking used to be a ``list`` of :class:`BulletScore` dataclasses, each
+with its own copies of the job title and bullet text and a fresh
+``matched_keywords`` list. For a 10k-bullet inventory that is tens of
+thousands of small objects per JD, multiplied again for batch rankings
+and the result cache.
+
+:class:`RankedBullets` keeps a ranking as parallel arrays instead::
+
+    job_idx[i]     index into the ranking's job-title table
+    bullet_idx[i]  index into the inventory's flat bullet list (shared,
+                   not copied)
+    score[i]       float64 score
+    kw_offsets / kw_ids
+                   matched keywords as interned token ids (CSR layout)
+
+It is a read-only ``Sequence[BulletScore]``: indexing, slicing and
+iteration build :class:`BulletScore` objects on demand, so existing
+callers (``ranked[0]``, ``ranked[:20]``, ``for item in ranked``) work as
+before. :meth:`RankedBullets.to_record` / :meth:`from_record` give a small
+JSON form keyed by bullet position, for the JD result cache.
+"""
+
+from __future__ import annotations
+
+import threading
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple, Union, overload
+
+
+@dataclass
+class BulletScore:
+    """A single bullet's relevance score against a JD.
+
+    Attributes
+    ----------
+    job_title : str
+        The job heading the bullet belongs to.
+    bullet : str
+        The bullet text itself.
+    score : float
+        Relevance score in [0.0, 1.0]. Higher is better.
+    matched_keywords : list[str]
+        JD content words that also appear in the bullet — used to explain
+        the score in the UI.
+    """
+    job_title: str
+    bullet: str
+    score: float
+    matched_keywords: List[str]
+
+
+# --------------------------------------------------------------------------
+# Token interning
+# --------------------------------------------------------------------------
+
+class TokenTable:
+    """Process-wide ``token <-> int`` interning table (append-only)."""
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._tokens: List[str] = []
+        self._lock = threading.Lock()
+
+    def intern(self, token: str) -> int:
+        tid = self._ids.get(token)
+        if tid is None:
+            with self._lock:
+                tid = self._ids.get(token)
+                if tid is None:
+                    tid = len(self._tokens)
+                    self._tokens.append(token)
+                    self._ids[token] = tid
+        return tid
+
+    def token(self, tid: int) -> str:
+        return self._tokens[tid]
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+
+TOKENS = TokenTable()
+
+
+# --------------------------------------------------------------------------
+# Columnar ranking
+# --------------------------------------------------------------------------
+
+Flat = Sequence[Tuple[str, str, Any]]
+
+
+class RankedBullets(Sequence):
+    """Read-only ranking over a flat ``(job, bullet, token ids)`` inventory.
+
+    Build with :meth:`from_rows`. ``flat`` is referenced, not copied; it
+    must not be mutated while the ranking is in use (the bullet index
+    replaces its flat list on change rather than editing it).
+    """
+
+    __slots__ = ("_flat", "_jobs", "job_idx", "bullet_idx", "scores", "kw_offsets", "kw_ids")
+
+    def __init__(
+        self,
+        flat: Flat,
+        jobs: List[str],
+        job_idx: array,
+        bullet_idx: array,
+        scores: array,
+        kw_offsets: array,
+        kw_ids: array,
+    ):
+        self._flat = flat
+        self._jobs = jobs
+        self.job_idx = job_idx
+        self.bullet_idx = bullet_idx
+        self.scores = scores
+        self.kw_offsets = kw_offsets
+        self.kw_ids = kw_ids
+
+    @classmethod
+    def from_rows(
+        cls,
+        flat: Flat,
+        rows: Iterable[Tuple[int, float, Iterable[Any]]],
+        *,
+        interned: bool = False,
+    ) -> "RankedBullets":
+        """Build from ``(bullet position in flat, score, matched keywords)`` rows.
+
+        With ``interned=True`` the keywords are already :data:`TOKENS` ids.
+        """
+        jobs: List[str] = []
+        job_ids: Dict[str, int] = {}
+        job_idx, bullet_idx = array("I"), array("I")
+        scores = array("d")
+        kw_offsets, kw_ids = array("I", [0]), array("I")
+        intern = TOKENS.intern
+        for position, score, matched in rows:
+            job = flat[position][0]
+            jid = job_ids.get(job)
+            if jid is None:
+                jid = job_ids[job] = len(jobs)
+                jobs.append(job)
+            job_idx.append(jid)
+            bullet_idx.append(position)
+            scores.append(score)
+            kw_ids.extend(matched if interned else (intern(t) for t in matched))
+            kw_offsets.append(len(kw_ids))
+        return cls(flat, jobs, job_idx, bullet_idx, scores, kw_offsets, kw_ids)
+
+    @property
+    def flat(self) -> Flat:
+        """The ``(job, bullet, tokens)`` list this ranking points into."""
+        return self._flat
+
+    # ------------------------------------------------------------------
+    # Sequence protocol
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def _item(self, i: int) -> BulletScore:
+        start, end = self.kw_offsets[i], self.kw_offsets[i + 1]
+        token = TOKENS.token
+        return BulletScore(
+            self._jobs[self.job_idx[i]],
+            self._flat[self.bullet_idx[i]][1],
+            self.scores[i],
+            [token(t) for t in self.kw_ids[start:end]],
+        )
+
+    @overload
+    def __getitem__(self, i: int) -> BulletScore: ...
+    @overload
+    def __getitem__(self, i: slice) -> List[BulletScore]: ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[BulletScore, List[BulletScore]]:
+        if isinstance(i, slice):
+            return [self._item(j) for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("RankedBullets index out of range")
+        return self._item(i)
+
+    def __iter__(self) -> Iterator[BulletScore]:
+        for i in range(len(self)):
+            yield self._item(i)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, (str, bytes)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"RankedBullets({len(self)} bullets)"
+
+    # ------------------------------------------------------------------
+    # Column queries (no per-bullet objects)
+    # ------------------------------------------------------------------
+    def keyword_set(self) -> set:
+        """Every matched keyword across the ranking."""
+        token = TOKENS.token
+        return {token(t) for t in set(self.kw_ids)}
+
+    def top_per_job(self, per_job_cap: int) -> Dict[str, List[BulletScore]]:
+        """First ``per_job_cap`` bullets of each job, materialising only those."""
+        counts = [0] * len(self._jobs)
+        buckets: Dict[str, List[BulletScore]] = {}
+        for i, jid in enumerate(self.job_idx):
+            bucket = buckets.setdefault(self._jobs[jid], [])
+            if counts[jid] < per_job_cap:
+                counts[jid] += 1
+                bucket.append(self._item(i))
+        return buckets
+
+    # ------------------------------------------------------------------
+    # Serialisation
+    # ------------------------------------------------------------------
+    def to_record(self) -> Dict[str, Any]:
+        """Compact JSON-able form; bullets are stored by position in ``flat``."""
+        vocab: Dict[int, int] = {}
+        local = [vocab.setdefault(t, len(vocab)) for t in self.kw_ids]
+        return {
+            "bullet": self.bullet_idx.tolist(),
+            "score": self.scores.tolist(),
+            "kw_offsets": self.kw_offsets.tolist(),
+            "kw": local,
+            "vocab": [TOKENS.token(t) for t in vocab],
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], flat: Flat) -> "RankedBullets":
+        """Inverse of :meth:`to_record` against the same ``flat`` inventory."""
+        vocab = record["vocab"]
+        offsets = record["kw_offsets"]
+        kw = record["kw"]
+        rows = (
+            (position, score, [vocab[k] for k in kw[offsets[i]:offsets[i + 1]]])
+            for i, (position, score) in enumerate(zip(record["bullet"], record["score"]))
+        )
+        return cls.from_rows(flat, rows)
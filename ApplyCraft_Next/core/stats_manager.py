@@ -2,7 +2,9 @@ import os
 import json
 import sqlite3
 import threading
+import stat
 import sys
+import time
 from datetime import datetime
 
 # Set up paths for internal imports
@@ -33,6 +35,115 @@ def _filename_prefix_to_strip() -> str:
 # Re-export for any callers that import the old constant.
 COUNTRY_MAP = _country_map()
 
+# A directory mtime this close to the scan start may still change within
+# the filesystem's timestamp granularity without looking different, so
+# the manifest stores it as unknown and the folder is listed again.
+_RACY_MTIME_NS = 2_000_000_000
+
+
+def _is_cv_pdf(filename):
+    return "CV" in filename and filename.endswith(".pdf")
+
+
+def _country_from_cv_name(filename, prefix, country_map):
+    """Country whose keywords appear in a generated CV's filename suffix."""
+    suffix = (
+        filename.replace(prefix, "")
+        .replace(".pdf", "")
+        .replace("_", " ")
+        .lower()
+    )
+    for country_name, keywords in country_map.items():
+        if any(kw.lower() in suffix for kw in keywords):
+            return country_name
+    return "Unknown"
+
+
+class _MirrorWriter:
+    """Background thread that coalesces JSON mirror refreshes.
+
+    :meth:`request` only flags the mirror as stale. The thread waits
+    ``delay`` seconds so a burst of saves (a scan, a batch of status
+    changes) becomes one write, then calls ``write``.
+    """
+
+    def __init__(self, write, delay=0.5):
+        self._write = write
+        self.delay = max(0.0, float(delay))
+        self.writes = 0
+        self._cond = threading.Condition()
+        self._hurry = threading.Event()
+        self._pending = False
+        self._busy = False
+        self._closed = False
+        self._thread = None
+
+    def request(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._pending = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="applycraft-json-mirror", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+            self._hurry.wait(self.delay)
+            with self._cond:
+                self._pending = False
+                self._busy = True
+            try:
+                self._write()
+            except Exception as e:
+                logger.error(f"Error writing JSON mirror: {e}")
+            with self._cond:
+                self._busy = False
+                self.writes += 1
+                if not self._pending and not self._closed:
+                    self._hurry.clear()
+                self._cond.notify_all()
+
+    def flush(self, timeout=10.0):
+        """Write any pending refresh now and wait for it to finish."""
+        with self._cond:
+            if not (self._pending or self._busy):
+                return True
+            self._hurry.set()
+            return self._cond.wait_for(lambda: not (self._pending or self._busy), timeout)
+
+    def close(self, timeout=10.0):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+_UPSERT_APPLICATION_SQL = """
+    INSERT INTO applications (
+        app_id, date, company, folder_name, country, country_manual,
+        role_title, status, status_manual, manual, cv_found, notes, last_updated
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(app_id) DO UPDATE SET
+        date=excluded.date,
+        company=excluded.company,
+        folder_name=excluded.folder_name,
+        country=excluded.country,
+        country_manual=excluded.country_manual,
+        role_title=excluded.role_title,
+        status=excluded.status,
+        status_manual=excluded.status_manual,
+        manual=excluded.manual,
+        cv_found=excluded.cv_found,
+        notes=excluded.notes,
+        last_updated=excluded.last_updated
+"""
+
 
 class StatsManager:
     def __init__(self, base_dir):
@@ -42,20 +153,45 @@ class StatsManager:
         self.deleted_file = os.path.join(base_dir, "application_deleted.json")
         self.db_file = os.path.join(base_dir, "application_stats.db")
         self._db_lock = threading.RLock()
+        self._closed = False
+
+        # Legacy JSON mirrors (tracker.json_mirror): "background" rewrites
+        # them off-thread after changes, "on_demand" only in
+        # export_json_mirror() and close(), "off" only when exported.
+        tracker_cfg = user_config.tracker_config() or {}
+        self.json_mirror_mode = (tracker_cfg.get("json_mirror") or "background").lower()
+        self._mirror_stale = False
+        self._mirror = None
+        if self.json_mirror_mode == "background":
+            self._mirror = _MirrorWriter(
+                self.export_json_mirror, delay=float(tracker_cfg.get("json_mirror_delay", 0.5))
+            )
 
         self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
         self._init_db()
         self._migrate_from_json_if_needed()
 
+        # Rows changed in ``self.stats`` since the last save, and the
+        # deleted ids the database already holds (see _save_stats).
+        self._dirty_ids = set()
         self._deleted_ids = self._load_deleted_ids_from_db()
+        self._persisted_deleted = set(self._deleted_ids)
         self.stats = self._load_stats_from_db()
+        self._cache_version = self._data_version()
         self._normalize_all_statuses() # Consolidate statuses on startup
 
         # Keep the legacy JSON files as mirrors for backward compatibility.
         self._write_json_mirror()
 
     def close(self):
+        if getattr(self, "_closed", True):
+            return
+        self._closed = True
+        if self._mirror is not None:
+            self._mirror.close()
+        elif self._mirror_stale and self.json_mirror_mode == "on_demand":
+            self.export_json_mirror()
         with self._db_lock:
             try:
                 self.conn.close()
@@ -95,6 +231,25 @@ class StatsManager:
                     )
                     """
                 )
+                # Directory mtimes from the last outputs scan, keyed by
+                # "<date>" or "<date>/<company>" relative to outputs/.
+                self.conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS scan_manifest (
+                        path TEXT PRIMARY KEY,
+                        mtime_ns INTEGER NOT NULL,
+                        child_count INTEGER NOT NULL
+                    )
+                    """
+                )
+                self.conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS scan_meta (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL
+                    )
+                    """
+                )
                 self.conn.execute("CREATE INDEX IF NOT EXISTS idx_app_date ON applications(date)")
                 self.conn.execute("CREATE INDEX IF NOT EXISTS idx_app_status ON applications(status)")
                 self.conn.execute("CREATE INDEX IF NOT EXISTS idx_app_country ON applications(country)")
@@ -217,8 +372,10 @@ class StatsManager:
             ).fetchall()
         return {str(r["app_id"]): self._row_to_dict(r) for r in rows}
 
-    def _upsert_application_row(self, app_id, data, commit=True):
-        values = (
+    @staticmethod
+    def _row_values(app_id, data):
+        """``applications`` column values for one row, in table order."""
+        return (
             app_id,
             data.get("date", ""),
             data.get("company", "").replace("_", " "),
@@ -234,88 +391,141 @@ class StatsManager:
             data.get("last_updated", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
         )
 
-        if commit:
-            with self._db_lock:
+    @staticmethod
+    def _values_to_dict(values):
+        """The dict ``_row_to_dict`` would return after writing ``values``."""
+        return {
+            "date": values[1],
+            "company": values[2],
+            "folder_name": values[3],
+            "country": values[4],
+            "country_manual": bool(values[5]),
+            "role_title": values[6],
+            "status": values[7],
+            "status_manual": bool(values[8]),
+            "manual": bool(values[9]),
+            "cv_found": bool(values[10]),
+            "notes": values[11],
+            "last_updated": values[12]
+        }
+
+    def _upsert_application_row(self, app_id, data, commit=True):
+        values = self._row_values(app_id, data)
+        with self._db_lock:
+            if commit:
                 with self.conn:
-                    self.conn.execute(
-                        """
-                        INSERT INTO applications (
-                            app_id, date, company, folder_name, country, country_manual,
-                            role_title, status, status_manual, manual, cv_found, notes, last_updated
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ON CONFLICT(app_id) DO UPDATE SET
-                            date=excluded.date,
-                            company=excluded.company,
-                            folder_name=excluded.folder_name,
-                            country=excluded.country,
-                            country_manual=excluded.country_manual,
-                            role_title=excluded.role_title,
-                            status=excluded.status,
-                            status_manual=excluded.status_manual,
-                            manual=excluded.manual,
-                            cv_found=excluded.cv_found,
-                            notes=excluded.notes,
-                            last_updated=excluded.last_updated
-                        """,
-                        values
-                    )
-        else:
-            with self._db_lock:
-                self.conn.execute(
-                    """
-                    INSERT INTO applications (
-                        app_id, date, company, folder_name, country, country_manual,
-                        role_title, status, status_manual, manual, cv_found, notes, last_updated
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(app_id) DO UPDATE SET
-                        date=excluded.date,
-                        company=excluded.company,
-                        folder_name=excluded.folder_name,
-                        country=excluded.country,
-                        country_manual=excluded.country_manual,
-                        role_title=excluded.role_title,
-                        status=excluded.status,
-                        status_manual=excluded.status_manual,
-                        manual=excluded.manual,
-                        cv_found=excluded.cv_found,
-                        notes=excluded.notes,
-                        last_updated=excluded.last_updated
-                    """,
-                    values
-                )
+                    self.conn.execute(_UPSERT_APPLICATION_SQL, values)
+            else:
+                self.conn.execute(_UPSERT_APPLICATION_SQL, values)
+        return values
 
     def _write_json_mirror(self):
-        # JSON mirrors keep old tooling/scripts working while SQLite is the source of truth.
+        """Mark the legacy JSON mirrors stale; written per ``json_mirror_mode``."""
+        self._mirror_stale = True
+        if self._mirror is not None:
+            self._mirror.request()
+
+    def flush_json_mirror(self, timeout=10.0):
+        """Wait for a pending background mirror write (no-op in other modes)."""
+        if self._mirror is not None:
+            return self._mirror.flush(timeout)
+        return True
+
+    @staticmethod
+    def _write_json_atomic(path, data):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def export_json_mirror(self):
+        """Write application_stats.json / application_deleted.json now.
+
+        JSON mirrors keep old tooling/scripts working while SQLite is the
+        source of truth. Each file is written to a temp file and renamed
+        into place, so readers never see a half-written mirror.
+        """
+        self._mirror_stale = False
+        # dict()/set() copies are atomic under the GIL, so the snapshot is
+        # safe against a concurrent save on another thread.
+        stats = {app_id: dict(data) for app_id, data in dict(self.stats).items()}
+        deleted_ids = sorted(set(self._deleted_ids))
         try:
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, indent=4)
+            self._write_json_atomic(self.stats_file, stats)
         except Exception as e:
             logger.error(f"Error writing stats JSON mirror: {e}")
 
         try:
-            with open(self.deleted_file, 'w', encoding='utf-8') as f:
-                json.dump({"deleted_ids": sorted(self._deleted_ids)}, f, indent=4)
+            self._write_json_atomic(self.deleted_file, {"deleted_ids": deleted_ids})
         except Exception as e:
             logger.error(f"Error writing deleted items JSON mirror: {e}")
 
-    def _refresh_cache_from_db(self):
-        self._deleted_ids = self._load_deleted_ids_from_db()
-        self.stats = self._load_stats_from_db()
+    def _data_version(self):
+        """SQLite's ``PRAGMA data_version`` for this connection.
 
-    def _save_stats(self):
-        # Persist in-memory cache to DB. Used by legacy code paths.
+        It changes whenever another connection (another StatsManager, the
+        CV generator, a second app instance) commits to the database, but
+        not for commits made through ``self.conn``, which already update
+        the cache directly.
+        """
         with self._db_lock:
-            with self.conn:
-                for app_id, data in self.stats.items():
-                    if app_id in self._deleted_ids:
-                        continue
-                    self._upsert_application_row(app_id, data, commit=False)
-                for app_id in self._deleted_ids:
-                    self.conn.execute("INSERT OR IGNORE INTO deleted_ids(app_id) VALUES (?)", (app_id,))
-                    self.conn.execute("DELETE FROM applications WHERE app_id = ?", (app_id,))
+            return self.conn.execute("PRAGMA data_version").fetchone()[0]
 
-        self._refresh_cache_from_db()
-        self._write_json_mirror()
+    def _refresh_cache_from_db(self, force=False):
+        """Reload the cache, unless nobody else has written since the last load."""
+        with self._db_lock:
+            version = self._data_version()
+            if not force and version == self._cache_version:
+                return
+            self._deleted_ids = self._load_deleted_ids_from_db()
+            self._persisted_deleted = set(self._deleted_ids)
+            self.stats = self._load_stats_from_db()
+            self._cache_version = version
+            self._dirty_ids.clear()
+
+    def _mark_dirty(self, app_id):
+        """Record that ``self.stats[app_id]`` changed and needs saving."""
+        with self._db_lock:
+            self._dirty_ids.add(app_id)
+
+    def _save_stats(self, full=False):
+        """Persist the changes made to the in-memory cache.
+
+        Only rows marked with :meth:`_mark_dirty` and ids newly added to
+        ``_deleted_ids`` are written, with ``executemany`` in one
+        transaction. ``full=True`` writes every row, for legacy code that
+        edits ``self.stats`` without marking it. Written rows are
+        normalised in place exactly as a reload would, so the cache stays
+        authoritative and the table isn't read back.
+        """
+        with self._db_lock:
+            # Snapshot, write and clear atomically; ids marked by another
+            # thread after the snapshot stay dirty for the next save.
+            marked = set(self._dirty_ids)
+            ids = list(self.stats) if full else [a for a in marked if a in self.stats]
+            new_deleted = set(self._deleted_ids) if full else self._deleted_ids - self._persisted_deleted
+            rows = [self._row_values(a, self.stats[a]) for a in ids if a not in self._deleted_ids]
+
+            if rows or new_deleted:
+                deleted_rows = [(a,) for a in new_deleted]
+                with self.conn:
+                    self.conn.executemany(_UPSERT_APPLICATION_SQL, rows)
+                    self.conn.executemany("INSERT OR IGNORE INTO deleted_ids(app_id) VALUES (?)", deleted_rows)
+                    self.conn.executemany("DELETE FROM applications WHERE app_id = ?", deleted_rows)
+
+            for values in rows:
+                self.stats[values[0]] = self._values_to_dict(values)
+            for app_id in new_deleted:
+                self.stats.pop(app_id, None)
+            self._persisted_deleted |= new_deleted
+            # Written ids, plus marked ids whose row no longer exists.
+            self._dirty_ids -= set(ids) | marked
+        if rows or new_deleted:
+            self._write_json_mirror()
 
     def add_application(self, date_str, company, country, status="Unknown", manual=False, role_title=""):
         """Explicitly adds an application to the stats, avoiding the need for a full scan."""
@@ -337,10 +547,12 @@ class StatsManager:
 
         with self._db_lock:
             with self.conn:
-                self._upsert_application_row(app_id, entry, commit=False)
+                values = self._upsert_application_row(app_id, entry, commit=False)
                 self.conn.execute("DELETE FROM deleted_ids WHERE app_id = ?", (app_id,))
 
-        self._refresh_cache_from_db()
+        self.stats[app_id] = self._values_to_dict(values)
+        self._deleted_ids.discard(app_id)
+        self._persisted_deleted.discard(app_id)
         self._write_json_mirror()
         return app_id
 
@@ -372,6 +584,7 @@ class StatsManager:
                 current["folder_name"] = self._build_folder_name(target_company)
             current["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             self.stats[app_id] = current
+            self._mark_dirty(app_id)
             self._save_stats()
             return True, app_id
 
@@ -389,83 +602,229 @@ class StatsManager:
 
         with self._db_lock:
             with self.conn:
-                self._upsert_application_row(new_app_id, current, commit=False)
+                values = self._upsert_application_row(new_app_id, current, commit=False)
                 self.conn.execute("DELETE FROM applications WHERE app_id = ?", (app_id,))
                 self.conn.execute("DELETE FROM deleted_ids WHERE app_id = ?", (app_id,))
                 self.conn.execute("DELETE FROM deleted_ids WHERE app_id = ?", (new_app_id,))
 
-        self._refresh_cache_from_db()
+        self.stats.pop(app_id, None)
+        self.stats[new_app_id] = self._values_to_dict(values)
+        self._dirty_ids.discard(app_id)
+        for deleted in (self._deleted_ids, self._persisted_deleted):
+            deleted.discard(app_id)
+            deleted.discard(new_app_id)
         self._write_json_mirror()
         return True, new_app_id
 
     def get_stats(self):
-        """Returns the currently loaded/cached stats without scanning disk."""
-        self._refresh_cache_from_db()
-        return self.stats
+        """Returns a snapshot of the cached stats without scanning disk.
+
+        A shallow copy: ``scan_outputs`` may add entries from a worker
+        thread while the caller iterates.
+        """
+        with self._db_lock:
+            self._refresh_cache_from_db()
+            return dict(self.stats)
+
+    # ------------------------------------------------------------------
+    # Outputs scanning
+    # ------------------------------------------------------------------
+
+    def _scan_fingerprint(self):
+        """Settings that affect what a scan derives from a folder.
+
+        Changing the filename slug or the country keywords invalidates the
+        manifest, so the next scan re-runs country detection everywhere.
+        """
+        return json.dumps([_filename_prefix_to_strip(), _country_map()], sort_keys=True)
+
+    def _load_manifest(self, fingerprint):
+        """Path -> (mtime_ns, child_count), or None when it must be rebuilt."""
+        with self._db_lock:
+            row = self.conn.execute(
+                "SELECT value FROM scan_meta WHERE key = 'fingerprint'"
+            ).fetchone()
+            if row is None or row["value"] != fingerprint:
+                return None
+            rows = self.conn.execute("SELECT path, mtime_ns, child_count FROM scan_manifest").fetchall()
+        return {r["path"]: (r["mtime_ns"], r["child_count"]) for r in rows}
+
+    def _save_manifest(self, entries, stale_dates, fingerprint, reset=False):
+        with self._db_lock:
+            with self.conn:
+                if reset:
+                    self.conn.execute("DELETE FROM scan_manifest")
+                for date_folder in stale_dates:
+                    # "<date>" itself plus every "<date>/..." key ("0" sorts right after "/").
+                    self.conn.execute(
+                        "DELETE FROM scan_manifest WHERE path = ? OR (path > ? AND path < ?)",
+                        (date_folder, date_folder + "/", date_folder + "0"),
+                    )
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO scan_manifest(path, mtime_ns, child_count) VALUES (?, ?, ?)",
+                    [(path, mtime_ns, count) for path, (mtime_ns, count) in entries.items()],
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO scan_meta(key, value) VALUES ('fingerprint', ?)",
+                    (fingerprint,),
+                )
 
-    def scan_outputs(self):
-        """Forces a full scan of the outputs directory to find new applications."""
+    def _apply_folder_files(self, data, files, prefix, country_map):
+        """Refresh cv_found / detected country of an existing row. True if changed."""
+        updated = False
+        cv_found = any(_is_cv_pdf(f) for f in files)
+        if data.get('cv_found', False) != cv_found:
+            data['cv_found'] = cv_found
+            data['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            updated = True
+
+        if not data.get('country_manual', False):
+            current_country = data.get('country', 'Unknown')
+            if current_country == "Unknown" or not current_country:
+                found_country = "Unknown"
+                for filename in files:
+                    if _is_cv_pdf(filename):
+                        found_country = _country_from_cv_name(filename, prefix, country_map)
+                        if found_country != "Unknown":
+                            break
+
+                if found_country != "Unknown" and found_country != current_country:
+                    data['country'] = found_country
+                    data['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    updated = True
+        return updated
+
+    @staticmethod
+    def _has_manual_edits(data):
+        return bool(
+            data.get('manual')
+            or data.get('country_manual')
+            or data.get('status_manual')
+            or (data.get('role_title') or '').strip()
+        )
+
+    @staticmethod
+    def _entry_from_folder(date_folder, company_folder, files, folder_stat, prefix, country_map):
+        """A new row for an outputs folder nobody has recorded yet."""
+        cv_found = False
+        country = "Unknown"
+        for filename in sorted(files, reverse=True):
+            if _is_cv_pdf(filename):
+                cv_found = True
+                country = _country_from_cv_name(filename, prefix, country_map)
+                break
+
+        if folder_stat is not None:
+            creation_timestamp = datetime.fromtimestamp(folder_stat.st_ctime).strftime("%Y-%m-%d %H:%M:%S")
+        else:
+            creation_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        return {
+            "date": date_folder,
+            "company": company_folder.replace("_", " "),
+            "folder_name": company_folder,
+            "country": country,
+            "country_manual": False,
+            "role_title": "",
+            "status": "Unknown",
+            "status_manual": False,
+            "manual": False,
+            "cv_found": cv_found,
+            "notes": "", # Added 'notes' field
+            "last_updated": creation_timestamp
+        }
+
+    def scan_outputs(self, full=False):
+        """Scans the outputs directory for new, changed and removed applications.
+
+        The scan is incremental. ``scan_manifest`` remembers the mtime and
+        entry count of every date and company folder seen last time, and
+        only date folders whose mtime changed are listed again; adding or
+        removing a company folder always bumps it. Under unchanged date
+        folders, a company folder is only stat'ed while its row still lacks
+        a CV or a detected country, so a CV written after the folder was
+        first seen is still picked up. ``full=True`` ignores the manifest
+        and re-checks every folder, e.g. after files were deleted by hand.
+        """
         self._refresh_cache_from_db()
 
         if not os.path.exists(self.outputs_dir):
             return self.stats
 
+        scan_start_ns = time.time_ns()
+        fingerprint = self._scan_fingerprint()
+        manifest = None if full else self._load_manifest(fingerprint)
+        reset = manifest is None
+        manifest = manifest or {}
+        seen = {}  # manifest entries confirmed or refreshed by this scan
+
+        def remember(rel, mtime_ns, child_count):
+            if scan_start_ns - mtime_ns < _RACY_MTIME_NS:
+                mtime_ns = -1
+            seen[rel] = (mtime_ns, child_count)
+
+        try:
+            with os.scandir(self.outputs_dir) as it:
+                date_entries = {e.name: e for e in it if '-' in e.name and e.is_dir()}
+        except Exception as e:
+            logger.error(f"Error scanning outputs root: {e}")
+            return self.stats
+
+        dirty_dates = {}  # date folder -> current mtime_ns
+        for name, entry in date_entries.items():
+            try:
+                mtime_ns = entry.stat().st_mtime_ns
+            except OSError as e:
+                logger.warning(f"Error reading date folder {entry.path}: {e}")
+                continue
+            if manifest.get(name, (None,))[0] != mtime_ns:
+                dirty_dates[name] = mtime_ns
+
         updated = False
+        prefix = _filename_prefix_to_strip()
+        country_map = _country_map()
 
         # First, validate existing entries and remove deleted ones
         to_remove = []
         for app_id, data in self.stats.items():
             date_folder = data.get('date', '')
             folder_name = data.get('folder_name', data.get('company', '').replace(' ', '_'))
+            rel = f"{date_folder}/{folder_name}"
+            known = manifest.get(rel)
+            if known is not None and date_folder in date_entries and date_folder not in dirty_dates:
+                # The date folder's entries are unchanged, so this folder still exists.
+                pending = not data.get('cv_found') or (
+                    not data.get('country_manual')
+                    and data.get('country', 'Unknown') in ("Unknown", "")
+                )
+                if not pending:
+                    seen[rel] = known
+                    continue
+
             expected_path = os.path.join(self.outputs_dir, date_folder, folder_name)
-            has_manual_edits = bool(
-                data.get('manual')
-                or data.get('country_manual')
-                or data.get('status_manual')
-                or (data.get('role_title') or '').strip()
-            )
+            has_manual_edits = self._has_manual_edits(data)
 
-            if not os.path.exists(expected_path) and not has_manual_edits:
-                to_remove.append(app_id)
+            try:
+                st = os.stat(expected_path)
+            except OSError:
+                st = None
+
+            if st is None:
+                if not has_manual_edits:
+                    to_remove.append(app_id)
                 continue
 
             # Only try to scan files if the folder actually exists
-            if os.path.isdir(expected_path):
+            if stat.S_ISDIR(st.st_mode):
+                if known is not None and known[0] == st.st_mtime_ns:
+                    seen[rel] = known
+                    continue
                 try:
                     files = os.listdir(expected_path)
-                    
-                    cv_found = any("CV" in f and f.endswith(".pdf") for f in files)
-                    current_cv_found = data.get('cv_found', False)
-                    if current_cv_found != cv_found:
-                        data['cv_found'] = cv_found
-                        data['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    remember(rel, st.st_mtime_ns, len(files))
+                    if self._apply_folder_files(data, files, prefix, country_map):
+                        self._mark_dirty(app_id)
                         updated = True
-
-                    if not data.get('country_manual', False):
-                        current_country = data.get('country', 'Unknown')
-                        if current_country == "Unknown" or not current_country:
-                            found_country = "Unknown"
-                            prefix = _filename_prefix_to_strip()
-                            country_map = _country_map()
-                            for filename in files:
-                                if "CV" in filename and filename.endswith(".pdf"):
-                                    suffix = (
-                                        filename.replace(prefix, "")
-                                        .replace(".pdf", "")
-                                        .replace("_", " ")
-                                        .lower()
-                                    )
-                                    for country_name, keywords in country_map.items():
-                                        if any(kw.lower() in suffix for kw in keywords):
-                                            found_country = country_name
-                                            break
-                                    if found_country != "Unknown":
-                                        break
-
-                            if found_country != "Unknown" and found_country != current_country:
-                                data['country'] = found_country
-                                data['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                updated = True
                 except Exception as e:
                     logger.warning(f"Error listing folder {expected_path}: {e}")
             else:
@@ -473,98 +832,144 @@ class StatsManager:
                 # we just ensure cv_found is False if not manually set.
                 if not has_manual_edits and data.get('cv_found'):
                      data['cv_found'] = False
+                     self._mark_dirty(app_id)
                      updated = True
 
-        for app_id in to_remove:
-            self.delete_application(app_id)
+        # Removed folders are tombstoned in the same save as the other changes.
+        if to_remove:
+            self._deleted_ids.update(to_remove)
             updated = True
 
-        # Scan for new entries
-        try:
-            folders = os.listdir(self.outputs_dir)
-        except Exception as e:
-            logger.error(f"Error scanning outputs root: {e}")
-            if updated:
-                self._save_stats()
-            return self.stats
-
-        for date_folder in folders:
-            if '-' not in date_folder:
-                continue
-
+        # Scan for new entries, only in date folders whose contents changed
+        for date_folder in sorted(dirty_dates):
             date_path = os.path.join(self.outputs_dir, date_folder)
-            if not os.path.isdir(date_path):
-                continue
-
             try:
-                companies = os.listdir(date_path)
+                with os.scandir(date_path) as it:
+                    companies = list(it)
             except Exception as e:
                 logger.warning(f"Error listing date folder {date_path}: {e}")
                 continue
+            remember(date_folder, dirty_dates[date_folder], len(companies))
 
-            for company_folder in companies:
+            for company_entry in companies:
+                company_folder = company_entry.name
                 app_id = f"{date_folder}_{company_folder}"
                 if app_id in self._deleted_ids or app_id in self.stats:
                     continue
 
-                company_path = os.path.join(date_path, company_folder)
-                if not os.path.isdir(company_path):
+                if not company_entry.is_dir():
                     continue
+                company_path = company_entry.path
 
-                cv_found = False
-                country = "Unknown"
+                files = []
                 try:
                     files = os.listdir(company_path)
-                    files.sort(reverse=True)
-                    prefix = _filename_prefix_to_strip()
-                    country_map = _country_map()
-                    for filename in files:
-                        if "CV" in filename and filename.endswith(".pdf"):
-                            cv_found = True
-                            suffix = (
-                                filename.replace(prefix, "")
-                                .replace(".pdf", "")
-                                .replace("_", " ")
-                                .lower()
-                            )
-                            for country_name, keywords in country_map.items():
-                                if any(kw.lower() in suffix for kw in keywords):
-                                    country = country_name
-                                    break
-                            break
                 except Exception as e:
                     logger.warning(f"Error processing files in {company_path}: {e}")
 
                 try:
-                    folder_ctime = os.path.getctime(company_path)
-                    creation_timestamp = datetime.fromtimestamp(folder_ctime).strftime("%Y-%m-%d %H:%M:%S")
+                    folder_stat = company_entry.stat()
+                    remember(f"{date_folder}/{company_folder}", folder_stat.st_mtime_ns, len(files))
                 except Exception as e:
                     logger.debug(f"Could not get ctime for {company_path}: {e}")
-                    creation_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-                self.stats[app_id] = {
-                    "date": date_folder,
-                    "company": company_folder.replace("_", " "),
-                    "folder_name": company_folder,
-                    "country": country,
-                    "country_manual": False,
-                    "role_title": "",
-                    "status": "Unknown",
-                    "status_manual": False,
-                    "manual": False,
-                    "cv_found": cv_found,
-                    "notes": "", # Added 'notes' field
-                    "last_updated": creation_timestamp
-                }
+                    folder_stat = None
+
+                entry = self._entry_from_folder(
+                    date_folder, company_folder, files, folder_stat, prefix, country_map
+                )
+                with self._db_lock:
+                    self.stats[app_id] = entry
+                    self._mark_dirty(app_id)
                 updated = True
 
         if updated:
             self._save_stats()
-        else:
-            self._write_json_mirror()
+
+        # Written after the rows, so a crash in between only causes a rescan.
+        stale_dates = set(dirty_dates) | {
+            path for path in manifest if "/" not in path and path not in date_entries
+        }
+        if reset or stale_dates or seen.keys() - manifest.keys() or any(
+            manifest.get(path) != entry for path, entry in seen.items()
+        ):
+            try:
+                self._save_manifest(seen, stale_dates, fingerprint, reset=reset)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not update outputs scan manifest: {e}")
 
         return self.stats
 
+    def apply_folder_changes(self, folders):
+        """Re-check specific outputs folders and write the result in one transaction.
+
+        ``folders`` holds ``(date_folder, company_folder)`` pairs, where a
+        company of ``None`` stands for everything in that date folder. The
+        folders are read as they are now, so coalesced watcher events can
+        be passed without caring whether a folder was created, renamed or
+        removed in between. Rows follow the same rules as
+        :meth:`scan_outputs`. Returns the number of rows written or deleted.
+        """
+        self._refresh_cache_from_db()
+        by_folder = {
+            (data.get('date', ''), data.get('folder_name', data.get('company', '').replace(' ', '_'))): app_id
+            for app_id, data in self.stats.items()
+        }
+
+        targets = set()
+        for date_folder, company_folder in folders:
+            if company_folder is not None:
+                targets.add((date_folder, company_folder))
+                continue
+            try:
+                targets.update((date_folder, name) for name in os.listdir(os.path.join(self.outputs_dir, date_folder)))
+            except OSError:
+                pass
+            targets.update(key for key in by_folder if key[0] == date_folder)
+
+        prefix = _filename_prefix_to_strip()
+        country_map = _country_map()
+        changed = 0
+        for date_folder, company_folder in sorted(targets):
+            if '-' not in date_folder:
+                continue
+            path = os.path.join(self.outputs_dir, date_folder, company_folder)
+            try:
+                folder_stat = os.stat(path)
+                files = os.listdir(path) if stat.S_ISDIR(folder_stat.st_mode) else None
+            except OSError:
+                folder_stat, files = None, None
+
+            app_id = by_folder.get((date_folder, company_folder))
+            if app_id is None:
+                app_id = f"{date_folder}_{company_folder}"
+                if files is None or app_id in self._deleted_ids or app_id in self.stats:
+                    continue
+                self.stats[app_id] = self._entry_from_folder(
+                    date_folder, company_folder, files, folder_stat, prefix, country_map
+                )
+                self._mark_dirty(app_id)
+                changed += 1
+                continue
+
+            data = self.stats[app_id]
+            if files is not None:
+                if self._apply_folder_files(data, files, prefix, country_map):
+                    self._mark_dirty(app_id)
+                    changed += 1
+            elif self._has_manual_edits(data):
+                continue
+            elif folder_stat is None:
+                self._deleted_ids.add(app_id)
+                changed += 1
+            elif data.get('cv_found'):
+                data['cv_found'] = False
+                self._mark_dirty(app_id)
+                changed += 1
+
+        if changed:
+            self._save_stats()
+        return changed
+
     def update_field(self, app_id, field, value):
         self._refresh_cache_from_db()
         if app_id not in self.stats:
@@ -576,6 +981,7 @@ class StatsManager:
         if field == "status":
             self.stats[app_id]['status_manual'] = True
         self.stats[app_id]['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._mark_dirty(app_id)
 
         self._save_stats()
         return True
@@ -591,7 +997,10 @@ class StatsManager:
                 self.conn.execute("INSERT OR IGNORE INTO deleted_ids(app_id) VALUES (?)", (app_id,))
                 self.conn.execute("DELETE FROM applications WHERE app_id = ?", (app_id,))
 
-        self._refresh_cache_from_db()
+        self.stats.pop(app_id, None)
+        self._dirty_ids.discard(app_id)
+        self._deleted_ids.add(app_id)
+        self._persisted_deleted.add(app_id)
         self._write_json_mirror()
         return True
 
@@ -657,6 +1066,7 @@ class StatsManager:
                 data['status'] = new_status
                 data['status_manual'] = True # Mark as manual so it sticks
                 data['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self._mark_dirty(app_id)
                 updated = True
         
         if updated:
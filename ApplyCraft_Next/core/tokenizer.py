@@ -0,0 +1,161 @@
+"""
+core/tokenizer.py
+------------------
+Shared tokenisation for the JD ranker.
+
+``rank_bullets``, ``compute_fit_score``, ``_candidate_jd_keywords`` and the
+recommendation prompt each used to run the word regex, lowercase and
+stopword filter over the same JD. Every bullet went through the same
+steps again on each call. :class:`Tokenizer` does that work once per
+distinct text:
+
+* the regex and stopword set are compiled once, at import;
+* per-text results are memoised in a bounded LRU cache
+  (``llm.token_cache_size`` entries);
+* content tokens are interned to integer ids in the process-wide
+  :data:`core.ranked_bullets.TOKENS` table, so the inverted index,
+  keyword overlap and fit coverage compare ints, and rankings store
+  matched keywords without re-interning;
+* optional light suffix stemming (``llm.stemming``) folds
+  "dashboards"/"dashboard" and "reports"/"reporting"/"reported"
+  together. It is off by default because it changes the keywords shown
+  in the UI;
+* :meth:`Tokenizer.bigram_ids` yields adjacent word pairs ("power bi",
+  "machine learning") for the BM25 provider's phrase boosting.
+
+Memoised results are tuples, so callers can't mutate a cached entry.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import threading
+from functools import lru_cache
+from typing import Optional, Tuple
+
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.dirname(_current_dir)
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from helpers import user_config          # noqa: E402
+from core.ranked_bullets import TOKENS   # noqa: E402
+
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are aren't as at be
+because been before being below between both but by can can't cannot could
+couldn't did didn't do does doesn't doing don't down during each few for
+from further had hadn't has hasn't have haven't having he he'd he'll he's
+her here here's hers herself him himself his how how's i i'd i'll i'm i've
+if in into is isn't it it's its itself let's me more most mustn't my
+myself no nor not of off on once only or other ought our ours ourselves
+out over own same shan't she she'd she'll she's should shouldn't so some
+such than that that's the their theirs them themselves then there there's
+these they they'd they'll they're they've this those through to too under
+until up very was wasn't we we'd we'll we're we've were weren't what
+what's when when's where where's which while who who's whom why why's
+with won't would wouldn't you you'd you'll you're you've your yours
+yourself yourselves
+also will may within across including via etc whilst per onto upon among
+""".split())
+
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9\+\-#\.]*")
+
+
+def stem(token: str) -> str:
+    """Strip common English inflections from a plain alphabetic token.
+
+    Deliberately conservative: tech tokens (``c#``, ``node.js``, ``s3``)
+    and short words pass through unchanged.
+    """
+    if len(token) <= 4 or not token.isalpha():
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith("sses"):
+        return token[:-2]
+    if token.endswith("ing") and len(token) > 6:
+        return token[:-3]
+    if token.endswith("ed") and len(token) > 5:
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+class Tokenizer:
+    """Memoising tokenizer; see the module docstring."""
+
+    def __init__(self, *, stemming: bool = False, cache_size: int = 4096):
+        self.stemming = stemming
+        self.cache_size = max(1, int(cache_size))
+        self.tokens = lru_cache(maxsize=self.cache_size)(self._tokens)
+        self.content_tokens = lru_cache(maxsize=self.cache_size)(self._content_tokens)
+        self.content_ids = lru_cache(maxsize=self.cache_size)(self._content_ids)
+        self.bigram_ids = lru_cache(maxsize=self.cache_size)(self._bigram_ids)
+
+    def _tokens(self, text: str) -> Tuple[str, ...]:
+        """Lowercase, keep alphanum + a few tech-stack-friendly chars (C#, .NET)."""
+        return tuple(tok.lower() for tok in WORD_RE.findall(text or ""))
+
+    def _content_tokens(self, text: str) -> Tuple[str, ...]:
+        """Tokens minus short / stop words, stemmed if enabled."""
+        kept = (t for t in self.tokens(text) if len(t) > 2 and t not in STOPWORDS)
+        if self.stemming:
+            return tuple(stem(t) for t in kept)
+        return tuple(kept)
+
+    def _content_ids(self, text: str) -> Tuple[int, ...]:
+        """:meth:`content_tokens` as interned :data:`TOKENS` ids."""
+        intern = TOKENS.intern
+        return tuple(intern(t) for t in self.content_tokens(text))
+
+    def _bigram_ids(self, text: str) -> Tuple[int, ...]:
+        """Adjacent word pairs as interned ``"first second"`` ids.
+
+        Pairs skip stopwords but, unlike :meth:`content_tokens`, keep
+        short words, so "Power BI" gives "power bi". A pair never spans a
+        stopword ("power of bi" has none).
+        """
+        words = self.tokens(text)
+        if self.stemming:
+            words = tuple(stem(w) for w in words)
+        intern = TOKENS.intern
+        return tuple(
+            intern(f"{a} {b}")
+            for a, b in zip(words, words[1:])
+            if a not in STOPWORDS and b not in STOPWORDS
+        )
+
+    def clear(self) -> None:
+        self.tokens.cache_clear()
+        self.content_tokens.cache_clear()
+        self.content_ids.cache_clear()
+        self.bigram_ids.cache_clear()
+
+
+# --------------------------------------------------------------------------
+# Shared instance
+# --------------------------------------------------------------------------
+# Built on first use from user_config. Changing ``stemming`` takes effect
+# on the next start, because the bullet index holds tokens from the old
+# setting.
+
+_tokenizer: Optional[Tokenizer] = None
+_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer() -> Tokenizer:
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                cfg = user_config.llm_config() or {}
+                _tokenizer = Tokenizer(
+                    stemming=bool(cfg.get("stemming", False)),
+                    cache_size=cfg.get("token_cache_size") or 4096,
+                )
+    return _tokenizer
@@ -0,0 +1,583 @@
+"""
+http_client.py
+---------------
+Shared keep-alive HTTP client for the LLM backends (Ollama, OpenAI).
+
+Every Ollama/OpenAI call used to go through a fresh
+``urllib.request.urlopen``: a new TCP connection (and TLS handshake for
+OpenAI) per request, and a 1.5s blocking probe each time the JD panel
+asked "is Ollama up?". This module keeps connections open and shares them.
+
+What you get
+~~~~~~~~~~~~
+* :class:`HTTPClient` — thread-safe pool of keep-alive
+  ``http.client`` connections per host, a configurable cap on concurrent
+  requests per host, retries with exponential backoff on 429/502/503/504
+  and on dropped connections (never on read timeouts), and NDJSON
+  streaming.
+* :class:`AsyncHTTPClient` — the asyncio equivalent (stdlib streams, no
+  aiohttp), with :meth:`~AsyncHTTPClient.gather` for bounded fan-out and
+  :meth:`~AsyncHTTPClient.pipeline` to send several requests down one
+  connection before reading the responses.
+* A cached health state per host: every request records whether the host
+  answered without a 5xx, and :meth:`HTTPClient.probe` only hits the network when that
+  record is older than its TTL.
+
+Errors surface as :class:`HTTPRequestError`, a subclass of ``OSError`` so
+callers that already catch network errors keep working.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import ssl
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Errors that mean "the pooled socket went stale" rather than "the host is
+# down"; a request that hits one of these on a reused connection is
+# replayed once on a fresh connection without counting as a retry.
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+class HTTPRequestError(OSError):
+    """A request failed (network error, or an HTTP status >= 400)."""
+
+    def __init__(self, message: str, status: Optional[int] = None, body: bytes = b""):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+def _split(url: str) -> Tuple[Tuple[str, str, int], str]:
+    parts = urlsplit(url)
+    scheme = parts.scheme or "http"
+    port = parts.port or (443 if scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    return (scheme, parts.hostname or "localhost", port), path
+
+
+def _base(key: Tuple[str, str, int]) -> str:
+    return f"{key[0]}://{key[1]}:{key[2]}"
+
+
+def _encode(payload: Any, headers: Optional[Dict[str, str]]) -> Tuple[Optional[bytes], Dict[str, str]]:
+    hdrs = dict(headers or {})
+    if payload is None:
+        return None, hdrs
+    if isinstance(payload, (bytes, bytearray)):
+        return bytes(payload), hdrs
+    hdrs.setdefault("Content-Type", "application/json")
+    return json.dumps(payload).encode("utf-8"), hdrs
+
+
+class _HealthMixin:
+    """Per-host "did it answer?" record shared by both clients."""
+
+    def _init_health(self, health_ttl: float) -> None:
+        self.health_ttl = health_ttl
+        self._health: Dict[str, Tuple[float, bool]] = {}
+
+    def _record(self, key: Tuple[str, str, int], ok: bool) -> None:
+        self._health[_base(key)] = (time.monotonic(), ok)
+
+    def cached_health(self, url: str) -> Optional[bool]:
+        """Last known reachability of ``url``'s host, or None if stale/unknown."""
+        key, _ = _split(url)
+        hit = self._health.get(_base(key))
+        if hit is None or time.monotonic() - hit[0] > self.health_ttl:
+            return None
+        return hit[1]
+
+
+# --------------------------------------------------------------------------
+# Synchronous client
+# --------------------------------------------------------------------------
+
+class HTTPClient(_HealthMixin):
+    """Thread-safe keep-alive HTTP/1.1 client.
+
+    Parameters
+    ----------
+    max_connections : int
+        Concurrent requests allowed per host. Idle connections are kept
+        for reuse up to the same number.
+    retries : int
+        Extra attempts on 429/502/503/504 or a dropped connection.
+    backoff : float
+        First retry delay in seconds; doubles on every further retry.
+    timeout : float
+        Default socket timeout per request.
+    health_ttl : float
+        How long a host's last known health stays fresh for :meth:`probe`.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 4,
+        retries: int = 2,
+        backoff: float = 0.25,
+        timeout: float = 60.0,
+        health_ttl: float = 30.0,
+    ):
+        self.max_connections = max(1, int(max_connections))
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._slots: Dict[Tuple[str, str, int], threading.BoundedSemaphore] = {}
+        self._init_health(health_ttl)
+
+    # ------------------------------------------------------------------
+    # Pool
+    # ------------------------------------------------------------------
+    def _slot(self, key: Tuple[str, str, int]) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_connections)
+                self._slots[key] = slot
+            return slot
+
+    def _checkout(self, key: Tuple[str, str, int], timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _checkin(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection, reusable: bool) -> None:
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_connections:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle.clear()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def _open(
+        self,
+        method: str,
+        url: str,
+        payload: Any,
+        headers: Optional[Dict[str, str]],
+        timeout: Optional[float],
+        retries: Optional[int],
+    ):
+        """Send a request (with retries) and return the live response.
+
+        The caller owns the returned connection and slot and must hand
+        them back via ``_finish``.
+        """
+        key, path = _split(url)
+        body, hdrs = _encode(payload, headers)
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        slot = self._slot(key)
+        attempt = 0
+        while True:
+            slot.acquire()
+            conn, reused = self._checkout(key, timeout)
+            try:
+                conn.request(method, path, body=body, headers=hdrs)
+                resp = conn.getresponse()
+            except _STALE_ERRORS as e:
+                conn.close()
+                slot.release()
+                if reused:
+                    continue  # stale keep-alive socket: replay on a fresh one
+                if attempt < retries:
+                    time.sleep(self.backoff * (2 ** attempt))
+                    attempt += 1
+                    continue
+                self._record(key, False)
+                raise HTTPRequestError(f"{method} {url} failed: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                # Timeouts land here and are not retried: a generate call that
+                # already waited out its timeout would only wait it out again.
+                conn.close()
+                slot.release()
+                self._record(key, False)
+                raise HTTPRequestError(f"{method} {url} failed: {e}") from e
+
+            if resp.status in _RETRY_STATUSES and attempt < retries:
+                resp.read()
+                self._checkin(key, conn, not resp.will_close)
+                slot.release()
+                time.sleep(self.backoff * (2 ** attempt))
+                attempt += 1
+                continue
+            self._record(key, resp.status < 500)
+            return key, conn, resp, slot
+
+    def _finish(self, key, conn, resp, slot, reusable: bool) -> None:
+        self._checkin(key, conn, reusable and not resp.will_close)
+        slot.release()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        payload: Any = None,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+    ) -> Tuple[int, bytes]:
+        """Send one request and return ``(status, body)``.
+
+        Raises :class:`HTTPRequestError` on network failure or status >= 400.
+        """
+        key, conn, resp, slot = self._open(method, url, payload, headers, timeout, retries)
+        ok = False
+        try:
+            data = resp.read()
+            ok = True
+        except (OSError, http.client.HTTPException) as e:
+            raise HTTPRequestError(f"{method} {url} failed reading response: {e}") from e
+        finally:
+            self._finish(key, conn, resp, slot, ok)
+        if resp.status >= 400:
+            raise HTTPRequestError(f"{method} {url} returned HTTP {resp.status}", resp.status, data)
+        return resp.status, data
+
+    def request_json(self, method: str, url: str, payload: Any = None, **kwargs) -> Any:
+        """:meth:`request` and decode the JSON body."""
+        _, data = self.request(method, url, payload, **kwargs)
+        return json.loads(data.decode("utf-8"))
+
+    def stream_lines(
+        self,
+        method: str,
+        url: str,
+        payload: Any = None,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[bytes]:
+        """Yield non-empty response lines as they arrive (NDJSON streaming).
+
+        The connection goes back to the pool once the body is fully read;
+        if the consumer stops early it is closed instead.
+        """
+        key, conn, resp, slot = self._open(method, url, payload, headers, timeout, None)
+        drained = False
+        try:
+            if resp.status >= 400:
+                data = resp.read()
+                drained = True
+                raise HTTPRequestError(f"{method} {url} returned HTTP {resp.status}", resp.status, data)
+            for line in resp:
+                line = line.strip()
+                if line:
+                    yield line
+            resp.read()  # consume the terminator so the connection is reusable
+            drained = True
+        finally:
+            self._finish(key, conn, resp, slot, drained)
+
+    def probe(self, url: str, *, timeout: float = 1.5, force: bool = False) -> bool:
+        """True if ``url`` answers 200; cached per host for ``health_ttl``."""
+        if not force:
+            cached = self.cached_health(url)
+            if cached is not None:
+                return cached
+        try:
+            status, _ = self.request("GET", url, timeout=timeout, retries=0)
+        except OSError:
+            status = None
+        # Cache the probe's own verdict, so a 404 reads the same cached or not.
+        ok = status == 200
+        self._record(_split(url)[0], ok)
+        return ok
+
+
+# --------------------------------------------------------------------------
+# asyncio client
+# --------------------------------------------------------------------------
+
+class _AsyncConn:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class AsyncHTTPClient(_HealthMixin):
+    """asyncio keep-alive HTTP/1.1 client (stdlib streams only).
+
+    Same knobs as :class:`HTTPClient`. ``max_connections`` bounds both the
+    idle pool and the number of in-flight requests per host.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 4,
+        retries: int = 2,
+        backoff: float = 0.25,
+        timeout: float = 60.0,
+        health_ttl: float = 30.0,
+    ):
+        self.max_connections = max(1, int(max_connections))
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], List[_AsyncConn]] = {}
+        self._slots: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self._init_health(health_ttl)
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        for idle in self._idle.values():
+            for conn in idle:
+                conn.close()
+        self._idle.clear()
+
+    def _slot(self, key: Tuple[str, str, int]) -> asyncio.Semaphore:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = asyncio.Semaphore(self.max_connections)
+            self._slots[key] = slot
+        return slot
+
+    async def _checkout(self, key: Tuple[str, str, int]) -> Tuple[_AsyncConn, bool]:
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn.writer.is_closing() and not conn.reader.at_eof():
+                return conn, True
+            conn.close()
+        scheme, host, port = key
+        ctx = ssl.create_default_context() if scheme == "https" else None
+        reader, writer = await asyncio.open_connection(host, port, ssl=ctx)
+        return _AsyncConn(reader, writer), False
+
+    def _checkin(self, key: Tuple[str, str, int], conn: _AsyncConn, reusable: bool) -> None:
+        idle = self._idle.setdefault(key, [])
+        if reusable and len(idle) < self.max_connections:
+            idle.append(conn)
+        else:
+            conn.close()
+
+    @staticmethod
+    def _request_bytes(method: str, host: str, path: str, body: Optional[bytes], headers: Dict[str, str]) -> bytes:
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}", "Connection: keep-alive"]
+        for name, value in headers.items():
+            lines.append(f"{name}: {value}")
+        lines.append(f"Content-Length: {len(body or b'')}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b"")
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bytes, bool]:
+        """Read one response; returns ``(status, body, reusable)``."""
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before response")
+        status = int(status_line.split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        reusable = headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            reusable = False
+        return status, body, reusable
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        payload: Any = None,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+    ) -> Tuple[int, bytes]:
+        """Send one request and return ``(status, body)``."""
+        key, path = _split(url)
+        body, hdrs = _encode(payload, headers)
+        raw = self._request_bytes(method, key[1], path, body, hdrs)
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        attempt = 0
+        async with self._slot(key):
+            while True:
+                conn = None
+                reused = False
+                try:
+                    conn, reused = await self._checkout(key)
+                    conn.writer.write(raw)
+                    await conn.writer.drain()
+                    status, data, reusable = await asyncio.wait_for(
+                        self._read_response(conn.reader), timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    if conn is not None:
+                        conn.close()
+                    if reused:
+                        continue
+                    if attempt < retries and not isinstance(e, ConnectionRefusedError):
+                        await asyncio.sleep(self.backoff * (2 ** attempt))
+                        attempt += 1
+                        continue
+                    self._record(key, False)
+                    raise HTTPRequestError(f"{method} {url} failed: {e}") from e
+                except (OSError, asyncio.TimeoutError, ValueError) as e:
+                    if conn is not None:
+                        conn.close()
+                    self._record(key, False)
+                    raise HTTPRequestError(f"{method} {url} failed: {e}") from e
+
+                self._checkin(key, conn, reusable)
+                if status in _RETRY_STATUSES and attempt < retries:
+                    await asyncio.sleep(self.backoff * (2 ** attempt))
+                    attempt += 1
+                    continue
+                self._record(key, status < 500)
+                if status >= 400:
+                    raise HTTPRequestError(f"{method} {url} returned HTTP {status}", status, data)
+                return status, data
+
+    async def request_json(self, method: str, url: str, payload: Any = None, **kwargs) -> Any:
+        _, data = await self.request(method, url, payload, **kwargs)
+        return json.loads(data.decode("utf-8"))
+
+    async def gather(self, requests: Iterable[Tuple[str, str, Any]]) -> List[Any]:
+        """Run ``(method, url, payload)`` requests concurrently; JSON results in order.
+
+        Concurrency per host is capped at ``max_connections``.
+        """
+        return await asyncio.gather(
+            *(self.request_json(method, url, payload) for method, url, payload in requests)
+        )
+
+    async def pipeline(self, method: str, url: str, payloads: List[Any]) -> List[Tuple[int, bytes]]:
+        """Pipeline several requests down one keep-alive connection.
+
+        All requests are written before any response is read, which saves
+        a round trip per request on servers that accept HTTP/1.1
+        pipelining (Ollama's Go server does). No retries: a failure
+        raises :class:`HTTPRequestError` for the whole pipeline.
+        """
+        key, path = _split(url)
+        async with self._slot(key):
+            conn, _ = await self._checkout(key)
+            try:
+                for payload in payloads:
+                    body, hdrs = _encode(payload, None)
+                    conn.writer.write(self._request_bytes(method, key[1], path, body, hdrs))
+                await conn.writer.drain()
+                out = []
+                reusable = True
+                for _ in payloads:
+                    status, data, reusable = await asyncio.wait_for(
+                        self._read_response(conn.reader), self.timeout
+                    )
+                    out.append((status, data))
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+                conn.close()
+                self._record(key, False)
+                raise HTTPRequestError(f"pipelined {method} {url} failed: {e}") from e
+            self._checkin(key, conn, reusable)
+            self._record(key, all(status < 500 for status, _ in out))
+            return out
+
+    async def probe(self, url: str, *, timeout: float = 1.5, force: bool = False) -> bool:
+        if not force:
+            cached = self.cached_health(url)
+            if cached is not None:
+                return cached
+        try:
+            status, _ = await self.request("GET", url, timeout=timeout, retries=0)
+        except OSError:
+            status = None
+        ok = status == 200
+        self._record(_split(url)[0], ok)
+        return ok
+
+
+# --------------------------------------------------------------------------
+# Shared instance
+# --------------------------------------------------------------------------
+
+_shared: Optional[HTTPClient] = None
+_shared_lock = threading.Lock()
+
+
+def shared_client() -> HTTPClient:
+    """Process-wide :class:`HTTPClient`, configured from ``user_config.llm``."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            from helpers import user_config
+            cfg = user_config.llm_config() or {}
+            _shared = HTTPClient(
+                max_connections=cfg.get("http_max_connections") or 4,
+                retries=cfg.get("http_retries", 2),
+                backoff=cfg.get("http_backoff", 0.25),
+                health_ttl=cfg.get("health_ttl", 30.0),
+            )
+        return _shared
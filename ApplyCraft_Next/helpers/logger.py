@@ -1,5 +1,9 @@
+import contextvars
+import json
 import logging
 import os
+import threading
+import time
 from datetime import datetime
 
 class Logger:
@@ -46,4 +50,152 @@ class Logger:
     def debug(self, message):
         self.logger.debug(message)
 
+    # ------------------------------------------------------------------
+    # Timing spans
+    # ------------------------------------------------------------------
+    # ``with logger.trace("jd_ranking", enabled=...) as trace:`` collects
+    # every ``with logger.span("embed.backend"):`` entered on the same
+    # thread until the block ends. The trace then gives a per-stage
+    # breakdown and a Chrome trace file (load it in chrome://tracing or
+    # Perfetto). When no trace is active, span() returns a shared no-op
+    # object, so instrumented code costs one context-variable lookup.
+
+    def trace(self, name, enabled=True):
+        if not enabled:
+            return _NULL_TRACE
+        return Trace(name, self)
+
+    def span(self, name, **args):
+        trace = _ACTIVE_TRACE.get()
+        if trace is None:
+            return _NULL_SPAN
+        return _Span(trace, name, args)
+
+
+_ACTIVE_TRACE = contextvars.ContextVar("applycraft_trace", default=None)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _NullTrace(_NullSpan):
+    __slots__ = ()
+    events = ()
+
+    def breakdown(self):
+        return []
+
+    def format_breakdown(self):
+        return ""
+
+    def dump(self, path=None):
+        return None
+
+
+_NULL_TRACE = _NullTrace()
+
+
+class _Span:
+    __slots__ = ("trace", "name", "args", "start", "depth")
+
+    def __init__(self, trace, name, args):
+        self.trace = trace
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.depth = self.trace._depth
+        self.trace._depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.trace._depth -= 1
+        self.trace.events.append((self.name, self.start, end - self.start, self.depth, self.args))
+        return False
+
+
+class Trace:
+    """Spans recorded while one traced operation ran."""
+
+    def __init__(self, name, log):
+        self.name = name
+        self.events = []  # (name, start, seconds, depth, args), in completion order
+        self.started = 0.0
+        self.duration = 0.0
+        self._depth = 1
+        self._log = log
+        self._token = None
+        self._tid = threading.get_ident()
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self._token = _ACTIVE_TRACE.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.duration = time.perf_counter() - self.started
+        _ACTIVE_TRACE.reset(self._token)
+        self._log.debug(f"Trace {self.name}: {self.duration * 1000:.1f} ms\n{self.format_breakdown()}")
+        return False
+
+    def breakdown(self):
+        """``(depth, name, total_ms, calls)`` per stage, in start order."""
+        totals = {}
+        for name, start, seconds, depth, _ in sorted(self.events, key=lambda e: e[1]):
+            entry = totals.setdefault((depth, name), [depth, name, 0.0, 0])
+            entry[2] += seconds * 1000
+            entry[3] += 1
+        return [tuple(entry) for entry in totals.values()]
+
+    def format_breakdown(self):
+        lines = [f"{self.name:<32} {self.duration * 1000:>9.1f} ms"]
+        for depth, name, ms, calls in self.breakdown():
+            label = "  " * depth + name + (f" x{calls}" if calls > 1 else "")
+            lines.append(f"{label:<32} {ms:>9.1f} ms")
+        return "\n".join(lines)
+
+    def to_chrome(self):
+        """Chrome trace-event JSON (complete events, microseconds)."""
+        pid = os.getpid()
+        events = [{
+            "name": self.name, "ph": "X", "ts": 0, "dur": round(self.duration * 1e6),
+            "pid": pid, "tid": self._tid,
+        }]
+        for name, start, seconds, _, args in self.events:
+            event = {
+                "name": name, "ph": "X",
+                "ts": round((start - self.started) * 1e6), "dur": round(seconds * 1e6),
+                "pid": pid, "tid": self._tid,
+            }
+            if args:
+                event["args"] = {k: str(v) for k, v in args.items()}
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path=None):
+        """Write :meth:`to_chrome` to ``path`` (default logs/traces/<name>_<time>.json)."""
+        if path is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            path = os.path.join(
+                base_dir, "logs", "traces",
+                f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome(), f)
+        return path
+
+
 logger = Logger()
@@ -18,16 +18,28 @@ Resolution order
    wizard, or hand-edited from ``user_config.example.json``).
 2. Built-in safe defaults so the app still opens if the file is missing
    (the GUI will then prompt the user to run setup).
+
+Inventory versioning
+~~~~~~~~~~~~~~~~~~~~
+:func:`inventory_version` goes up by one whenever ``job_positions``
+changes, whether through :func:`save` or a hand edit noticed by
+:func:`load`. :func:`bullet_hashes` gives per-bullet content hashes, and
+:func:`inventory_diff` lists what was added, removed or edited since an
+earlier version. The ranker caches use these to skip unchanged
+inventories and to do only the work a change needs.
 """
 
 from __future__ import annotations
 
 import copy
+import hashlib
 import json
 import os
 import sys
 import threading
-from typing import Any, Dict, Optional
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 
 
 # --------------------------------------------------------------------------
@@ -89,6 +101,7 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         #   "sentence_transformers"  - on-device embeddings (the local LLM).
         #                              Falls back to TF-IDF if not installed.
         #   "local"                  - pure-Python TF-IDF (zero deps)
+        #   "bm25"                   - pure-Python BM25 with phrase boosting
         #   "ollama"                 - local Ollama daemon on localhost
         #   "openai"                 - paid cloud (data leaves the machine)
         #
@@ -100,6 +113,86 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "recommendation_model": "llama3.2:3b",
         "api_key": "",
         "host": "http://localhost:11434",
+        # Bullet embeddings are cached on disk under cache/embeddings so
+        # only new or edited bullets are re-embedded per ranking.
+        "embedding_cache": True,
+        "embedding_cache_max_entries": 50000,
+        # On-disk element type for cached embeddings: "float32" (exact),
+        # "float16" (half size) or "int8" (quarter size, per-row scale).
+        "embedding_cache_dtype": "float32",
+        # Shared keep-alive HTTP client (Ollama / OpenAI): concurrent
+        # connections per host, retries on 429/5xx with exponential
+        # backoff, and how long a reachability probe result is trusted.
+        "http_max_connections": 4,
+        "http_retries": 2,
+        "http_backoff": 0.25,
+        "health_ttl": 30,
+        # Ollama / OpenAI embeddings go out in chunks of this many texts,
+        # up to embed_workers at a time; a failed chunk is re-sent on its
+        # own up to embed_chunk_retries times.
+        "embed_chunk_size": 128,
+        "embed_workers": 4,
+        "embed_chunk_retries": 2,
+        # Finished JD rankings and recommendations are memoised in
+        # jd_results.db (next to application_stats.db), capped at this size.
+        "jd_result_cache": True,
+        "jd_result_cache_max_mb": 32,
+        # Approximate nearest-neighbour search for large shared libraries.
+        # When on and the inventory has at least ann_min_bullets bullets,
+        # dense backends only score bullets in the ann_nprobe nearest IVF
+        # lists (more lists = better recall, slower). ann_nlist 0 = auto.
+        "ann_index": False,
+        "ann_min_bullets": 5000,
+        "ann_nlist": 0,
+        "ann_nprobe": 8,
+        # Hybrid lexical + dense scoring for the embedding backends:
+        # "off", "weighted" (blend cosine with normalised BM25) or "rrf"
+        # (reciprocal-rank fusion). hybrid_prefilter > 0 scores only the
+        # top-N BM25 bullets densely. bm25_k1 / bm25_b tune term
+        # saturation and length normalisation; bm25_phrase_boost weights
+        # bigram matches ("power bi") for the "bm25" provider.
+        "hybrid": "off",
+        "hybrid_dense_weight": 0.7,
+        "hybrid_lexical_weight": 0.3,
+        "hybrid_rrf_k": 60,
+        "hybrid_prefilter": 0,
+        "bm25_k1": 1.2,
+        "bm25_b": 0.75,
+        "bm25_phrase_boost": 2.0,
+        # Tokeniser: memoised per-text results (LRU entries) and optional
+        # light suffix stemming ("reports"/"reporting" -> "report").
+        # Changing stemming takes effect on restart.
+        "token_cache_size": 4096,
+        "stemming": False,
+        # Load the sentence-transformers model in a background process
+        # at startup, so the first ranking doesn't stall and encoding
+        # doesn't compete with the GUI for the GIL.
+        "warm_model_process": False,
+        # Time each stage of "Rank Against JD" (tokenising, embedding,
+        # scoring, fit, recommendations) and show the breakdown in the JD
+        # panel. profile_trace_dump also writes each run to
+        # logs/traces/ as Chrome trace JSON.
+        "profile_ranking": False,
+        "profile_trace_dump": False,
+    },
+    "tracker": {
+        # Follow outputs/ with a filesystem watcher so the application
+        # tracker picks up new and deleted folders without rescanning.
+        # watch_backend: "auto" (inotify on Linux, else polling),
+        # "inotify" or "polling". Events are applied once the tree has
+        # been quiet for watch_debounce seconds, at most watch_max_delay
+        # seconds after the first one.
+        "watch_outputs": False,
+        "watch_backend": "auto",
+        "watch_debounce": 0.5,
+        "watch_max_delay": 5.0,
+        "watch_poll_interval": 5.0,
+        # Legacy application_stats.json / application_deleted.json
+        # mirrors: "background" (rewritten off the UI thread, bursts of
+        # changes coalesced over json_mirror_delay seconds), "on_demand"
+        # (only on export_json_mirror() and when the app closes) or "off".
+        "json_mirror": "background",
+        "json_mirror_delay": 0.5,
     },
 }
 
@@ -128,6 +221,11 @@ def example_path() -> str:
     return os.path.join(_project_root(), "user_config.example.json")
 
 
+def cache_dir() -> str:
+    """Absolute path to the local cache folder (embeddings, indexes)."""
+    return os.path.join(_project_root(), "cache")
+
+
 # --------------------------------------------------------------------------
 # Load / save
 # --------------------------------------------------------------------------
@@ -173,6 +271,7 @@ def load(force_reload: bool = False) -> Dict[str, Any]:
                 on_disk = {}
 
         _cache = _deep_merge(DEFAULT_CONFIG, on_disk)
+        _record_inventory(_cache.get("job_positions") or DEFAULT_CONFIG["job_positions"])
         return _cache
 
 
@@ -188,6 +287,7 @@ def save(cfg: Dict[str, Any]) -> None:
         with open(path, "w", encoding="utf-8") as f:
             json.dump(merged, f, indent=2, ensure_ascii=False)
         _cache = merged
+        _record_inventory(merged.get("job_positions") or DEFAULT_CONFIG["job_positions"])
 
 
 def is_first_run() -> bool:
@@ -195,6 +295,163 @@ def is_first_run() -> bool:
     return not os.path.exists(config_path())
 
 
+# --------------------------------------------------------------------------
+# Inventory versioning
+# --------------------------------------------------------------------------
+# State lives in cache/inventory_state.json:
+#
+#   {"version": 7,
+#    "bullets": {job: [[hash, text], ...]},     inventory at that version
+#    "log": [{"version": 7, "added": [...], "removed": [...], "edited": [...]}]}
+#
+# A bullet is identified by its job and position within the job. Changing
+# the text at the same position counts as an edit. Anything else that
+# changes the hashes counts as an add or a remove. A pure reorder still
+# bumps the version, with an empty entry, because rankings are
+# position-based. Only the last ``_INVENTORY_LOG_LIMIT`` versions are
+# kept. Older diffs come back as ``None`` and callers rebuild from
+# scratch.
+
+_INVENTORY_LOG_LIMIT = 100
+_inventory_state: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class InventoryDiff:
+    """Bullet changes between two inventory versions, oldest first."""
+    since: int
+    version: int
+    added: List[Tuple[str, int, str]] = field(default_factory=list)            # (job, index, text)
+    removed: List[Tuple[str, int, str]] = field(default_factory=list)          # (job, index, text)
+    edited: List[Tuple[str, int, str, str]] = field(default_factory=list)      # (job, index, old, new)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.edited)
+
+
+def bullet_hash(text: str) -> str:
+    """Short content hash of one bullet."""
+    return hashlib.blake2b((text or "").encode("utf-8"), digest_size=8).hexdigest()
+
+
+def inventory_state_path() -> str:
+    return os.path.join(cache_dir(), "inventory_state.json")
+
+
+def _read_inventory_state() -> Dict[str, Any]:
+    try:
+        with open(inventory_state_path(), "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if isinstance(state.get("version"), int) and isinstance(state.get("bullets"), dict):
+            state.setdefault("log", [])
+            return state
+    except (OSError, ValueError, AttributeError):
+        pass  # Missing or corrupt -> start again from version 0.
+    return {"version": 0, "bullets": {}, "log": []}
+
+
+def _diff_job(job: str, old: List[List[str]], new: List[List[str]], entry: Dict[str, list]) -> None:
+    """Append ``job``'s added / removed / edited bullets to ``entry``."""
+    spare_new = Counter(h for h, _ in new)
+    lost = []
+    for i, (h, _) in enumerate(old):
+        if spare_new[h]:
+            spare_new[h] -= 1
+        else:
+            lost.append(i)
+    spare_old = Counter(h for h, _ in old)
+    gained = []
+    for i, (h, _) in enumerate(new):
+        if spare_old[h]:
+            spare_old[h] -= 1
+        else:
+            gained.append(i)
+
+    gained_set = set(gained)
+    for i in lost:
+        if i in gained_set:
+            entry["edited"].append([job, i, old[i][1], new[i][1]])
+            gained_set.discard(i)
+        else:
+            entry["removed"].append([job, i, old[i][1]])
+    entry["added"].extend([job, i, new[i][1]] for i in gained if i in gained_set)
+
+
+def _record_inventory(positions: Dict[str, list]) -> None:
+    """Bump the inventory version if ``positions`` differs from the last one seen."""
+    global _inventory_state
+    with _lock:
+        state = _inventory_state if _inventory_state is not None else _read_inventory_state()
+        bullets = {
+            job: [[bullet_hash(b), b] for b in (items or [])]
+            for job, items in (positions or {}).items()
+        }
+        if list(bullets.items()) == list(state["bullets"].items()):
+            _inventory_state = state
+            return
+
+        version = state["version"] + 1
+        entry: Dict[str, Any] = {"version": version, "added": [], "removed": [], "edited": []}
+        old = state["bullets"]
+        for job in list(old) + [j for j in bullets if j not in old]:
+            if old.get(job) != bullets.get(job):
+                _diff_job(job, old.get(job, []), bullets.get(job, []), entry)
+        _inventory_state = {
+            "version": version,
+            "bullets": bullets,
+            "log": (state["log"] + [entry])[-_INVENTORY_LOG_LIMIT:],
+        }
+
+        path = inventory_state_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(_inventory_state, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            pass  # Versions still work in-process; the next run starts over.
+
+
+def _current_inventory_state() -> Dict[str, Any]:
+    load()
+    with _lock:
+        if _inventory_state is None:
+            _record_inventory(job_positions())
+        return _inventory_state  # type: ignore[return-value]
+
+
+def inventory_version() -> int:
+    """Monotonically increasing version of ``job_positions``."""
+    return _current_inventory_state()["version"]
+
+
+def bullet_hashes() -> Dict[str, List[str]]:
+    """Job title -> content hash of each bullet, in inventory order."""
+    state = _current_inventory_state()
+    return {job: [h for h, _ in rows] for job, rows in state["bullets"].items()}
+
+
+def inventory_diff(since: int) -> Optional[InventoryDiff]:
+    """Bullets added, removed and edited after version ``since``.
+
+    Returns an empty diff if nothing changed, or ``None`` if ``since`` is
+    older than the kept history (the caller should rebuild from scratch).
+    """
+    state = _current_inventory_state()
+    diff = InventoryDiff(since=since, version=state["version"])
+    if since >= state["version"]:
+        return diff
+    entries = [e for e in state["log"] if e["version"] > since]
+    if not entries or entries[0]["version"] != since + 1:
+        return None
+    for e in entries:
+        diff.added.extend(tuple(x) for x in e["added"])
+        diff.removed.extend(tuple(x) for x in e["removed"])
+        diff.edited.extend(tuple(x) for x in e["edited"])
+    return diff
+
+
 # --------------------------------------------------------------------------
 # Convenience accessors used across the codebase
 # --------------------------------------------------------------------------
@@ -277,3 +534,7 @@ def country_keywords() -> Dict[str, list]:
 
 def llm_config() -> Dict[str, Any]:
     return load().get("llm") or DEFAULT_CONFIG["llm"]
+
+
+def tracker_config() -> Dict[str, Any]:
+    return load().get("tracker") or DEFAULT_CONFIG["tracker"]
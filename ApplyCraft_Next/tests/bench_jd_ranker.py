@@ -0,0 +1,416 @@
+"""
+tests/bench_jd_ranker.py
+-------------------------
+Performance benchmarks for the JD ranker.
+
+Generates synthetic bullet inventories and job descriptions, then times
+``rank_bullets`` (cold and warm), ``compute_fit_score`` and
+``_build_tfidf`` for every backend. Embedding backends are swapped for a
+deterministic feature-hashing stub, so runs need no model download, daemon
+or API key, and the numbers measure ApplyCraft's own overhead rather than
+the model's.
+
+Usage::
+
+    python tests/bench_jd_ranker.py                        # quick matrix
+    python tests/bench_jd_ranker.py --full                 # 100..50k bullets, 200..5k-word JDs
+    python tests/bench_jd_ranker.py --backends local,ollama --sizes 1000,10000
+    python tests/bench_jd_ranker.py --compare bench_results/<earlier run>.json
+
+Every run writes a JSON file (default ``bench_results/jd_ranker_<UTC
+time>.json`` under the project root) with the environment and one row
+per case::
+
+    {"backend", "bullets", "jd_words",
+     "cold_s",                      first ranking (index build + embeddings)
+     "rank_p50_s", "rank_p95_s",    warm rankings
+     "fit_p50_s", "fit_p95_s",
+     "tfidf_p50_s", "tfidf_p95_s",  local backend only
+     "peak_mem_bytes",              tracemalloc high-water mark, cold ranking
+     "bullets_per_s", "rankings_per_s"}
+
+``--compare`` prints the change in warm p50 per case against an earlier
+file, so regressions show up between commits.
+
+``--dtypes float16,int8`` also checks quantised embedding caches. For each
+inventory size it ranks once through a float32 cache and once through each
+quantised one, all read back from disk, and records under
+``"quantisation"``::
+
+    {"dtype", "bullets", "cache_bytes",
+     "max_score_err",               largest |score - float32 score|
+     "top10_overlap"}               share of float32's top 10 kept
+
+Not collected by pytest (the file name has no ``test_`` prefix).
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+from unittest.mock import patch
+
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.dirname(_current_dir)
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from core import jd_ranker                 # noqa: E402
+from core.embedding_cache import EmbeddingStore  # noqa: E402
+from core.jd_index import BulletIndex      # noqa: E402
+
+try:
+    import numpy as _np  # type: ignore
+except Exception:
+    _np = None
+
+
+BACKENDS = ("local", "bm25", "sentence_transformers", "ollama", "openai")
+QUICK_SIZES = (100, 1000, 10000)
+QUICK_JD_WORDS = (200, 1000)
+FULL_SIZES = (100, 1000, 10000, 50000)
+FULL_JD_WORDS = (200, 1000, 5000)
+
+
+# --------------------------------------------------------------------------
+# Synthetic data
+# --------------------------------------------------------------------------
+
+_SKILLS = (
+    "python sql etl airflow spark kafka tableau powerbi looker dbt snowflake "
+    "bigquery redshift pandas numpy scikit pytorch tensorflow docker kubernetes "
+    "terraform aws azure gcp excel vba statistics regression forecasting "
+    "experimentation dashboards reporting stakeholders kpi okr governance "
+    "privacy security compliance automation pipelines modelling segmentation "
+    "churn retention pricing marketing finance operations logistics supply "
+    "healthcare retail banking insurance research analytics visualisation"
+).split()
+_VERBS = (
+    "built designed automated led delivered migrated optimised analysed "
+    "reduced increased launched mentored partnered owned scaled streamlined"
+).split()
+_FILLER = (
+    "the and for with across team teams data quarterly weekly cross functional "
+    "senior junior new existing legacy internal external global regional"
+).split()
+
+
+def make_inventory(n_bullets: int, seed: int = 0, per_job: int = 12) -> Dict[str, List[str]]:
+    """``n_bullets`` bullets of 8-20 words spread over jobs of ``per_job``."""
+    rng = random.Random(seed)
+    inventory: Dict[str, List[str]] = {}
+    for i in range(n_bullets):
+        words = [rng.choice(_VERBS)]
+        for _ in range(rng.randint(7, 19)):
+            pool = _SKILLS if rng.random() < 0.45 else _FILLER
+            words.append(rng.choice(pool))
+        words.append(f"{rng.randint(5, 95)}%")
+        inventory.setdefault(f"Company {i // per_job:05d} - Analyst", []).append(
+            " ".join(words).capitalize()
+        )
+    return inventory
+
+
+def make_jd(n_words: int, seed: int = 1) -> str:
+    """A ``n_words``-word posting over the same vocabulary."""
+    rng = random.Random(seed)
+    focus = rng.sample(_SKILLS, 12)
+    words = []
+    for _ in range(n_words):
+        r = rng.random()
+        if r < 0.25:
+            words.append(rng.choice(focus))
+        elif r < 0.40:
+            words.append(rng.choice(_SKILLS))
+        else:
+            words.append(rng.choice(_FILLER + _VERBS))
+    return "Senior Data Analyst. " + " ".join(words) + "."
+
+
+# --------------------------------------------------------------------------
+# Deterministic embedding stub
+# --------------------------------------------------------------------------
+
+class StubEmbedder:
+    """Feature-hashing embedder standing in for every embedding backend.
+
+    Vectors are memoised per text so the timings cover ApplyCraft's
+    scoring path, not the stub.
+    """
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+        self._memo: Dict[str, List[float]] = {}
+
+    def _vector(self, text: str) -> List[float]:
+        vec = self._memo.get(text)
+        if vec is None:
+            vec = [0.0] * self.dim
+            for token in jd_ranker._tokenize(text):
+                h = zlib.crc32(token.encode("utf-8"))
+                vec[h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+            norm = sum(v * v for v in vec) ** 0.5 or 1.0
+            vec = [v / norm for v in vec]
+            self._memo[text] = vec
+        return vec
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(t) for t in texts]
+
+    # sentence-transformers model interface
+    def encode(self, texts: List[str], **_: Any) -> Any:
+        vecs = self.embed(list(texts))
+        return _np.asarray(vecs, dtype=_np.float32) if _np is not None else vecs
+
+
+@contextlib.contextmanager
+def backend_patches(backend: str, stub: StubEmbedder):
+    """Route ``backend`` to ``stub`` and keep every on-disk cache out of it."""
+    cfg = {"provider": backend, "api_key": "bench" if backend == "openai" else ""}
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(patch.object(jd_ranker, "_resolve_backend", return_value=(backend, cfg)))
+        stack.enter_context(patch.object(jd_ranker, "_BULLET_INDEX", BulletIndex(jd_ranker._content_ids)))
+        stack.enter_context(patch.object(jd_ranker, "_BM25_INDEX", BulletIndex(jd_ranker._bm25_terms)))
+        stack.enter_context(patch.object(jd_ranker.embedding_cache, "get_store", return_value=None))
+        stack.enter_context(patch.object(jd_ranker.jd_result_cache, "get_cache", return_value=None))
+        stack.enter_context(patch.object(jd_ranker, "_load_sentence_transformer", return_value=stub))
+        stack.enter_context(patch.object(
+            jd_ranker, "_ollama_embed_batch", side_effect=lambda inputs, model, host: stub.embed(inputs)))
+        stack.enter_context(patch.object(
+            jd_ranker, "_openai_embed_batch", side_effect=lambda inputs, model, key: stub.embed(inputs)))
+        yield
+
+
+# --------------------------------------------------------------------------
+# Measurement
+# --------------------------------------------------------------------------
+
+def _percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    pos = (len(ordered) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def _timed(fn: Callable[[], Any], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_case(backend: str, n_bullets: int, jd_words: int, repeat: int, dim: int) -> Dict[str, Any]:
+    inventory = make_inventory(n_bullets)
+    jd = make_jd(jd_words)
+    stub = StubEmbedder(dim)
+    row: Dict[str, Any] = {"backend": backend, "bullets": n_bullets, "jd_words": jd_words}
+
+    # Memory high-water mark of a cold ranking, in its own fresh index so
+    # tracemalloc overhead doesn't leak into the timings below.
+    with backend_patches(backend, stub):
+        stub.embed([jd] + [b for bullets in inventory.values() for b in bullets])
+        tracemalloc.start()
+        jd_ranker.rank_bullets(jd, inventory)
+        row["peak_mem_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    with backend_patches(backend, stub):
+        start = time.perf_counter()
+        ranked = jd_ranker.rank_bullets(jd, inventory)
+        row["cold_s"] = time.perf_counter() - start
+        row["backend_label"] = jd_ranker._LAST_BACKEND_USED
+
+        ranks = _timed(lambda: jd_ranker.rank_bullets(jd, inventory), repeat)
+        fits = _timed(lambda: jd_ranker.compute_fit_score(jd, ranked), repeat)
+
+    row["rank_p50_s"] = _percentile(ranks, 0.50)
+    row["rank_p95_s"] = _percentile(ranks, 0.95)
+    row["fit_p50_s"] = _percentile(fits, 0.50)
+    row["fit_p95_s"] = _percentile(fits, 0.95)
+    row["rankings_per_s"] = 1.0 / row["rank_p50_s"] if row["rank_p50_s"] else 0.0
+    row["bullets_per_s"] = n_bullets * row["rankings_per_s"]
+
+    if backend == "local":
+        docs = [jd_ranker._content_tokens(b) for bullets in inventory.values() for b in bullets]
+        tfidf = _timed(lambda: jd_ranker._build_tfidf(docs), max(1, repeat // 2))
+        row["tfidf_p50_s"] = _percentile(tfidf, 0.50)
+        row["tfidf_p95_s"] = _percentile(tfidf, 0.95)
+    return row
+
+
+def _cache_bytes(folder: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(folder, name))
+        for name in os.listdir(folder)
+        if not name.startswith(("index.db", "ivf."))
+    )
+
+
+def run_quantisation(dtypes: List[str], n_bullets: int, jd_words: int, dim: int) -> List[Dict[str, Any]]:
+    """Score drift and top-10 overlap of quantised caches vs float32."""
+    inventory = make_inventory(n_bullets)
+    jd = make_jd(jd_words)
+    stub = StubEmbedder(dim)
+    root = tempfile.mkdtemp(prefix="applycraft_bench_quant_")
+    results: Dict[str, Any] = {}
+    try:
+        for dtype in ["float32"] + [d for d in dtypes if d != "float32"]:
+            store = EmbeddingStore(root, "bench", "stub", dtype=dtype)
+            with backend_patches("ollama", stub), \
+                    patch.object(jd_ranker.embedding_cache, "get_store", return_value=store):
+                jd_ranker.rank_bullets(jd, inventory)  # fills the cache
+                with patch.object(jd_ranker, "_BULLET_INDEX", BulletIndex(jd_ranker._content_ids)):
+                    ranked = jd_ranker.rank_bullets(jd, inventory)  # read back from disk
+            results[dtype] = (ranked, _cache_bytes(store.folder))
+            store.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    reference = {(r.job_title, r.bullet): r.score for r in results["float32"][0]}
+    top_ref = {(r.job_title, r.bullet) for r in results["float32"][0][:10]}
+    rows = []
+    for dtype, (ranked, size) in results.items():
+        rows.append({
+            "dtype": dtype,
+            "bullets": n_bullets,
+            "cache_bytes": size,
+            "max_score_err": max(
+                (abs(r.score - reference[(r.job_title, r.bullet)]) for r in ranked), default=0.0),
+            "top10_overlap": len(top_ref & {(r.job_title, r.bullet) for r in ranked[:10]})
+            / max(1, len(top_ref)),
+        })
+    return rows
+
+
+def _print_lexical_comparison(rows: List[Dict[str, Any]]) -> None:
+    """Warm p50 of the bm25 provider relative to local TF-IDF, per case."""
+    local = {(r["bullets"], r["jd_words"]): r for r in rows if r["backend"] == "local"}
+    pairs = [(r, local.get((r["bullets"], r["jd_words"]))) for r in rows if r["backend"] == "bm25"]
+    pairs = [(r, l) for r, l in pairs if l and l["rank_p50_s"]]
+    if not pairs:
+        return
+    print("\nbm25 vs local TF-IDF (warm p50):")
+    for row, base in pairs:
+        print(f"  {row['bullets']:>6} bullets {row['jd_words']:>5} words  "
+              f"{row['rank_p50_s'] / base['rank_p50_s']:5.2f}x")
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_project_root,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": getattr(_np, "__version__", None),
+    }
+
+
+def _compare(rows: List[Dict[str, Any]], previous_path: str) -> None:
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+    before = {(r["backend"], r["bullets"], r["jd_words"]): r for r in previous.get("results", [])}
+    print(f"\nWarm p50 vs {previous_path} ({previous.get('environment', {}).get('commit', '?')}):")
+    for row in rows:
+        old = before.get((row["backend"], row["bullets"], row["jd_words"]))
+        if not old or not old.get("rank_p50_s"):
+            continue
+        change = (row["rank_p50_s"] / old["rank_p50_s"] - 1.0) * 100
+        print(f"  {row['backend']:<22} {row['bullets']:>6} bullets {row['jd_words']:>5} words  {change:+6.1f}%")
+
+
+def _ints(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the JD ranker on synthetic data.")
+    parser.add_argument("--backends", default=",".join(BACKENDS),
+                        help="Comma-separated subset of: " + ", ".join(BACKENDS))
+    parser.add_argument("--sizes", help="Inventory sizes in bullets, e.g. 100,1000,10000")
+    parser.add_argument("--jd-words", help="JD lengths in words, e.g. 200,1000")
+    parser.add_argument("--full", action="store_true", help="100..50k bullets x 200..5k-word JDs")
+    parser.add_argument("--repeat", type=int, default=7, help="Warm samples per case (default 7)")
+    parser.add_argument("--dim", type=int, default=64, help="Stub embedding dimension (default 64)")
+    parser.add_argument("--out", help="Results JSON path (default bench_results/jd_ranker_<time>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to diff warm p50 against")
+    parser.add_argument("--dtypes", default="",
+                        help="Quantised cache dtypes to compare with float32, e.g. float16,int8")
+    parser.add_argument("--verbose", action="store_true", help="Keep the ranker's debug logging")
+    args = parser.parse_args(argv)
+    if not args.verbose:
+        logging.getLogger("CvAutomation").setLevel(logging.WARNING)
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backend(s): {', '.join(sorted(unknown))}")
+    sizes = _ints(args.sizes) if args.sizes else list(FULL_SIZES if args.full else QUICK_SIZES)
+    jd_words = _ints(args.jd_words) if args.jd_words else list(FULL_JD_WORDS if args.full else QUICK_JD_WORDS)
+
+    print(f"{'backend':<22} {'bullets':>7} {'words':>6} {'cold':>9} {'p50':>9} {'p95':>9} "
+          f"{'fit p50':>9} {'peak MB':>8} {'bullets/s':>11}")
+    rows = []
+    for backend in backends:
+        for n in sizes:
+            for words in jd_words:
+                row = run_case(backend, n, words, max(1, args.repeat), args.dim)
+                rows.append(row)
+                print(f"{backend:<22} {n:>7} {words:>6} {row['cold_s']*1e3:>7.1f}ms "
+                      f"{row['rank_p50_s']*1e3:>7.1f}ms {row['rank_p95_s']*1e3:>7.1f}ms "
+                      f"{row['fit_p50_s']*1e3:>7.2f}ms {row['peak_mem_bytes']/1e6:>8.1f} "
+                      f"{row['bullets_per_s']:>11,.0f}", flush=True)
+
+    _print_lexical_comparison(rows)
+
+    quantisation = []
+    dtypes = [d.strip() for d in args.dtypes.split(",") if d.strip()]
+    if dtypes:
+        print(f"\n{'dtype':<10} {'bullets':>7} {'cache MB':>9} {'max err':>9} {'top10':>6}")
+        for n in sizes:
+            for q in run_quantisation(dtypes, n, jd_words[0], args.dim):
+                quantisation.append(q)
+                print(f"{q['dtype']:<10} {n:>7} {q['cache_bytes']/1e6:>9.2f} "
+                      f"{q['max_score_err']:>9.5f} {q['top10_overlap']:>6.0%}", flush=True)
+
+    out = args.out or os.path.join(
+        _project_root, "bench_results",
+        "jd_ranker_" + datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json",
+    )
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"environment": _environment(), "results": rows, "quantisation": quantisation}, f, indent=2)
+    print(f"\nWrote {len(rows)} results to {out}")
+
+    if args.compare:
+        _compare(rows, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from core import ann_index
+from core.ann_index import IVFIndex
+from core.embedding_cache import EmbeddingStore
+from core.jd_ranker import rank_bullets
+
+
+def _clustered(n, dim=8, clusters=4, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=n)
+    return (centres[labels] + 0.05 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+class TestIVFIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp(prefix="applycraft_ann_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_full_probe_is_exact_and_few_probes_keep_neighbours(self):
+        vecs = _clustered(400)
+        keys = [f"k{i}" for i in range(len(vecs))]
+        index = IVFIndex(self.test_dir, nlist=8)
+        lists = index.sync(keys, vecs)
+        self.assertEqual(index.nlist, 8)
+        postings = index.postings(lists)
+        self.assertEqual(sorted(np.concatenate(postings).tolist()), list(range(len(vecs))))
+
+        query = vecs[:3] + 0.01
+        exact = [np.arange(len(vecs))] * 3
+        for got, want in zip(index.candidates(postings, query, nprobe=8), exact):
+            self.assertEqual(got.tolist(), want.tolist())
+
+        sims = (query / np.linalg.norm(query, axis=1, keepdims=True)) @ \
+            (vecs / np.linalg.norm(vecs, axis=1, keepdims=True)).T
+        for row, cand in zip(sims, index.candidates(postings, query, nprobe=2)):
+            self.assertLess(len(cand), len(vecs))
+            self.assertTrue(set(np.argsort(-row)[:10]) <= set(cand.tolist()))
+        index.close()
+
+    def test_persisted_and_updated_incrementally(self):
+        vecs = _clustered(200)
+        keys = [f"k{i}" for i in range(200)]
+        index = IVFIndex(self.test_dir, nlist=4)
+        lists = index.sync(keys, vecs)
+        index.close()
+
+        reopened = IVFIndex(self.test_dir, nlist=4)
+        self.assertEqual(reopened.sync(keys, vecs).tolist(), lists.tolist())
+        self.assertEqual(reopened.trained_on, 200)
+
+        more = _clustered(50, seed=1)
+        fetched = []
+
+        def fetch(positions):
+            fetched.extend(positions.tolist())
+            return np.vstack([vecs, more])[positions]
+
+        grown = reopened.sync(keys + [f"n{i}" for i in range(50)], fetch)
+        self.assertEqual(sorted(set(fetched) - {0}), list(range(200, 250)))  # only new rows are read
+        self.assertEqual(reopened.trained_on, 200)  # assigned, not retrained
+        self.assertEqual(grown[:200].tolist(), lists.tolist())
+        self.assertEqual(len(reopened), 250)
+        reopened.close()
+
+
+class TestRankerANN(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp(prefix="applycraft_ann_rank_test_")
+        self.store = EmbeddingStore(self.test_dir, "ollama", "nomic-embed-text")
+        ann_index._indexes.clear()
+        for target in ("core.jd_ranker.jd_result_cache.get_cache", "core.jd_ranker.embedding_cache.get_store"):
+            patcher = patch(target, return_value=None if "result" in target else self.store)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.store.close()
+        for index in ann_index._indexes.values():
+            index.close()
+        ann_index._indexes.clear()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_ann_only_scores_probed_lists_above_threshold(self):
+        inventory = {
+            f"Role {j}": [f"{topic} bullet {j}-{i}" for i in range(10)]
+            for j, topic in enumerate(["python", "sales", "design", "legal"])
+        }
+        topics = ["python", "sales", "design", "legal"]
+
+        def fake_embed(inputs, model, host):
+            return [[float(t in text.lower()) for t in topics] + [0.1] for text in inputs]
+
+        cfg = {"ann_index": True, "ann_min_bullets": 20, "ann_nlist": 4, "ann_nprobe": 1}
+        with patch("core.jd_ranker._resolve_backend", return_value=("ollama", {})), \
+                patch("core.jd_ranker.user_config.llm_config", return_value=cfg), \
+                patch("core.jd_ranker._ollama_embed_batch", side_effect=fake_embed):
+            approx = rank_bullets("Senior python developer", inventory)
+            cfg["ann_min_bullets"] = 1000
+            exact = rank_bullets("Senior python developer", inventory)
+
+        self.assertEqual(len(exact), 40)
+        self.assertLess(len(approx), len(exact))
+        self.assertEqual([r.bullet for r in approx], [r.bullet for r in exact[:len(approx)]])
+        self.assertTrue(all("python" in r.bullet for r in approx))
+
+    def test_ann_ranking_reads_only_candidate_rows(self):
+        topics = ["python", "sales", "design", "legal"]
+        inventory = {
+            f"Role {j}": [f"{topic} bullet {j}-{i}" for i in range(25)]
+            for j, topic in enumerate(topics)
+        }
+
+        def fake_embed(inputs, model, host):
+            return [[float(t in text.lower()) for t in topics] + [0.1] for text in inputs]
+
+        cfg = {"ann_index": True, "ann_min_bullets": 20, "ann_nlist": 4, "ann_nprobe": 1}
+        with patch("core.jd_ranker._resolve_backend", return_value=("ollama", {})), \
+                patch("core.jd_ranker.user_config.llm_config", return_value=cfg), \
+                patch("core.jd_ranker._ollama_embed_batch", side_effect=fake_embed) as embed:
+            rank_bullets("Senior python developer", inventory)  # first run embeds and trains
+            embed.reset_mock()
+            with patch.object(self.store, "get_matrix", wraps=self.store.get_matrix) as reads:
+                ranked = rank_bullets("Python engineer", inventory)
+
+        self.assertEqual(embed.call_args.args[0], ["Python engineer"])  # only the JD
+        self.assertEqual(reads.call_count, 1)
+        self.assertLess(len(reads.call_args.args[0]), 100)
+        self.assertTrue(ranked and all("python" in r.bullet for r in ranked))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import patch
+
+from core import embed_worker
+from core.embed_worker import EmbeddingWorker
+
+
+def _fake_loader(model_name):
+    if model_name == "broken":
+        raise RuntimeError("no such model")
+    return lambda texts: [[float(len(t)), 1.0] for t in texts]
+
+
+LOADER = f"{__name__}:_fake_loader"
+
+
+class TestEmbeddingWorker(unittest.TestCase):
+    def test_worker_loads_once_and_encodes_over_pipe(self):
+        worker = EmbeddingWorker("fake", loader=LOADER)
+        worker.start()
+        try:
+            self.assertTrue(worker.wait_ready(timeout=60))
+            self.assertEqual(worker.status()["state"], "ready")
+            self.assertEqual(worker.encode(["ab", "abcd"]), [[2.0, 1.0], [4.0, 1.0]])
+            self.assertEqual(worker.encode(["x"]), [[1.0, 1.0]])
+        finally:
+            worker.stop()
+        self.assertEqual(worker.status()["state"], "stopped")
+        self.assertIsNone(worker.encode(["x"], timeout=0.1))
+
+    def test_load_failure_is_reported(self):
+        worker = EmbeddingWorker("broken", loader=LOADER)
+        worker.start()
+        try:
+            self.assertFalse(worker.wait_ready(timeout=60))
+            status = worker.status()
+            self.assertEqual(status["state"], "failed")
+            self.assertIn("no such model", status["error"])
+        finally:
+            worker.stop()
+
+    def test_warmup_is_opt_in_and_surfaces_in_backend_status(self):
+        from core.jd_ranker import backend_status
+
+        cfg = {"provider": "sentence_transformers", "model": "fake", "warm_model_process": False}
+        with patch("core.embed_worker.user_config.llm_config", return_value=cfg):
+            self.assertIsNone(embed_worker.start_warmup())
+
+        worker = EmbeddingWorker("fake", loader=LOADER)
+        worker.start()
+        try:
+            worker.wait_ready(timeout=60)
+            with patch("core.embed_worker._worker", worker), \
+                    patch("core.jd_ranker.user_config.llm_config", return_value=cfg), \
+                    patch("core.jd_ranker.http_client.shared_client") as client:
+                client.return_value.probe.return_value = False
+                status = backend_status()
+            self.assertEqual(status["model_worker"]["state"], "ready")
+            self.assertTrue(status["local_llm_installed"])
+            self.assertIn("sentence-transformers", status["active"])
+        finally:
+            worker.stop()
+
+    def test_ranker_encodes_through_warm_worker(self):
+        from core.jd_ranker import rank_bullets
+
+        worker = EmbeddingWorker("fake", loader=LOADER)
+        worker.start()
+        try:
+            with patch("core.jd_ranker.embed_worker.get_worker", return_value=worker), \
+                    patch("core.jd_ranker._resolve_backend", return_value=("sentence_transformers", {"model": "fake"})), \
+                    patch("core.jd_ranker.embedding_cache.get_store", return_value=None), \
+                    patch("core.jd_ranker.jd_result_cache.get_cache", return_value=None), \
+                    patch("core.jd_ranker._load_sentence_transformer") as in_process:
+                ranked = rank_bullets("Python", {"Role A": ["Short", "A much longer bullet"]})
+            in_process.assert_not_called()
+            self.assertEqual(len(ranked), 2)
+        finally:
+            worker.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
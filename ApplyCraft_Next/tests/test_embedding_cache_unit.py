@@ -0,0 +1,199 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from core import embedding_cache
+from core.embedding_cache import EmbeddingStore, text_key
+from core.jd_index import BulletIndex
+from core.jd_ranker import _embed_in_chunks, _embed_with_cache, _ollama_embed_batch, _ranking_cache_key
+
+
+class TestEmbeddingStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp(prefix="applycraft_embed_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_round_trip_and_misses(self):
+        store = EmbeddingStore(self.test_dir, "ollama", "nomic-embed-text")
+        store.put_many(["alpha", "beta"], [[1.0, 0.0, 0.5], [0.0, 1.0, 0.25]])
+        got = store.get_many(["beta", "gamma", "alpha"])
+        self.assertEqual(got[0], [0.0, 1.0, 0.25])
+        self.assertIsNone(got[1])
+        self.assertEqual(got[2], [1.0, 0.0, 0.5])
+        store.close()
+
+        reopened = EmbeddingStore(self.test_dir, "ollama", "nomic-embed-text")
+        self.assertEqual(reopened.get_many(["alpha"])[0], [1.0, 0.0, 0.5])
+        reopened.close()
+
+    def test_lru_eviction_reuses_rows(self):
+        store = EmbeddingStore(self.test_dir, "openai", "small", max_entries=2, touch_interval=0)
+        store.put_many(["a"], [[1.0, 1.0]])
+        store.put_many(["b"], [[2.0, 2.0]])
+        store.get_many(["a"])  # touch "a" so "b" is least recently used
+        store.put_many(["c"], [[3.0, 3.0]])
+
+        got = store.get_many(["a", "b", "c"])
+        self.assertEqual(got[0], [1.0, 1.0])
+        self.assertIsNone(got[1])
+        self.assertEqual(got[2], [3.0, 3.0])
+        self.assertEqual(store._n_rows(), 2)
+        store.close()
+
+    def test_reads_touch_each_row_at_most_once_per_interval(self):
+        store = EmbeddingStore(self.test_dir, "stub", "touch")
+        store.put_many(["fresh", "old"], [[1.0, 0.0], [0.0, 1.0]])
+        store.conn.execute("UPDATE entries SET last_used = 0 WHERE key = ?", (text_key("old"),))
+
+        def last_used():
+            return dict(store.conn.execute("SELECT key, last_used FROM entries"))
+
+        before = last_used()
+
+        statements = []
+        store.conn.set_trace_callback(statements.append)
+        try:
+            store.get_many(["fresh", "old"])
+        finally:
+            store.conn.set_trace_callback(None)
+        after = last_used()
+        self.assertEqual(after[text_key("fresh")], before[text_key("fresh")])
+        self.assertGreater(after[text_key("old")], 0)
+        self.assertEqual(len([s for s in statements if s.startswith("UPDATE")]), 1)
+        store.close()
+
+    def test_discard_frees_rows_for_reuse(self):
+        store = EmbeddingStore(self.test_dir, "stub", "discard")
+        store.put_many(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+        self.assertEqual(store.discard(["a", "missing"]), 1)
+        self.assertEqual(store.get_many(["a", "b"]), [None, [0.0, 1.0]])
+        store.put_many(["c"], [[0.5, 0.5]])
+        self.assertEqual(store._n_rows(), 2)
+        self.assertEqual(len(store), 2)
+        store.close()
+
+    def test_quantised_stores_round_trip_within_tolerance(self):
+        vectors = [[0.6, -0.8, 0.0, 0.05], [0.1, 0.2, -0.3, 0.9]]
+        for dtype, tol, item in (("float16", 1e-3, 2), ("int8", 0.9 / 127, 1)):
+            with self.subTest(dtype=dtype):
+                store = EmbeddingStore(self.test_dir, "stub", "quant", dtype=dtype)
+                self.assertTrue(store.folder.endswith(f"__{dtype}"))
+                store.put_many(["a", "b"], vectors)
+                store.close()
+
+                reopened = EmbeddingStore(self.test_dir, "stub", "quant", dtype=dtype)
+                self.assertEqual(os.path.getsize(reopened.vectors_file), 2 * 4 * item)
+                got = reopened.get_many(["a", "b"])
+                matrix, missing = reopened.get_matrix(["b", "a"])
+                for vec, expected in zip(got, vectors):
+                    for x, y in zip(vec, expected):
+                        self.assertAlmostEqual(x, y, delta=tol)
+                if matrix is not None:
+                    self.assertEqual(missing, [])
+                    self.assertEqual(matrix.dtype.name, "float32")
+                    for x, y in zip(matrix[0].tolist(), got[1]):
+                        self.assertAlmostEqual(x, y, places=6)
+                reopened.close()
+
+    def test_unknown_dtype_is_rejected(self):
+        with self.assertRaises(ValueError):
+            EmbeddingStore(self.test_dir, "stub", "quant", dtype="float64")
+
+    def test_shared_store_and_ranking_key_follow_the_dtype(self):
+        cfg = {"embedding_cache_dtype": "float32"}
+        with patch("core.embedding_cache.user_config.llm_config", return_value=cfg), \
+                patch("core.embedding_cache.user_config.cache_dir", return_value=self.test_dir), \
+                patch.dict(embedding_cache._stores, clear=True):
+            plain = embedding_cache.get_store("stub", "m")
+            self.assertIs(embedding_cache.get_store("stub", "m"), plain)
+            cfg["embedding_cache_dtype"] = "int8"
+            quantised = embedding_cache.get_store("stub", "m")
+            self.assertEqual(quantised.dtype, "int8")
+            self.assertIsNot(quantised, plain)
+            plain.close()
+            quantised.close()
+
+        index = BulletIndex(lambda text: text.split())
+        index.sync({"Job": ["a bullet"]})
+        keys = {dtype: _ranking_cache_key("jd", index, "ollama", {"embedding_cache_dtype": dtype})
+                for dtype in ("float32", "int8")}
+        self.assertNotEqual(keys["float32"], keys["int8"])
+        self.assertEqual(keys["float32"], _ranking_cache_key("jd", index, "ollama", {}))
+
+    def test_only_misses_are_embedded(self):
+        store = EmbeddingStore(self.test_dir, "stub", "stub-model")
+        flat = [("Job", "cached bullet", []), ("Job", "new bullet", [])]
+        store.put_many(["cached bullet"], [[0.5, 0.5]])
+        calls = []
+
+        def embed(texts):
+            calls.append(list(texts))
+            return [[float(len(t)), 1.0] for t in texts]
+
+        with patch("core.jd_ranker.embedding_cache.get_store", return_value=store):
+            jd_vecs, vecs = _embed_with_cache("stub", "stub-model", ["the jd"], flat, embed)
+
+        self.assertEqual(calls, [["the jd", "new bullet"]])
+        self.assertEqual([float(x) for x in jd_vecs[0]], [6.0, 1.0])
+        self.assertEqual([[float(x) for x in v] for v in vecs], [[0.5, 0.5], [10.0, 1.0]])
+        self.assertEqual(store.get_many(["new bullet"])[0], [10.0, 1.0])
+        store.close()
+
+
+class TestChunkedEmbedding(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp(prefix="applycraft_chunk_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_failed_chunk_is_retried_alone(self):
+        texts = [f"t{i}" for i in range(7)]
+        calls = []
+        lock = threading.Lock()
+
+        def embed(chunk):
+            with lock:
+                calls.append(tuple(chunk))
+                first_try = calls.count(tuple(chunk)) == 1
+            if chunk[0] == "t2" and first_try:
+                return None
+            return [[float(t[1:])] for t in chunk]
+
+        out = _embed_in_chunks(texts, embed, chunk_size=2, workers=3, retries=2)
+        self.assertEqual(out, [[float(i)] for i in range(7)])
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(calls.count(("t2", "t3")), 2)
+
+    def test_http_embed_leaves_retries_to_the_chunk_loop(self):
+        with patch("core.jd_ranker.http_client.shared_client") as client:
+            client.return_value.request_json.return_value = {"embeddings": [[1.0]]}
+            self.assertEqual(_ollama_embed_batch(["t"], "m", "http://h"), [[1.0]])
+        self.assertEqual(client.return_value.request_json.call_args.kwargs["retries"], 0)
+
+    def test_partial_results_are_cached_when_a_chunk_keeps_failing(self):
+        store = EmbeddingStore(self.test_dir, "stub", "stub-model")
+        flat = [("Job", f"bullet {i}", []) for i in range(5)]
+
+        def embed(chunk):
+            if "bullet 4" in chunk:
+                raise OSError("timed out")
+            return [[float(len(t)), 1.0] for t in chunk]
+
+        cfg = {"embed_chunk_size": 2, "embed_workers": 2, "embed_chunk_retries": 1}
+        with patch("core.jd_ranker.embedding_cache.get_store", return_value=store), \
+                patch("core.jd_ranker.user_config.llm_config", return_value=cfg):
+            self.assertIsNone(_embed_with_cache("stub", "stub-model", ["jd"], flat, embed, chunked=True))
+
+        got = store.get_many([b for _, b, _ in flat])
+        self.assertEqual([g is not None for g in got], [True, True, True, False, False])
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from helpers.http_client import AsyncHTTPClient, HTTPClient, HTTPRequestError
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            with self.server.lock:
+                self.server.probes += 1
+            self._send(200, b'{"models": []}')
+        elif self.path == "/down":
+            self._send(503, b"{}")
+        else:
+            self._send(404, b"{}")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/flaky":
+            with self.server.lock:
+                self.server.flaky_calls += 1
+                fail = self.server.flaky_calls <= 2
+            if fail:
+                self._send(503, b"{}")
+                return
+        if self.path == "/slow":
+            with self.server.lock:
+                self.server.slow_calls += 1
+            time.sleep(0.5)
+            self.close_connection = True  # the client has given up by now
+            return
+        if self.path == "/stream":
+            lines = [{"response": w, "done": False} for w in payload["words"]]
+            lines.append({"response": "", "done": True})
+            body = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+            self._send(200, body, "application/x-ndjson")
+            return
+        self._send(200, json.dumps({"echo": payload}).encode())
+
+
+class _StubServer:
+    def __enter__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.server.probes = 0
+        self.server.flaky_calls = 0
+        self.server.slow_calls = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestHTTPClient(unittest.TestCase):
+    def test_keep_alive_reuses_one_connection(self):
+        with _StubServer() as stub:
+            client = HTTPClient(max_connections=2)
+            for i in range(5):
+                self.assertEqual(client.request_json("POST", stub.url + "/echo", {"i": i}), {"echo": {"i": i}})
+            client.close()
+            self.assertEqual(stub.server.connections, 1)
+
+    def test_retries_with_backoff_on_503(self):
+        with _StubServer() as stub:
+            client = HTTPClient(retries=2, backoff=0.01)
+            self.assertEqual(client.request_json("POST", stub.url + "/flaky", {"x": 1}), {"echo": {"x": 1}})
+            self.assertEqual(stub.server.flaky_calls, 3)
+
+            stub.server.flaky_calls = 0
+            with self.assertRaises(HTTPRequestError) as ctx:
+                HTTPClient(retries=1, backoff=0.01).request("POST", stub.url + "/flaky", {})
+            self.assertEqual(ctx.exception.status, 503)
+            client.close()
+
+    def test_read_timeout_is_not_retried(self):
+        with _StubServer() as stub:
+            client = HTTPClient(retries=2, backoff=0.01)
+            with self.assertRaises(HTTPRequestError):
+                client.request("POST", stub.url + "/slow", {}, timeout=0.1)
+            self.assertEqual(stub.server.slow_calls, 1)
+            client.close()
+
+    def test_stream_lines_then_reuse(self):
+        with _StubServer() as stub:
+            client = HTTPClient()
+            lines = list(client.stream_lines("POST", stub.url + "/stream", {"words": ["a", "b"]}))
+            self.assertEqual([json.loads(l)["response"] for l in lines], ["a", "b", ""])
+            client.request("POST", stub.url + "/echo", {})
+            client.close()
+            self.assertEqual(stub.server.connections, 1)
+
+    def test_probe_is_cached_for_ttl(self):
+        with _StubServer() as stub:
+            client = HTTPClient(health_ttl=60)
+            self.assertTrue(client.probe(stub.url + "/api/tags"))
+            self.assertTrue(client.probe(stub.url + "/api/tags"))
+            self.assertEqual(stub.server.probes, 1)
+            self.assertTrue(client.probe(stub.url + "/api/tags", force=True))
+            self.assertEqual(stub.server.probes, 2)
+            client.close()
+
+        down = HTTPClient(health_ttl=60)
+        self.assertFalse(down.probe(stub.url + "/api/tags"))
+        self.assertFalse(down.cached_health(stub.url))
+
+
+    def test_error_statuses_are_cached_as_unhealthy(self):
+        with _StubServer() as stub:
+            client = HTTPClient(health_ttl=60, retries=0)
+            self.assertFalse(client.probe(stub.url + "/down"))
+            self.assertFalse(client.probe(stub.url + "/down"))
+            self.assertFalse(client.cached_health(stub.url))
+
+            self.assertFalse(client.probe(stub.url + "/missing", force=True))  # 404
+            self.assertFalse(client.probe(stub.url + "/missing"))
+
+            with self.assertRaises(HTTPRequestError):
+                client.request("POST", stub.url + "/flaky", {})
+            self.assertFalse(client.cached_health(stub.url))
+            client.close()
+
+
+class TestAsyncHTTPClient(unittest.TestCase):
+    def test_gather_and_pipeline(self):
+        async def run(url):
+            async with AsyncHTTPClient(max_connections=2) as client:
+                results = await client.gather(("POST", url + "/echo", {"i": i}) for i in range(6))
+                piped = await client.pipeline("POST", url + "/echo", [{"p": 1}, {"p": 2}, {"p": 3}])
+                return results, piped
+
+        with _StubServer() as stub:
+            results, piped = asyncio.run(run(stub.url))
+            self.assertEqual(results, [{"echo": {"i": i}} for i in range(6)])
+            self.assertEqual([json.loads(body) for _, body in piped],
+                             [{"echo": {"p": p}} for p in (1, 2, 3)])
+            self.assertLessEqual(stub.server.connections, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import math
+import unittest
+
+from core.jd_index import BulletIndex
+from core.jd_ranker import (
+    _build_tfidf,
+    _content_tokens,
+    _cosine_sparse,
+    _vectorise_query,
+    rank_bullets,
+)
+
+
+INVENTORY = {
+    "Role A": [
+        "Built SQL pipelines and Power BI dashboards for finance stakeholders",
+        "Automated ETL jobs in Python, cutting manual effort by 80%",
+    ],
+    "Role B": [
+        "Worked with stakeholders to define KPI reporting",
+        "Mentored junior analysts through code review",
+        "Mentored junior analysts through code review",
+    ],
+}
+
+JD = "Data Analyst: Python, SQL, ETL automation, Power BI dashboards and KPI reporting for stakeholders."
+
+
+class TestBulletIndex(unittest.TestCase):
+    def test_search_matches_brute_force_cosine(self):
+        index = BulletIndex(_content_tokens)
+        index.sync(INVENTORY)
+
+        flat = index.flat()
+        vectors, idf = _build_tfidf([tokens for _, _, tokens in flat])
+        jd_vector = _vectorise_query(_content_tokens(JD), idf)
+        expected = {i: _cosine_sparse(jd_vector, vec) for i, vec in enumerate(vectors)}
+
+        hits = {index.doc(doc_id).position: cos for doc_id, cos, _ in index.search(_content_tokens(JD))}
+        for position, cosine in expected.items():
+            self.assertAlmostEqual(hits.get(position, 0.0), cosine, places=9)
+
+    def test_bm25_matches_reference_formula(self):
+        index = BulletIndex(_content_tokens)
+        index.sync(INVENTORY)
+        docs = [tokens for _, _, tokens in index.flat()]
+        avg_len = sum(len(d) for d in docs) / len(docs)
+        query = set(_content_tokens(JD))
+
+        def reference(doc, k1=1.2, b=0.75):
+            score = 0.0
+            for term in query:
+                df = sum(term in d for d in docs)
+                count = doc.count(term)
+                if not count:
+                    continue
+                idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+                score += idf * count * (k1 + 1) / (count + k1 * (1 - b + b * len(doc) / avg_len))
+            return score
+
+        hits = {index.doc(doc_id).position: score for doc_id, score, _ in index.bm25(_content_tokens(JD))}
+        for position, doc in enumerate(docs):
+            self.assertAlmostEqual(hits.get(position, 0.0), reference(doc), places=9)
+
+        # Removing a bullet keeps lengths and postings consistent.
+        edited = {job: list(bullets) for job, bullets in INVENTORY.items()}
+        del edited["Role A"]
+        index.sync(edited)
+        self.assertEqual(index._total_length, sum(len(t) for _, _, t in index.flat()))
+        self.assertNotIn("sql", index._counts)
+
+    def test_sync_is_incremental(self):
+        index = BulletIndex(_content_tokens)
+        self.assertTrue(index.sync(INVENTORY))
+        self.assertFalse(index.sync(INVENTORY))
+        self.assertEqual(len(index), 5)
+
+        kept_id = index.doc_ids()[0]
+        edited = {job: list(bullets) for job, bullets in INVENTORY.items()}
+        edited["Role B"][0] = "Partnered with stakeholders on experimentation"
+        self.assertTrue(index.sync(edited))
+        self.assertEqual(index.doc_ids()[0], kept_id)
+        self.assertEqual(len(index), 5)
+        self.assertNotIn("kpi", index._postings)
+
+    def test_rank_bullets_returns_every_bullet(self):
+        ranked = rank_bullets(JD, INVENTORY, force_local=True)
+        self.assertEqual(len(ranked), 5)
+        scores = [r.score for r in ranked]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(ranked[-1].score, 0.0)
+        etl = next(r for r in ranked if r.bullet.startswith("Automated ETL"))
+        self.assertIn("python", etl.matched_keywords)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from core.jd_leaderboard import build_leaderboard, load_jds, write_leaderboard
+
+
+INVENTORY = {
+    "Role A": ["Built SQL pipelines and Power BI dashboards", "Automated ETL in Python"],
+    "Role B": ["Ran customer workshops", "Managed vendor contracts"],
+}
+
+
+class TestJDLeaderboard(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp(prefix="applycraft_leaderboard_test_")
+        self.addCleanup(shutil.rmtree, self.test_dir, True)
+
+    def _write(self, name, text):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_load_directory(self):
+        jds = os.path.join(self.test_dir, "jds")
+        os.makedirs(jds)
+        for name, text in (("b_globex.md", "Workshops"), ("a_acme.txt", "SQL"), ("notes.pdf", "x")):
+            with open(os.path.join(jds, name), "w", encoding="utf-8") as f:
+                f.write(text)
+        self.assertEqual(load_jds(jds), [("a_acme", "SQL"), ("b_globex", "Workshops")])
+
+    def test_load_jsonl_skips_bad_lines(self):
+        path = self._write("postings.jsonl", "\n".join([
+            json.dumps({"title": "Analyst", "text": "SQL and Python"}),
+            "{not json",
+            json.dumps("just a string"),
+            json.dumps(["a", "list"]),
+            "",
+            json.dumps({"description": "Workshops"}),
+        ]))
+        with patch("core.jd_leaderboard.logger.warning") as warn:
+            jds = load_jds(path)
+        self.assertEqual(jds, [("Analyst", "SQL and Python"), ("line 6", "Workshops")])
+        self.assertEqual(warn.call_count, 3)
+        self.assertIn("line 2", warn.call_args_list[0].args[0])
+
+    def test_build_and_write_leaderboard(self):
+        jds = [("Workshops", "Customer workshops and vendor contracts"), ("Data", "SQL, Power BI and Python ETL")]
+        with patch("core.jd_ranker.user_config.job_positions", return_value=INVENTORY), \
+                patch("core.jd_ranker.user_config.inventory_version", return_value=None), \
+                patch("core.jd_ranker.jd_result_cache.get_cache", return_value=None):
+            rows = build_leaderboard(jds, force_local=True)
+        self.assertEqual([r["rank"] for r in rows], [1, 2])
+        self.assertGreaterEqual(rows[0]["fit_score"], rows[1]["fit_score"])
+        self.assertEqual({r["backend"] for r in rows}, {"local TF-IDF"})
+        by_name = {r["name"]: r for r in rows}
+        self.assertEqual(by_name["Data"]["best_job"], "Role A")
+
+        json_path = os.path.join(self.test_dir, "board.json")
+        write_leaderboard(rows, json_path)
+        with open(json_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), rows)
+
+        csv_path = os.path.join(self.test_dir, "board.csv")
+        write_leaderboard(rows, csv_path)
+        with open(csv_path, encoding="utf-8", newline="") as f:
+            table = list(csv.DictReader(f))
+        self.assertEqual([r["name"] for r in table], [r["name"] for r in rows])
+        self.assertEqual(table[0]["rank"], "1")
+        self.assertEqual(float(table[0]["fit_score"]), rows[0]["fit_score"])
+
+
+if __name__ == "__main__":
+    unittest.main()
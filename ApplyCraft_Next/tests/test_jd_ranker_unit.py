@@ -1,10 +1,28 @@
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
-from core.jd_ranker import BulletScore, compute_fit_score, generate_match_recommendations
+from core import jd_ranker
+from core.jd_index import BulletIndex
+from core.jd_ranker import (
+    BulletScore,
+    JDAnalysis,
+    compute_fit_score,
+    generate_match_recommendations,
+    rank_bullets,
+    rank_bullets_batch,
+    rank_bullets_progressive,
+    stream_match_recommendations,
+)
+from helpers import user_config
 
 
 class TestJDRankerRecommendations(unittest.TestCase):
+    def setUp(self):
+        # Keep the on-disk JD result cache out of these tests.
+        patcher = patch("core.jd_ranker.jd_result_cache.get_cache", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_fit_score_in_range(self):
         ranked = [
             BulletScore("Role A", "Built SQL pipelines and dashboards", 0.72, ["sql", "dashboards"]),
@@ -45,6 +63,335 @@ class TestJDRankerRecommendations(unittest.TestCase):
         self.assertIn("local-llm (ollama:", result["source"])
         self.assertEqual(len(result["recommendations"]), 2)
 
+    def test_analysis_is_computed_once_and_reused(self):
+        jd = "Need Python, ETL, and KPI reporting"
+        ranked = rank_bullets(jd, {"Role A": ["Automated ETL in Python", "Built SQL pipelines"]}, force_local=True)
+        analysis = JDAnalysis(jd, ranked)
+        self.assertEqual(analysis.fit, compute_fit_score(jd, ranked))
+        self.assertIn("kpi", analysis.missing_keywords())
+        self.assertNotIn("python", analysis.missing_keywords())
+
+        known_fit = dict(analysis.fit, fit_score=0.5)
+        reused = JDAnalysis(jd, ranked, fit=known_fit)
+        with patch("core.jd_ranker._ollama_generate_recommendations", return_value=["Add a KPI bullet"]) as llm, \
+                patch("core.jd_ranker.compute_fit_score", side_effect=AssertionError("fit recomputed")):
+            result = generate_match_recommendations(jd, ranked, max_items=2, analysis=reused)
+        self.assertEqual(result["fit_score"], 0.5)
+        self.assertIn("Fit score: 50%", llm.call_args[0][0])
+        self.assertEqual(result["missing_keywords"], reused.missing_keywords())
+
+
+class TestDenseScoring(unittest.TestCase):
+    FLAT = [
+        ("Role A", "Built SQL pipelines", ["built", "sql", "pipelines"]),
+        ("Role B", "Automated ETL in Python", ["automated", "etl", "python"]),
+        ("Role C", "Ran workshops", ["ran", "workshops"]),
+        ("Role C", "Ran more workshops", ["ran", "workshops"]),
+    ]
+    JD_VEC = [1.0, 0.0, 1.0]
+    BULLET_VECS = [[0.5, 0.5, 0.5], [1.0, 0.0, 0.9], [0.0, 1.0, 0.0], [0.0, 1.0, 0.0]]
+
+    def _rank(self, top_k=None):
+        return jd_ranker._rank_dense(
+            "Python ETL and SQL", self.FLAT, self.JD_VEC, self.BULLET_VECS, top_k=top_k
+        )
+
+    def test_vectorised_matches_pure_python(self):
+        fast = self._rank()
+        with patch("core.jd_ranker._np", None):
+            slow = self._rank()
+        self.assertEqual([r.bullet for r in fast], [r.bullet for r in slow])
+        for a, b in zip(fast, slow):
+            self.assertAlmostEqual(a.score, b.score, places=5)
+        self.assertEqual(fast[0].bullet, "Automated ETL in Python")
+        self.assertEqual(fast[-2].bullet, "Ran workshops")
+
+    def test_top_k_keeps_best_in_order(self):
+        for np_mod in (jd_ranker._np, None):
+            with patch("core.jd_ranker._np", np_mod):
+                top = self._rank(top_k=2)
+            self.assertEqual(
+                [r.bullet for r in top],
+                ["Automated ETL in Python", "Built SQL pipelines"],
+            )
+
+
+class TestBatchRanking(unittest.TestCase):
+    INVENTORY = {
+        "Role A": ["Built SQL pipelines and Power BI dashboards", "Automated ETL in Python"],
+        "Role B": ["Ran customer workshops", "Managed vendor contracts"],
+    }
+    JDS = [
+        "Python ETL engineer with SQL",
+        "",
+        "Workshop facilitator for customer onboarding",
+    ]
+
+    def setUp(self):
+        # Keep the on-disk JD result cache out of these tests.
+        patcher = patch("core.jd_ranker.jd_result_cache.get_cache", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_matches_single_local_rankings(self):
+        results = rank_bullets_batch(self.JDS, self.INVENTORY, force_local=True)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[1]["ranked"], [])
+        self.assertEqual(results[1]["fit"]["fit_score"], 0.0)
+        for jd, result in zip(self.JDS, results):
+            single = rank_bullets(jd, self.INVENTORY, force_local=True)
+            self.assertEqual([(r.bullet, r.score) for r in single],
+                             [(r.bullet, r.score) for r in result["ranked"]])
+            self.assertEqual(result["fit"], compute_fit_score(jd, single))
+
+    def test_batch_embeds_all_jds_in_one_call(self):
+        calls = []
+
+        def fake_embed(inputs, model, host):
+            calls.append(list(inputs))
+            return [[float("python" in t.lower()), float("workshop" in t.lower()), 1.0] for t in inputs]
+
+        with patch("core.jd_ranker._resolve_backend", return_value=("ollama", {})), \
+                patch("core.jd_ranker.embedding_cache.get_store", return_value=None), \
+                patch("core.jd_ranker._ollama_embed_batch", side_effect=fake_embed):
+            results = rank_bullets_batch(self.JDS, self.INVENTORY)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][:2], [self.JDS[0], self.JDS[2]])
+        self.assertEqual(results[0]["ranked"][0].bullet, "Automated ETL in Python")
+        self.assertEqual(results[2]["ranked"][0].bullet, "Ran customer workshops")
+        self.assertIn("ollama", results[0]["fit"]["backend"])
+
+
+class TestTopKSelection(unittest.TestCase):
+    INVENTORY = {
+        "Role A": ["Built SQL pipelines in Python", "Automated Python ETL jobs", "Wrote Python tests"],
+        "Role B": ["Python dashboards for sales", "Ran customer workshops", "Managed vendor contracts"],
+        "Role C": ["SQL reporting with Python"],
+    }
+    JD = "Python ETL engineer with SQL"
+
+    def setUp(self):
+        # Keep the on-disk JD result cache out of these tests.
+        patcher = patch("core.jd_ranker.jd_result_cache.get_cache", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _expected(full, top_k, per_job_cap):
+        counts, kept = {}, []
+        for r in full:
+            counts[r.job_title] = counts.get(r.job_title, 0) + 1
+            if per_job_cap is None or counts[r.job_title] <= per_job_cap:
+                kept.append(r)
+        return kept if top_k is None else kept[:top_k]
+
+    def _check(self, **kwargs):
+        for np_mod in (jd_ranker._np, None):
+            with patch("core.jd_ranker._np", np_mod):
+                full = list(rank_bullets(self.JD, self.INVENTORY, **kwargs))
+                for top_k, cap in [(3, None), (None, 1), (4, 2), (2, 1), (10, 0)]:
+                    limited = rank_bullets(self.JD, self.INVENTORY, top_k=top_k, per_job_cap=cap, **kwargs)
+                    self.assertEqual(list(limited), self._expected(full, top_k, cap), (top_k, cap))
+
+    def test_local_limits_match_filtered_full_ranking(self):
+        self._check(force_local=True)
+
+    def test_dense_limits_match_filtered_full_ranking(self):
+        def fake_embed(inputs, model, host):
+            return [[float("python" in t.lower()), float("sql" in t.lower()), 1.0] for t in inputs]
+
+        with patch("core.jd_ranker._resolve_backend", return_value=("ollama", {})), \
+                patch("core.jd_ranker.embedding_cache.get_store", return_value=None), \
+                patch("core.jd_ranker._ollama_embed_batch", side_effect=fake_embed):
+            self._check()
+
+
+class TestBM25Provider(unittest.TestCase):
+    INVENTORY = {
+        "Role A": [
+            "Built Power BI dashboards for finance",
+            "Built power plant models in Excel",
+            "Applied machine learning to churn",
+        ],
+        "Role B": ["Led learning sessions on machine maintenance", "Ran vendor workshops"],
+    }
+    JD = "Analyst with Power BI and machine learning experience"
+
+    def setUp(self):
+        patcher = patch("core.jd_ranker.jd_result_cache.get_cache", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch("core.jd_ranker._resolve_backend", return_value=("bm25", {}))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_phrases_outrank_scattered_words(self):
+        ranked = rank_bullets(self.JD, self.INVENTORY)
+        self.assertEqual(jd_ranker._LAST_BACKEND_USED, "local BM25")
+        order = [r.bullet for r in ranked]
+        self.assertLess(order.index("Built Power BI dashboards for finance"),
+                        order.index("Built power plant models in Excel"))
+        self.assertLess(order.index("Applied machine learning to churn"),
+                        order.index("Led learning sessions on machine maintenance"))
+        matched = ranked[order.index("Applied machine learning to churn")].matched_keywords
+        self.assertEqual(sorted(matched), ["learning", "machine"])  # bigrams score, but aren't reported
+        self.assertEqual(ranked[-1].bullet, "Ran vendor workshops")
+        self.assertEqual(ranked[-1].score, 0.0)
+        self.assertTrue(all(0.0 <= r.score <= 1.0 for r in ranked))
+
+    def test_phrase_heavy_jd_coverage_stays_in_range(self):
+        ranked = rank_bullets("Power BI machine learning python", self.INVENTORY)
+        fit = JDAnalysis("Power BI machine learning python", ranked).fit
+        self.assertLessEqual(fit["keyword_coverage"], 1.0)
+        self.assertFalse(any(" " in kw for r in ranked for kw in r.matched_keywords))
+
+    def test_limits_and_progressive_ranking(self):
+        full = list(rank_bullets(self.JD, self.INVENTORY))
+        self.assertEqual(list(rank_bullets(self.JD, self.INVENTORY, top_k=2)), full[:2])
+        stages = list(rank_bullets_progressive(self.JD, self.INVENTORY))
+        self.assertEqual(len(stages), 1)
+        self.assertTrue(stages[0]["final"])
+        self.assertEqual(list(stages[0]["ranked"]), full)
+
+    def test_index_follows_inventory_edits(self):
+        edited = {"Role A": ["Built Power BI dashboards for finance"]}
+        ranked = rank_bullets(self.JD, edited)
+        self.assertEqual([r.bullet for r in ranked], ["Built Power BI dashboards for finance"])
+        self.assertEqual(len(jd_ranker._BM25_INDEX), 1)
+
+
+class TestHybridScoring(unittest.TestCase):
+    INVENTORY = TestTopKSelection.INVENTORY
+    JD = TestTopKSelection.JD
+
+    def setUp(self):
+        patcher = patch("core.jd_ranker.jd_result_cache.get_cache", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _rank(self, cfg, embed=None):
+        embed = embed or (lambda inputs, model, host: [[1.0, 0.0] for _ in inputs])
+        with patch("core.jd_ranker._resolve_backend", return_value=("ollama", cfg)), \
+                patch("core.jd_ranker.embedding_cache.get_store", return_value=None), \
+                patch("core.jd_ranker._ollama_embed_batch", side_effect=embed):
+            ranked = rank_bullets(self.JD, self.INVENTORY)
+            return ranked, jd_ranker._LAST_BACKEND_USED
+
+    def test_weighted_fusion_breaks_dense_ties_lexically(self):
+        cfg = {"hybrid": "weighted", "hybrid_dense_weight": 0.5, "hybrid_lexical_weight": 0.5}
+        for np_mod in (jd_ranker._np, None):
+            with patch("core.jd_ranker._np", np_mod):
+                ranked, label = self._rank(cfg)
+            self.assertIn("BM25 weighted", label)
+            # Identical embeddings: order comes from BM25 alone.
+            self.assertIn(ranked[0].bullet, ("Built SQL pipelines in Python", "Automated Python ETL jobs"))
+            self.assertAlmostEqual(ranked[0].score, 1.0)
+            self.assertAlmostEqual(ranked[-1].score, 0.5)
+            self.assertEqual(len(ranked), 7)
+
+    def test_rrf_scores_stay_in_unit_range(self):
+        def embed(inputs, model, host):
+            return [[float("etl" in t.lower()), 1.0] for t in inputs]
+
+        ranked, label = self._rank({"hybrid": "rrf"}, embed)
+        self.assertIn("BM25 rrf", label)
+        self.assertEqual(ranked[0].bullet, "Automated Python ETL jobs")
+        self.assertAlmostEqual(ranked[0].score, 1.0)
+        self.assertTrue(all(0.0 <= r.score <= 1.0 for r in ranked))
+
+    def test_prefilter_limits_dense_scoring_to_lexical_candidates(self):
+        ranked, _ = self._rank({"hybrid": "weighted", "hybrid_prefilter": 3})
+        self.assertEqual(len(ranked), 3)
+        self.assertNotIn("Managed vendor contracts", [r.bullet for r in ranked])
+
+    def test_hybrid_off_keeps_plain_cosine(self):
+        ranked, label = self._rank({})
+        self.assertNotIn("BM25", label)
+        self.assertTrue(all(r.score == 1.0 for r in ranked))
+
+    def test_unavailable_backend_skips_the_bm25_pass(self):
+        with patch.object(BulletIndex, "bm25", autospec=True, side_effect=BulletIndex.bm25) as bm25:
+            _, label = self._rank({"hybrid": "weighted"}, lambda inputs, model, host: None)
+            self.assertEqual(label, "local TF-IDF")
+            bm25.assert_not_called()
+            with patch("core.jd_ranker._resolve_backend", return_value=("openai", {"hybrid": "rrf"})):
+                rank_bullets(self.JD, self.INVENTORY)
+            bm25.assert_not_called()
+
+
+class TestInventoryVersions(unittest.TestCase):
+    def test_configured_inventory_syncs_by_version_and_prunes_embeddings(self):
+        state = {"inventory": {"Role A": ["SQL pipelines", "Python ETL"]}, "version": 1}
+        diff = user_config.InventoryDiff(1, 2, removed=[("Role A", 1, "Python ETL")])
+        store = MagicMock()
+        with patch("core.jd_ranker.user_config.job_positions", side_effect=lambda: state["inventory"]), \
+                patch("core.jd_ranker.user_config.inventory_version", side_effect=lambda: state["version"]), \
+                patch("core.jd_ranker.user_config.inventory_diff", return_value=diff) as get_diff, \
+                patch("core.jd_ranker._resolve_backend",
+                      side_effect=lambda force: ("local", {}) if force else ("ollama", {})), \
+                patch("core.jd_ranker.embedding_cache.get_store", return_value=store), \
+                patch.object(jd_ranker, "_BULLET_INDEX", BulletIndex(jd_ranker._content_ids)), \
+                patch.object(jd_ranker, "_PRUNED_VERSION", None):
+            self.assertEqual(len(rank_bullets("Python SQL", force_local=True)), 2)
+
+            # Same version: the index is trusted without comparing bullets.
+            state["inventory"] = {"Role A": ["SQL pipelines"]}
+            self.assertEqual(len(rank_bullets("Python SQL", force_local=True)), 2)
+            get_diff.assert_not_called()
+
+            state["version"] = 2
+            self.assertEqual(len(rank_bullets("Python SQL", force_local=True)), 1)
+            get_diff.assert_called_once_with(1)
+            store.discard.assert_called_once_with(["Python ETL"])
+
+
+class TestProgressiveRanking(unittest.TestCase):
+    INVENTORY = TestBatchRanking.INVENTORY
+
+    def setUp(self):
+        # Keep the on-disk JD result cache out of these tests.
+        patcher = patch("core.jd_ranker.jd_result_cache.get_cache", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_local_provider_yields_single_final_stage(self):
+        with patch("core.jd_ranker._resolve_backend", return_value=("local", {})):
+            stages = list(rank_bullets_progressive("Python ETL", self.INVENTORY))
+        self.assertEqual([s["final"] for s in stages], [True])
+
+    def test_preview_then_refined_ranking(self):
+        def fake_embed(inputs, model, host):
+            return [[float("workshop" in t.lower()), 1.0] for t in inputs]
+
+        with patch("core.jd_ranker._resolve_backend", return_value=("ollama", {})), \
+                patch("core.jd_ranker.embedding_cache.get_store", return_value=None), \
+                patch("core.jd_ranker._ollama_embed_batch", side_effect=fake_embed):
+            stages = list(rank_bullets_progressive("Customer workshop lead", self.INVENTORY))
+
+        self.assertEqual([s["final"] for s in stages], [False, True])
+        self.assertEqual(stages[0]["fit"]["backend"], "local TF-IDF")
+        self.assertIn("ollama", stages[1]["fit"]["backend"])
+        self.assertEqual(stages[1]["ranked"][0].bullet, "Ran customer workshops")
+
+    def test_recommendations_stream_tokens_then_payload(self):
+        ranked = [BulletScore("Role A", "Built SQL pipelines", 0.71, ["sql"])]
+        fragments = ['{"recommendations": ', '["Add a Python bullet", ', '"Quantify impact"]}']
+        with patch("core.jd_ranker._ollama_stream_generate", return_value=iter(fragments)):
+            events = list(stream_match_recommendations("Need Python and SQL", ranked, max_items=3))
+
+        self.assertEqual([v for k, v in events if k == "token"], fragments)
+        kind, payload = events[-1]
+        self.assertEqual(kind, "done")
+        self.assertEqual(payload["recommendations"], ["Add a Python bullet", "Quantify impact"])
+        self.assertIn("local-llm (ollama:", payload["source"])
+
+    def test_stream_raises_when_ollama_unreachable(self):
+        ranked = [BulletScore("Role A", "Built SQL pipelines", 0.71, ["sql"])]
+        with patch("core.jd_ranker._ollama_stream_generate", side_effect=OSError("refused")):
+            with self.assertRaises(RuntimeError):
+                list(stream_match_recommendations("Need Python", ranked))
+
 
 if __name__ == "__main__":
     unittest.main()
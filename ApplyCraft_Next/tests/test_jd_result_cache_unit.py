@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from core.jd_ranker import (
+    generate_match_recommendations,
+    rank_bullets_batch,
+    rank_bullets_progressive,
+)
+from core.jd_result_cache import JDResultCache, normalise_jd, result_key
+
+
+INVENTORY = {
+    "Role A": ["Built SQL pipelines and Power BI dashboards", "Automated ETL in Python"],
+    "Role B": ["Ran customer workshops", "Managed vendor contracts"],
+}
+
+
+class TestJDResultCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp(prefix="applycraft_jdcache_test_")
+        self.cache = JDResultCache(os.path.join(self.test_dir, "jd_results.db"))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_key_ignores_whitespace_layout(self):
+        self.assertEqual(normalise_jd("  Python\n\nETL\tengineer "), "Python ETL engineer")
+        self.assertEqual(result_key("Python\nETL", "v1"), result_key("Python  ETL ", "v1"))
+        self.assertNotEqual(result_key("Python ETL", "v1"), result_key("Python ETL", "v2"))
+
+    def test_size_bounded_lru_eviction(self):
+        self.cache.put("a", "ranking", {"x": "a" * 50})
+        size = self.cache.total_bytes()
+        self.cache.max_bytes = size * 2
+        self.cache.put("b", "ranking", {"x": "b" * 50})
+        self.assertEqual(self.cache.get("a"), {"x": "a" * 50})  # "b" is now LRU
+        self.cache.put("c", "ranking", {"x": "c" * 50})
+
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+        self.assertLessEqual(self.cache.total_bytes(), self.cache.max_bytes)
+
+    def test_rankings_and_recommendations_are_memoised(self):
+        calls = []
+
+        def fake_embed(inputs, model, host):
+            calls.append(list(inputs))
+            return [[float("python" in t.lower()), float("workshop" in t.lower()), 1.0] for t in inputs]
+
+        jd = "Python ETL engineer with SQL"
+        with patch("core.jd_ranker.jd_result_cache.get_cache", return_value=self.cache), \
+                patch("core.jd_ranker._resolve_backend", return_value=("ollama", {})), \
+                patch("core.jd_ranker.embedding_cache.get_store", return_value=None), \
+                patch("core.jd_ranker._ollama_embed_batch", side_effect=fake_embed):
+            first = rank_bullets_batch([jd], INVENTORY)[0]
+            stages = list(rank_bullets_progressive(jd + "\n", INVENTORY))
+            self.assertEqual(len(calls), 1)
+            self.assertEqual([s["final"] for s in stages], [True])
+            self.assertEqual(stages[0]["ranked"], first["ranked"])
+            self.assertEqual(stages[0]["fit"], first["fit"])
+
+            edited = dict(INVENTORY, **{"Role C": ["Wrote Python tooling"]})
+            rank_bullets_batch([jd], edited)
+            self.assertEqual(len(calls), 2)
+
+        ranked = first["ranked"]
+        with patch("core.jd_ranker.jd_result_cache.get_cache", return_value=self.cache), \
+                patch("core.jd_ranker._ollama_generate_recommendations",
+                      return_value=["Add a KPI bullet"]) as llm:
+            a = generate_match_recommendations(jd, ranked, max_items=2)
+            b = generate_match_recommendations(jd, ranked, max_items=2)
+        self.assertEqual(a, b)
+        self.assertEqual(llm.call_count, 1)
+
+    def test_fallback_rankings_are_not_cached(self):
+        with patch("core.jd_ranker.jd_result_cache.get_cache", return_value=self.cache), \
+                patch("core.jd_ranker._resolve_backend", return_value=("ollama", {})), \
+                patch("core.jd_ranker.embedding_cache.get_store", return_value=None), \
+                patch("core.jd_ranker._ollama_embed_batch", return_value=None):
+            result = rank_bullets_batch(["Python ETL"], INVENTORY)[0]
+        self.assertEqual(result["fit"]["backend"], "local TF-IDF")
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
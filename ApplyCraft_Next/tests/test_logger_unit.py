@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from helpers.logger import logger
+
+
+class TestTimingSpans(unittest.TestCase):
+    def test_span_is_noop_without_active_trace(self):
+        with logger.span("outside") as span:
+            pass
+        self.assertIs(span, logger.span("other"))
+
+    def test_disabled_trace_records_nothing(self):
+        with logger.trace("off", enabled=False) as trace:
+            with logger.span("stage"):
+                pass
+        self.assertEqual(list(trace.events), [])
+        self.assertEqual(trace.breakdown(), [])
+        self.assertIsNone(trace.dump())
+
+    def test_nested_spans_aggregate_into_breakdown(self):
+        with logger.trace("ranking") as trace:
+            with logger.span("embed"):
+                with logger.span("embed.backend", n=3):
+                    pass
+                with logger.span("embed.backend"):
+                    pass
+            with logger.span("score"):
+                pass
+        rows = trace.breakdown()
+        self.assertEqual([(d, n, c) for d, n, _, c in rows], [
+            (1, "embed", 1), (2, "embed.backend", 2), (1, "score", 1),
+        ])
+        self.assertIn("embed.backend x2", trace.format_breakdown())
+        with logger.span("after"):
+            pass
+        self.assertEqual(len(trace.events), 4)
+
+    def test_chrome_trace_dump(self):
+        with logger.trace("ranking") as trace:
+            with logger.span("score", backend="bm25"):
+                pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = trace.dump(os.path.join(tmp, "t", "trace.json"))
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        names = [e["name"] for e in data["traceEvents"]]
+        self.assertEqual(names, ["ranking", "score"])
+        self.assertTrue(all(e["ph"] == "X" for e in data["traceEvents"]))
+        self.assertEqual(data["traceEvents"][1]["args"], {"backend": "bm25"})
+
+    def test_ranker_records_stage_spans(self):
+        from core.jd_ranker import rank_bullets
+
+        with patch("core.jd_ranker._resolve_backend", return_value=("local", {})), \
+                patch("core.jd_ranker.jd_result_cache.get_cache", return_value=None):
+            with logger.trace("ranking") as trace:
+                rank_bullets("Python data pipelines", {"Role": ["Built Python pipelines"]})
+        names = {name for _, name, _, _ in trace.breakdown()}
+        self.assertIn("tokenise.jd", names)
+
+
+if __name__ == "__main__":
+    unittest.main()
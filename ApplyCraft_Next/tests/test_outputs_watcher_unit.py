@@ -0,0 +1,155 @@
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from core import outputs_watcher
+from core.outputs_watcher import FolderEvent, OutputsWatcher, _PollingBackend, _folder_keys
+from core.stats_manager import StatsManager
+
+
+class _WatcherTestBase(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp(prefix="applycraft_watch_test_")
+        self.outputs = os.path.join(self.test_dir, "outputs")
+        os.makedirs(self.outputs)
+        patches = [
+            patch("core.stats_manager._country_map", return_value={"Denmark": ["copenhagen"]}),
+            patch("core.stats_manager._filename_prefix_to_strip", return_value="Me_CV_"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.manager = StatsManager(self.test_dir)
+        self.addCleanup(shutil.rmtree, self.test_dir, True)
+        self.addCleanup(self.manager.close)
+
+    def _folder(self, date, company, files=()):
+        path = os.path.join(self.outputs, date, company)
+        os.makedirs(path, exist_ok=True)
+        for name in files:
+            open(os.path.join(path, name), "w").close()
+        return path
+
+    def _wait_for(self, predicate, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.05)
+        return False
+
+
+class TestApplyFolderChanges(_WatcherTestBase):
+    def test_created_changed_and_deleted_folders(self):
+        path = self._folder("01-02-25", "Acme")
+        self._folder("01-02-25", "Globex", ["Me_CV_Globex_Copenhagen.pdf"])
+        self.assertEqual(self.manager.apply_folder_changes([("01-02-25", None)]), 2)
+        stats = self.manager.get_stats()
+        self.assertFalse(stats["01-02-25_Acme"]["cv_found"])
+        self.assertEqual(stats["01-02-25_Globex"]["country"], "Denmark")
+
+        open(os.path.join(path, "Me_CV_Acme_Copenhagen.pdf"), "w").close()
+        self.assertEqual(self.manager.apply_folder_changes([("01-02-25", "Acme")]), 1)
+        self.assertTrue(self.manager.get_stats()["01-02-25_Acme"]["cv_found"])
+        self.assertEqual(self.manager.apply_folder_changes([("01-02-25", "Acme")]), 0)
+
+        shutil.rmtree(path)
+        self.manager.update_field("01-02-25_Globex", "status", "Offer")
+        shutil.rmtree(os.path.join(self.outputs, "01-02-25", "Globex"))
+        self.manager.apply_folder_changes([("01-02-25", "Acme"), ("01-02-25", "Globex")])
+        stats = self.manager.get_stats()
+        self.assertNotIn("01-02-25_Acme", stats)
+        self.assertIn("01-02-25_Globex", stats)  # manual edits keep the row
+
+    def test_event_keys(self):
+        self.assertEqual(_folder_keys(FolderEvent("created", "01-02-25")), [("01-02-25", None)])
+        self.assertEqual(
+            _folder_keys(FolderEvent("renamed", "01-02-25/A", "01-02-25/B")),
+            [("01-02-25", "A"), ("01-02-25", "B")],
+        )
+        self.assertEqual(_folder_keys(FolderEvent("changed", "01-02-25/A/cv.pdf")), [("01-02-25", "A")])
+
+
+class TestPollingBackend(_WatcherTestBase):
+    def test_snapshot_diffs(self):
+        path = self._folder("01-02-25", "Acme")
+        backend = _PollingBackend(self.outputs, 0.1, threading.Event())
+        self.assertEqual(backend._snapshot(), [])
+
+        self._folder("01-02-25", "Globex")
+        self._folder("02-02-25", "Initech")
+        old = time.time() - 60
+        os.utime(path, (old, old))
+        events = set(backend._snapshot())
+        self.assertIn(FolderEvent("created", "01-02-25/Globex"), events)
+        self.assertIn(FolderEvent("created", "02-02-25"), events)
+        self.assertIn(FolderEvent("changed", "01-02-25/Acme"), events)
+
+        shutil.rmtree(os.path.join(self.outputs, "02-02-25"))
+        self.assertEqual(backend._snapshot(), [FolderEvent("deleted", "02-02-25")])
+
+
+class TestOutputsWatcher(_WatcherTestBase):
+    def _watch(self, backend):
+        changes = []
+        watcher = OutputsWatcher(
+            self.manager, backend=backend, debounce=0.2, poll_interval=0.1,
+            on_change=changes.append,
+        )
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        return watcher, changes
+
+    def _check_watcher(self, backend):
+        watcher, changes = self._watch(backend)
+        for name in ("Acme", "Globex", "Initech"):
+            self._folder("01-02-25", name, [f"Me_CV_{name}_Copenhagen.pdf"])
+        self.assertTrue(self._wait_for(lambda: len(self.manager.get_stats()) == 3))
+        self.assertEqual(self.manager.get_stats()["01-02-25_Acme"]["country"], "Denmark")
+
+        os.rename(os.path.join(self.outputs, "01-02-25", "Acme"), os.path.join(self.outputs, "01-02-25", "Acme_AS"))
+        self.assertTrue(self._wait_for(lambda: "01-02-25_Acme_AS" in self.manager.get_stats()))
+        self.assertNotIn("01-02-25_Acme", self.manager.get_stats())
+        self.assertTrue(changes)
+        return watcher
+
+    def test_polling_watcher_applies_changes(self):
+        watcher = self._check_watcher("polling")
+        self.assertEqual(watcher.status()["backend"], "polling")
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+    def test_inotify_watcher_batches_changes(self):
+        watcher = self._check_watcher("inotify")
+        self.assertEqual(watcher.status()["backend"], "inotify")
+        # Three folders and their files arrived in well under the debounce window.
+        self.assertLessEqual(watcher.status()["batches"], 3)
+        watcher.stop()
+        self.assertEqual(watcher.status()["state"], "stopped")
+
+    def test_dispatch_applies_batches_on_the_caller_thread(self):
+        work = queue.Queue()
+        watcher = OutputsWatcher(self.manager, backend="polling", debounce=0.1, poll_interval=0.1, dispatch=work.put)
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        self._folder("01-02-25", "Acme", ["Me_CV_Acme_Copenhagen.pdf"])
+
+        job = work.get(timeout=10)
+        self.assertNotIn("01-02-25_Acme", self.manager.get_stats())  # nothing applied off-thread
+        with patch.object(self.manager, "apply_folder_changes", wraps=self.manager.apply_folder_changes) as apply:
+            job()
+        self.assertEqual(apply.call_count, 1)
+        self.assertIn("01-02-25_Acme", self.manager.get_stats())
+
+    def test_disabled_by_default(self):
+        with patch("core.outputs_watcher.user_config.tracker_config", return_value={"watch_outputs": False}):
+            self.assertIsNone(outputs_watcher.start_for(self.manager))
+
+
+if __name__ == "__main__":
+    unittest.main()
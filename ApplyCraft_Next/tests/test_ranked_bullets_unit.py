@@ -0,0 +1,60 @@
+import json
+import unittest
+
+from core.jd_ranker import _BULLET_INDEX, compute_fit_score, rank_bullets, top_bullets_per_job
+from core.ranked_bullets import BulletScore, RankedBullets
+
+
+FLAT = [
+    ("Role A", "Built SQL pipelines", ["built", "sql", "pipelines"]),
+    ("Role A", "Automated ETL in Python", ["automated", "etl", "python"]),
+    ("Role B", "Ran workshops", ["ran", "workshops"]),
+]
+
+
+class TestRankedBullets(unittest.TestCase):
+    def setUp(self):
+        self.ranked = RankedBullets.from_rows(FLAT, [
+            (1, 0.9, ["python", "etl"]),
+            (0, 0.5, ["sql"]),
+            (2, 0.0, []),
+        ])
+
+    def test_behaves_like_a_list_of_bullet_scores(self):
+        expected = [
+            BulletScore("Role A", "Automated ETL in Python", 0.9, ["python", "etl"]),
+            BulletScore("Role A", "Built SQL pipelines", 0.5, ["sql"]),
+            BulletScore("Role B", "Ran workshops", 0.0, []),
+        ]
+        self.assertEqual(len(self.ranked), 3)
+        self.assertEqual(self.ranked, expected)
+        self.assertEqual(self.ranked[-1], expected[-1])
+        self.assertEqual(self.ranked[:2], expected[:2])
+        self.assertEqual(list(self.ranked), expected)
+        self.assertEqual(len(self.ranked.job_idx), 3)
+        with self.assertRaises(IndexError):
+            self.ranked[3]
+
+    def test_record_round_trip_is_json(self):
+        record = json.loads(json.dumps(self.ranked.to_record()))
+        self.assertEqual(record["vocab"], ["python", "etl", "sql"])
+        self.assertEqual(RankedBullets.from_record(record, FLAT), self.ranked)
+
+    def test_column_fast_paths_match_list_paths(self):
+        as_list = list(self.ranked)
+        jd = "Python ETL and SQL developer"
+        self.assertEqual(compute_fit_score(jd, self.ranked, backend="x"),
+                         compute_fit_score(jd, as_list, backend="x"))
+        self.assertEqual(top_bullets_per_job(self.ranked, per_job_cap=1),
+                         top_bullets_per_job(as_list, per_job_cap=1))
+
+    def test_rank_bullets_shares_the_index_flat_list(self):
+        inventory = {"Role A": ["Built SQL pipelines", "Automated ETL in Python"]}
+        ranked = rank_bullets("Python ETL", inventory, force_local=True)
+        self.assertIsInstance(ranked, RankedBullets)
+        self.assertIs(ranked.flat, _BULLET_INDEX.flat())
+        self.assertEqual(ranked[0].bullet, "Automated ETL in Python")
+
+
+if __name__ == "__main__":
+    unittest.main()
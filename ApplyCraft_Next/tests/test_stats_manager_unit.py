@@ -1,8 +1,14 @@
 
 import unittest
+import json
 import os
 import shutil
+import subprocess
+import sys
 import tempfile
+import time
+from unittest.mock import patch
+
 from core.stats_manager import StatsManager
 
 class TestStatsManager(unittest.TestCase):
@@ -65,5 +71,269 @@ class TestStatsManager(unittest.TestCase):
         self.assertEqual(stats[same_app_id]["company"], "AB Co")
         self.assertEqual(stats[same_app_id]["folder_name"], "AB_Co")
 
+    def test_save_writes_only_changed_rows_without_reloading(self):
+        ids = [self.manager.add_application("2026-02-17", f"Company {i}", "Denmark") for i in range(5)]
+        statements = []
+        self.manager.conn.set_trace_callback(statements.append)
+        try:
+            with patch.object(self.manager, "_load_stats_from_db", wraps=self.manager._load_stats_from_db) as reload:
+                self.manager.stats[ids[2]]["notes"] = "Called back"
+                self.manager._mark_dirty(ids[2])
+                self.manager._save_stats()
+            reload.assert_not_called()
+        finally:
+            self.manager.conn.set_trace_callback(None)
+        upserts = [s for s in statements if s.lstrip().startswith("INSERT INTO applications")]
+        self.assertEqual(len(upserts), 1)
+        self.assertIn(ids[2], upserts[0])
+
+        fresh = StatsManager(self.test_dir)
+        try:
+            self.assertEqual(fresh.get_stats(), self.manager.stats)
+        finally:
+            fresh.close()
+
+    def test_ids_marked_during_a_save_stay_dirty(self):
+        first = self.manager.add_application("2026-02-17", "First Co", "Denmark")
+        late = self.manager.add_application("2026-02-17", "Late Co", "Denmark")
+        self.manager.stats[first]["notes"] = "saved"
+        self.manager._mark_dirty(first)
+
+        real_row_values = self.manager._row_values
+
+        def row_values(app_id, data):
+            # Another thread edits a row while this save is building its rows.
+            if app_id == first:
+                self.manager.stats[late]["notes"] = "edited mid-save"
+                self.manager._mark_dirty(late)
+            return real_row_values(app_id, data)
+
+        with patch.object(self.manager, "_row_values", side_effect=row_values):
+            self.manager._save_stats()
+        self.assertEqual(self.manager._dirty_ids, {late})
+        self.manager._save_stats()
+        fresh = StatsManager(self.test_dir)
+        try:
+            self.assertEqual(fresh.get_stats()[late]["notes"], "edited mid-save")
+        finally:
+            fresh.close()
+
+    def test_save_persists_deletions_and_full_rewrite(self):
+        keep = self.manager.add_application("2026-02-17", "Keep_Co", "Denmark")
+        gone = self.manager.add_application("2026-02-17", "Gone Co", "Denmark")
+        self.manager._deleted_ids.add(gone)
+        self.manager.stats[keep]["status"] = "Offer"  # edited without marking
+        self.manager._save_stats(full=True)
+        self.assertNotIn(gone, self.manager.stats)
+        self.assertEqual(self.manager.stats[keep]["company"], "Keep Co")
+
+        fresh = StatsManager(self.test_dir)
+        try:
+            self.assertEqual(fresh.get_stats(), self.manager.stats)
+            self.assertEqual(fresh.get_stats()[keep]["status"], "Offer")
+        finally:
+            fresh.close()
+
+    def test_repeated_reads_skip_reload_until_another_connection_writes(self):
+        app_id = self.manager.add_application("2026-02-17", "Test Company", "Denmark")
+        self.manager.get_stats()
+        with patch.object(self.manager, "_load_stats_from_db", wraps=self.manager._load_stats_from_db) as reload:
+            for _ in range(3):
+                self.manager.get_stats()
+            self.manager.update_status(app_id, "Offer")
+            self.manager.get_summary()
+            reload.assert_not_called()
+
+            other = StatsManager(self.test_dir)
+            try:
+                other.update_field(app_id, "notes", "From the other panel")
+                other_id = other.add_application("2026-02-18", "Other Co", "Sweden")
+            finally:
+                other.close()
+            stats = self.manager.get_stats()
+            self.assertEqual(reload.call_count, 1)
+        self.assertEqual(stats[app_id]["notes"], "From the other panel")
+        self.assertEqual(stats[app_id]["status"], "Offer")
+        self.assertIn(other_id, stats)
+
+    def test_get_stats_returns_a_snapshot(self):
+        first = self.manager.add_application("2026-02-17", "Test Company", "Denmark")
+        stats = self.manager.get_stats()
+        second = self.manager.add_application("2026-02-18", "Other Co", "Sweden")
+        self.assertEqual(list(stats), [first])  # safe to iterate while the manager grows
+        self.assertIn(second, self.manager.get_stats())
+
+    def test_writes_from_another_process_are_seen(self):
+        app_id = self.manager.add_application("2026-02-17", "Test Company", "Denmark")
+        self.manager.get_stats()
+        script = (
+            "import sqlite3, sys; c = sqlite3.connect(sys.argv[1]); "
+            "c.execute(\"UPDATE applications SET status = 'Rejected (Initial)' WHERE app_id = ?\", (sys.argv[2],)); "
+            "c.commit()"
+        )
+        subprocess.run([sys.executable, "-c", script, self.manager.db_file, app_id], check=True)
+        self.assertEqual(self.manager.get_stats()[app_id]["status"], "Rejected (Initial)")
+
+
+class TestJsonMirror(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp(prefix="applycraft_mirror_test_")
+        self.addCleanup(shutil.rmtree, self.test_dir, True)
+
+    def _manager(self, mode, delay=0.2):
+        cfg = {"json_mirror": mode, "json_mirror_delay": delay}
+        with patch("core.stats_manager.user_config.tracker_config", return_value=cfg):
+            manager = StatsManager(self.test_dir)
+        self.addCleanup(manager.close)
+        return manager
+
+    def _read(self, name):
+        with open(os.path.join(self.test_dir, name), encoding="utf-8") as f:
+            return f.read()
+
+    def test_background_writes_are_coalesced_compact_and_atomic(self):
+        manager = self._manager("background")
+        self.assertTrue(manager.flush_json_mirror())
+        writes = manager._mirror.writes
+        app_id = manager.add_application("2026-02-17", "Test Company", "Denmark")
+        for status in ("In Process", "Followed Up", "Offer"):
+            manager.update_status(app_id, status)
+        self.assertTrue(manager.flush_json_mirror())
+        self.assertEqual(manager._mirror.writes - writes, 1)
+
+        text = self._read("application_stats.json")
+        self.assertNotIn("\n", text)
+        self.assertEqual(json.loads(text)[app_id]["status"], "Offer")
+        self.assertEqual(json.loads(self._read("application_deleted.json")), {"deleted_ids": []})
+        self.assertFalse([n for n in os.listdir(self.test_dir) if n.endswith(".tmp")])
+
+    def test_no_op_scan_does_not_rewrite_mirror(self):
+        manager = self._manager("background")
+        manager.flush_json_mirror()
+        writes = manager._mirror.writes
+        manager.scan_outputs()
+        manager.flush_json_mirror()
+        self.assertEqual(manager._mirror.writes, writes)
+
+    def test_off_and_on_demand_modes(self):
+        manager = self._manager("off")
+        manager.add_application("2026-02-17", "Test Company", "Denmark")
+        manager.close()
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "application_stats.json")))
+
+        manager = self._manager("on_demand")
+        app_id = manager.add_application("2026-02-18", "Other Co", "Sweden")
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "application_stats.json")))
+        manager.close()
+        self.assertIn(app_id, json.loads(self._read("application_stats.json")))
+
+
+class TestIncrementalScan(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp(prefix="applycraft_scan_test_")
+        self.outputs = os.path.join(self.test_dir, "outputs")
+        patches = [
+            patch("core.stats_manager._country_map", return_value={"Denmark": ["copenhagen", "denmark"]}),
+            patch("core.stats_manager._filename_prefix_to_strip", return_value="Me_CV_"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.manager = StatsManager(self.test_dir)
+        self.addCleanup(shutil.rmtree, self.test_dir, True)
+        self.addCleanup(self.manager.close)
+
+    def _folder(self, date, company, files=(), age=3600):
+        path = os.path.join(self.outputs, date, company)
+        os.makedirs(path, exist_ok=True)
+        for name in files:
+            open(os.path.join(path, name), "w").close()
+        self._age(os.path.join(self.outputs, date), age)
+        self._age(path, age)
+        return path
+
+    @staticmethod
+    def _age(path, seconds):
+        old = time.time() - seconds
+        os.utime(path, (old, old))
+
+    def _listed(self):
+        """Run an incremental scan and return the directories it listed."""
+        listed = []
+        real_scandir, real_listdir = os.scandir, os.listdir
+
+        def scandir(path):
+            listed.append(os.path.relpath(path, self.outputs))
+            return real_scandir(path)
+
+        def listdir(path):
+            listed.append(os.path.relpath(path, self.outputs))
+            return real_listdir(path)
+
+        with patch("core.stats_manager.os.scandir", side_effect=scandir), \
+                patch("core.stats_manager.os.listdir", side_effect=listdir):
+            self.manager.scan_outputs()
+        return listed
+
+    def test_unchanged_tree_only_lists_root(self):
+        self._folder("01-02-25", "Acme", ["Me_CV_Acme_Copenhagen.pdf"])
+        self._folder("02-02-25", "Globex", ["Me_CV_Globex_Denmark.pdf"])
+        stats = self.manager.scan_outputs()
+        self.assertEqual(stats["01-02-25_Acme"]["country"], "Denmark")
+        self.assertTrue(stats["02-02-25_Globex"]["cv_found"])
+
+        self.assertEqual(self._listed(), ["."])
+        self.assertEqual(len(self.manager.get_stats()), 2)
+
+    def test_new_company_folder_lists_only_its_date(self):
+        self._folder("01-02-25", "Acme", ["Me_CV_Acme_Copenhagen.pdf"])
+        self._folder("02-02-25", "Globex", ["Me_CV_Globex_Denmark.pdf"])
+        self.manager.scan_outputs()
+
+        self._folder("02-02-25", "Initech", ["Me_CV_Initech_Denmark.pdf"], age=60)
+        listed = self._listed()
+        self.assertNotIn("01-02-25", listed)
+        self.assertIn("02-02-25", listed)
+        self.assertIn("02-02-25_Initech", self.manager.get_stats())
+
+    def test_late_cv_is_picked_up_under_unchanged_date(self):
+        path = self._folder("01-02-25", "Acme")
+        stats = self.manager.scan_outputs()
+        self.assertFalse(stats["01-02-25_Acme"]["cv_found"])
+
+        open(os.path.join(path, "Me_CV_Acme_Copenhagen.pdf"), "w").close()
+        self._age(path, 60)
+        stats = self.manager.scan_outputs()
+        self.assertTrue(stats["01-02-25_Acme"]["cv_found"])
+        self.assertEqual(stats["01-02-25_Acme"]["country"], "Denmark")
+
+    def test_removed_date_folder_drops_unedited_rows(self):
+        self._folder("01-02-25", "Acme", ["Me_CV_Acme_Copenhagen.pdf"])
+        self._folder("02-02-25", "Globex", ["Me_CV_Globex_Denmark.pdf"])
+        self.manager.scan_outputs()
+        self.manager.update_field("02-02-25_Globex", "status", "Offer")
+
+        shutil.rmtree(os.path.join(self.outputs, "01-02-25"))
+        shutil.rmtree(os.path.join(self.outputs, "02-02-25"))
+        stats = self.manager.scan_outputs()
+        self.assertNotIn("01-02-25_Acme", stats)
+        self.assertIn("02-02-25_Globex", stats)
+        with self.manager.conn:
+            paths = [r[0] for r in self.manager.conn.execute("SELECT path FROM scan_manifest")]
+        self.assertEqual(paths, [])
+
+    def test_changed_country_keywords_rescan_everything(self):
+        self._folder("01-02-25", "Acme", ["Me_CV_Acme_Malmo.pdf"])
+        self.assertEqual(self.manager.scan_outputs()["01-02-25_Acme"]["country"], "Unknown")
+
+        with patch("core.stats_manager._country_map", return_value={"Sweden": ["malmo"]}):
+            self.assertEqual(self.manager.scan_outputs()["01-02-25_Acme"]["country"], "Sweden")
+
+    def test_recent_mtimes_are_not_trusted(self):
+        self._folder("01-02-25", "Acme", ["Me_CV_Acme_Copenhagen.pdf"], age=0)
+        self.manager.scan_outputs()
+        self.assertIn("01-02-25", self._listed())
+
+
 if __name__ == "__main__":
     unittest.main()
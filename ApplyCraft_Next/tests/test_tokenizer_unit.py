@@ -0,0 +1,48 @@
+import unittest
+
+from core.ranked_bullets import TOKENS
+from core.tokenizer import Tokenizer, stem
+
+
+class TestTokenizer(unittest.TestCase):
+    def test_content_tokens_and_ids(self):
+        tok = Tokenizer()
+        text = "Built the C# and .NET APIs for Power BI reporting"
+        self.assertEqual(tok.tokens(text)[:3], ("built", "the", "c#"))
+        content = tok.content_tokens(text)
+        self.assertNotIn("the", content)
+        self.assertNotIn("bi", content)  # too short
+        self.assertEqual(content, ("built", "net", "apis", "power", "reporting"))
+        self.assertEqual([TOKENS.token(i) for i in tok.content_ids(text)], list(content))
+
+    def test_results_are_memoised_and_bounded(self):
+        tok = Tokenizer(cache_size=2)
+        first = tok.content_ids("Python ETL pipelines")
+        self.assertIs(tok.content_ids("Python ETL pipelines"), first)
+        tok.content_ids("SQL dashboards")
+        tok.content_ids("Vendor contracts")
+        self.assertLessEqual(tok.content_ids.cache_info().currsize, 2)
+
+    def test_bigrams_keep_short_words_and_skip_stopwords(self):
+        tok = Tokenizer()
+        ids = tok.bigram_ids("Built Power BI dashboards and machine learning models")
+        self.assertEqual(
+            [TOKENS.token(i) for i in ids],
+            ["built power", "power bi", "bi dashboards", "machine learning", "learning models"],
+        )
+        self.assertIs(tok.bigram_ids("Power BI"), tok.bigram_ids("Power BI"))
+
+    def test_optional_stemming(self):
+        self.assertEqual(stem("dashboards"), "dashboard")
+        self.assertEqual(stem("reporting"), "report")
+        self.assertEqual(stem("reported"), "report")
+        self.assertEqual(stem("node.js"), "node.js")
+        self.assertEqual(stem("business"), "business")
+        plain = Tokenizer().content_tokens("Reporting dashboards")
+        stemmed = Tokenizer(stemming=True).content_tokens("Reporting dashboards")
+        self.assertEqual(plain, ("reporting", "dashboards"))
+        self.assertEqual(stemmed, ("report", "dashboard"))
+
+
+if __name__ == "__main__":
+    unittest.main()
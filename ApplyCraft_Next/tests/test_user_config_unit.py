@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from helpers import user_config
+
+
+class TestInventoryVersioning(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp(prefix="applycraft_config_test_")
+        for name, value in (
+            ("config_path", lambda: os.path.join(self.test_dir, "user_config.json")),
+            ("cache_dir", lambda: os.path.join(self.test_dir, "cache")),
+        ):
+            patcher = patch.object(user_config, name, side_effect=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self._reset()
+        self.addCleanup(self._reset)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    @staticmethod
+    def _reset():
+        user_config._cache = None
+        user_config._inventory_state = None
+
+    def _save(self, positions):
+        user_config.save({"job_positions": positions})
+
+    def test_version_only_moves_when_inventory_changes(self):
+        self._save({"Role A": ["SQL pipelines", "Python ETL"]})
+        v1 = user_config.inventory_version()
+        self._save({"Role A": ["SQL pipelines", "Python ETL"]})
+        self.assertEqual(user_config.inventory_version(), v1)
+
+        self._save({"Role A": ["SQL pipelines", "Python ETL jobs"], "Role B": ["KPI reporting"]})
+        self.assertEqual(user_config.inventory_version(), v1 + 1)
+        diff = user_config.inventory_diff(v1)
+        self.assertEqual(diff.edited, [("Role A", 1, "Python ETL", "Python ETL jobs")])
+        self.assertEqual(diff.added, [("Role B", 0, "KPI reporting")])
+        self.assertEqual(diff.removed, [])
+        self.assertEqual(user_config.bullet_hashes()["Role A"][0], user_config.bullet_hash("SQL pipelines"))
+
+        self._save({"Role A": ["Python ETL jobs", "SQL pipelines"]})
+        diff = user_config.inventory_diff(v1 + 1)
+        self.assertEqual(diff.version, v1 + 2)
+        self.assertEqual(diff.removed, [("Role B", 0, "KPI reporting")])
+        self.assertEqual(diff.edited, [])  # reordered, not edited
+
+        self.assertFalse(user_config.inventory_diff(v1 + 2))
+
+    def test_state_survives_restart_and_notices_hand_edits(self):
+        self._save({"Role A": ["SQL pipelines"]})
+        version = user_config.inventory_version()
+
+        with open(user_config.config_path(), "w", encoding="utf-8") as f:
+            f.write('{"job_positions": {"Role A": ["SQL pipelines", "Vendor contracts"]}}')
+        self._reset()  # as if the app restarted
+
+        self.assertEqual(user_config.inventory_version(), version + 1)
+        self.assertEqual(user_config.inventory_diff(version).added, [("Role A", 1, "Vendor contracts")])
+
+    def test_diff_older_than_history_asks_for_rebuild(self):
+        with patch.object(user_config, "_INVENTORY_LOG_LIMIT", 2):
+            for i in range(4):
+                self._save({"Role A": [f"Bullet {i}"]})
+            latest = user_config.inventory_version()
+            self.assertIsNotNone(user_config.inventory_diff(latest - 2))
+            self.assertIsNone(user_config.inventory_diff(latest - 3))
+
+
+if __name__ == "__main__":
+    unittest.main()